@@ -46,10 +46,21 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
+    # Copied into volunteer exports; saves that leave them alone are not reported.
+    IDENTITY_FIELDS = ("first_name", "last_name", "email")
 
     def __str__(self) -> str:
         return self.email
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_identity = instance.identity() if set(cls.IDENTITY_FIELDS) <= set(field_names) else None
+        return instance
+
+    def identity(self):
+        return tuple(getattr(self, name) for name in self.IDENTITY_FIELDS)
+
     @property
     def full_name(self) -> str:
         full = f"{self.first_name} {self.last_name}".strip()
@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import tempfile
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -26,6 +27,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "volunteers.instrumentation.InstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -34,6 +36,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "volunteers.middleware.OutboxMiddleware",
 ]
 
 ROOT_URLCONF = "asf_benev.urls"
@@ -107,7 +110,46 @@ EMAIL_USE_SSL = os.getenv("EMAIL_USE_SSL", "0") == "1"
 EMAIL_TIMEOUT = int(os.getenv("EMAIL_TIMEOUT", "10"))
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "no-reply@example.com")
 
+REQUEST_INSTRUMENTATION = os.getenv("REQUEST_INSTRUMENTATION", "0") == "1"
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+METRICS_DIR = Path(os.getenv("METRICS_DIR", Path(tempfile.gettempdir()) / "asf-benev-metrics"))
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "1"))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "volunteers.instrumentation": {
+            "handlers": ["console"],
+            "level": os.getenv("REQUEST_INSTRUMENTATION_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
+
+RECAP_CACHE_SECONDS = int(os.getenv("RECAP_CACHE_SECONDS", "86400"))
+
 INTEGRATION_API_KEY = os.getenv("INTEGRATION_API_KEY", "").strip()
+INTEGRATION_MAX_PAGE_SIZE = int(os.getenv("INTEGRATION_MAX_PAGE_SIZE", "1000"))
+INTEGRATION_BULK_MAX_EVENTS = int(os.getenv("INTEGRATION_BULK_MAX_EVENTS", "1000"))
+INTEGRATION_BULK_BATCH_SIZE = int(os.getenv("INTEGRATION_BULK_BATCH_SIZE", "500"))
+INTEGRATION_SYNC_LAG_SECONDS = int(os.getenv("INTEGRATION_SYNC_LAG_SECONDS", "5"))
+INTEGRATION_TOMBSTONE_RETENTION_DAYS = int(os.getenv("INTEGRATION_TOMBSTONE_RETENTION_DAYS", "30"))
+INTEGRATION_EVENT_RETENTION_DAYS = int(os.getenv("INTEGRATION_EVENT_RETENTION_DAYS", "90"))
+INTEGRATION_ARCHIVE_DIR = Path(os.getenv("INTEGRATION_ARCHIVE_DIR", BASE_DIR / "archives"))
+INTEGRATION_FEED_POLL_SECONDS = float(os.getenv("INTEGRATION_FEED_POLL_SECONDS", "0.5"))
+INTEGRATION_FEED_LONG_POLL_SECONDS = float(os.getenv("INTEGRATION_FEED_LONG_POLL_SECONDS", "25"))
+INTEGRATION_FEED_MAX_SECONDS = int(os.getenv("INTEGRATION_FEED_MAX_SECONDS", "300"))
+# How long the push feed keeps waiting for an id below its cursor whose transaction has not committed.
+INTEGRATION_FEED_GAP_SECONDS = float(os.getenv("INTEGRATION_FEED_GAP_SECONDS", "60"))
+INTEGRATION_MATRIX_MAX_WEEKS = int(os.getenv("INTEGRATION_MATRIX_MAX_WEEKS", "12"))
+INTEGRATION_COVERAGE_MAX_WEEKS = int(os.getenv("INTEGRATION_COVERAGE_MAX_WEEKS", "12"))
+INTEGRATION_OUTBOX_SOURCE = os.getenv("INTEGRATION_OUTBOX_SOURCE", "asf-benev")
+# event_type -> dotted path of a callable(event) run by process_integration_events.
+INTEGRATION_EVENT_HANDLERS = {}
 
 CSRF_TRUSTED_ORIGINS = [
     origin.strip()
@@ -146,6 +188,8 @@ REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": [
         "rest_framework.renderers.JSONRenderer",
     ],
+    "DEFAULT_PAGINATION_CLASS": "volunteers.pagination.KeysetPagination",
+    "PAGE_SIZE": int(os.getenv("INTEGRATION_PAGE_SIZE", "100")),
 }
 
 if DEBUG:
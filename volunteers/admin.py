@@ -1,6 +1,20 @@
+import re
+from datetime import datetime
+
+from django import forms
 from django.contrib import admin
 
-from .models import Availability, IntegrationEvent, Unavailability, VolunteerConstraint, VolunteerProfile
+from .models import (
+    Availability,
+    AvailabilityOverlap,
+    EVENTS_DELETED,
+    IntegrationEvent,
+    Unavailability,
+    VolunteerConstraint,
+    VolunteerProfile,
+    mark_deleted,
+)
+from .slots import on_grid
 
 
 class VolunteerConstraintInline(admin.StackedInline):
@@ -33,11 +47,82 @@ class VolunteerConstraintAdmin(admin.ModelAdmin):
     search_fields = ("volunteer__volunteer_id", "volunteer__user__email")
 
 
+WINDOW_SEARCH = re.compile(r"^\s*(\d{4}-\d{2}-\d{2})\s+(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})\s*$")
+
+
+def parse_window_search(term):
+    """Parse ``"AAAA-MM-JJ HH:MM-HH:MM"`` into ``(date, start, end)``, else None.
+
+    Both times must be quarter hours of the 07:00-22:00 slot grid.
+    """
+    match = WINDOW_SEARCH.match(term or "")
+    if not match:
+        return None
+    try:
+        day = datetime.strptime(match.group(1), "%Y-%m-%d").date()
+        start = datetime.strptime(match.group(2), "%H:%M").time()
+        end = datetime.strptime(match.group(3), "%H:%M").time()
+    except ValueError:
+        return None
+    if start >= end or not on_grid(start) or not on_grid(end):
+        return None
+    return day, start, end
+
+
+class AvailabilityAdminForm(forms.ModelForm):
+    # Set by AvailabilityAdmin when the database refused to save this submission.
+    save_error = None
+
+    class Meta:
+        model = Availability
+        fields = "__all__"
+
+    def clean(self):
+        cleaned = super().clean()
+        # Overlaps are left to the database constraint, as in the volunteer views.
+        if self.save_error is not None:
+            raise self.save_error
+        return cleaned
+
+
 @admin.register(Availability)
 class AvailabilityAdmin(admin.ModelAdmin):
+    form = AvailabilityAdminForm
     list_display = ("volunteer", "date", "start_time", "end_time")
     list_filter = ("date",)
     search_fields = ("volunteer__volunteer_id", "volunteer__user__email")
+    search_help_text = "Numero, email, ou creneau \"AAAA-MM-JJ HH:MM-HH:MM\" pour les benevoles disponibles."
+
+    def get_queryset(self, request):
+        window = parse_window_search(request.GET.get("q"))
+        if window:
+            return self.model._default_manager.available_for(*window)
+        return super().get_queryset(request)
+
+    def get_search_results(self, request, queryset, search_term):
+        if parse_window_search(search_term):
+            # Already narrowed and annotated in get_queryset.
+            return queryset, False
+        return super().get_search_results(request, queryset, search_term)
+
+    def get_ordering(self, request):
+        # Keep the best-fit order of a window search unless a column is clicked.
+        if parse_window_search(request.GET.get("q")):
+            return ["fit", "start_time"]
+        return super().get_ordering(request)
+
+    def get_form(self, request, obj=None, **kwargs):
+        form = super().get_form(request, obj, **kwargs)
+        form.save_error = getattr(request, "_availability_overlap", None)
+        return form
+
+    def changeform_view(self, request, object_id=None, form_url="", extra_context=None):
+        try:
+            return super().changeform_view(request, object_id, form_url, extra_context)
+        except AvailabilityOverlap as error:
+            # The save was rolled back; render the submitted form again, with the error.
+            request._availability_overlap = error
+            return super().changeform_view(request, object_id, form_url, extra_context)
 
 
 @admin.register(Unavailability)
@@ -61,3 +146,11 @@ class IntegrationEventAdmin(admin.ModelAdmin):
     search_fields = ("source", "target", "event_type", "external_id")
     readonly_fields = ("created_at", "processed_at")
 
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        mark_deleted(EVENTS_DELETED)
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        mark_deleted(EVENTS_DELETED)
+
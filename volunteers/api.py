@@ -1,16 +1,249 @@
 import csv
-from datetime import datetime
+import hashlib
+import io
+from collections import defaultdict
+from datetime import date, datetime, timedelta
 
 from django.conf import settings
-from django.http import HttpResponse
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Q, Subquery
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from rest_framework import mixins, permissions, viewsets
-from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.gzip import gzip_page
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import action, api_view, authentication_classes, permission_classes
 from rest_framework.authentication import SessionAuthentication, TokenAuthentication
 from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
 
-from .models import Availability, IntegrationDirection, IntegrationEvent, IntegrationStatus, VolunteerConstraint, VolunteerProfile
-from .serializers import AvailabilitySerializer, IntegrationEventSerializer, IntegrationEventStatusSerializer, VolunteerProfileSerializer
+from .coverage import coverage
+from .matrix import build_matrix
+from .models import (
+    EVENTS_DELETED,
+    VOLUNTEERS_DELETED,
+    Availability,
+    CacheGeneration,
+    DeletionTombstone,
+    IntegrationDirection,
+    IntegrationEvent,
+    IntegrationStatus,
+    Unavailability,
+    VolunteerProfile,
+)
+from .pagination import KeysetPagination
+from .parsers import NDJSONParser
+from .serializers import (
+    AvailabilityChangeSerializer,
+    AvailabilitySerializer,
+    DeletionTombstoneSerializer,
+    IntegrationEventSerializer,
+    IntegrationEventStatusSerializer,
+    UnavailabilityChangeSerializer,
+    VolunteerProfileSerializer,
+)
+from .slots import SLOT_COUNT, SLOT_END, SLOT_MINUTES, SLOT_START, on_grid
+
+
+CSV_CHUNK_SIZE = 2000
+CSV_FLUSH_BYTES = 64 * 1024
+
+VOLUNTEER_CSV_COLUMNS = [
+    ("volunteer_id", "volunteer_id"),
+    ("first_name", "user__first_name"),
+    ("last_name", "user__last_name"),
+    ("short_name", "short_name"),
+    ("email", "user__email"),
+    ("phone", "phone"),
+    ("max_days_per_week", "constraints__max_days_per_week"),
+    ("max_expeditions_per_week", "constraints__max_expeditions_per_week"),
+    ("max_expeditions_per_day", "constraints__max_expeditions_per_day"),
+    ("max_wait_hours", "constraints__max_wait_hours"),
+]
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def _parse_time(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%H:%M").time()
+    except ValueError:
+        return None
+
+
+def filter_availabilities(queryset, params):
+    volunteer_id = params.get("volunteer_id")
+    if volunteer_id:
+        queryset = queryset.filter(volunteer__volunteer_id=volunteer_id)
+    start_date = _parse_date(params.get("start"))
+    if start_date:
+        queryset = queryset.filter(date__gte=start_date)
+    end_date = _parse_date(params.get("end"))
+    if end_date:
+        queryset = queryset.filter(date__lte=end_date)
+    return queryset
+
+
+def filter_events(queryset, params):
+    direction = (params.get("direction") or "").strip()
+    if direction:
+        queryset = queryset.filter(direction=direction)
+    status_value = (params.get("status") or "").strip()
+    if status_value:
+        queryset = queryset.filter(status=status_value)
+    source = (params.get("source") or "").strip()
+    if source:
+        queryset = queryset.filter(source=source)
+    event_type = (params.get("event_type") or "").strip()
+    if event_type:
+        queryset = queryset.filter(event_type=event_type)
+    return queryset
+
+
+def iter_csv(header, rows):
+    """Yield CSV text in ~64 KB pieces so the response never holds the whole file."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CSV_FLUSH_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def csv_response(filename, header, rows):
+    response = StreamingHttpResponse(iter_csv(header, rows), content_type="text/csv")
+    response["Content-Disposition"] = f"attachment; filename={filename}"
+    return response
+
+
+def fingerprint(request, queryset, timestamp_fields, extra_timestamps=(), deletion_key=None):
+    """Return ``(etag, last_modified)`` for a queryset from one aggregate query.
+
+    The ETag covers the row count and the latest value of each timestamp field,
+    so inserts, updates and deletions all change it. Deletions leave no
+    timestamp behind: ``deletion_key`` names the ``mark_deleted`` time read
+    in the same query, so Last-Modified moves forward with them too.
+    """
+    aggregates = {f"latest_{index}": Max(field) for index, field in enumerate(timestamp_fields)}
+    if deletion_key:
+        aggregates["deleted"] = Max(
+            Subquery(CacheGeneration.objects.filter(key=deletion_key).values("updated_at")[:1])
+        )
+    row = queryset.order_by().aggregate(count=Count("pk"), **aggregates)
+    timestamps = [row[f"latest_{index}"] for index in range(len(timestamp_fields))]
+    if deletion_key:
+        timestamps.append(row["deleted"])
+    timestamps.extend(extra_timestamps)
+    parts = [request.get_full_path(), str(row["count"])]
+    parts.extend(value.isoformat() if value else "" for value in timestamps)
+    etag = quote_etag(hashlib.sha1("|".join(parts).encode()).hexdigest())
+    last_modified = max((value for value in timestamps if value), default=None)
+    return etag, last_modified
+
+
+def latest_deletion():
+    return DeletionTombstone.objects.aggregate(latest=Max("deleted_at"))["latest"]
+
+
+def conditional_response(request, etag, last_modified, build_response):
+    """Answer 304 when the client's validators still match, else build the response."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = build_response()
+    response["ETag"] = etag
+    if timestamp is not None:
+        response["Last-Modified"] = http_date(timestamp)
+    return response
+
+
+def _idempotency_key(fields):
+    external_id = fields.get("external_id") or ""
+    return (fields["source"], external_id) if external_id else None
+
+
+def _existing_events(keys):
+    ids_by_source = defaultdict(list)
+    for source, external_id in keys:
+        ids_by_source[source].append(external_id)
+    if not ids_by_source:
+        return {}
+    query = Q()
+    for source, external_ids in ids_by_source.items():
+        query |= Q(source=source, external_id__in=external_ids)
+    return {(event.source, event.external_id): event for event in IntegrationEvent.objects.filter(query)}
+
+
+def _insert_events(field_sets):
+    keys = [_idempotency_key(fields) for fields in field_sets]
+    existing = _existing_events({key for key in keys if key})
+    outcome = []
+    to_create = []
+    for fields, key in zip(field_sets, keys):
+        event = existing.get(key) if key else None
+        if event is not None:
+            outcome.append((event, False))
+            continue
+        event = IntegrationEvent(**fields)
+        if key:
+            existing[key] = event
+        to_create.append(event)
+        outcome.append((event, True))
+    IntegrationEvent.objects.bulk_create(to_create, batch_size=settings.INTEGRATION_BULK_BATCH_SIZE)
+    return outcome
+
+
+def ingest_events(field_sets):
+    """Create events, reusing rows that already exist for ``(source, external_id)``.
+
+    Returns ``(event, created)`` pairs aligned with ``field_sets``. Events with an
+    external_id already stored (or repeated earlier in the same batch) resolve to
+    the existing row. If a concurrent sender inserts the same key between lookup
+    and insert, the unique constraint fires and the batch is retried once.
+    """
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                return _insert_events(field_sets)
+        except IntegrityError:
+            if attempt:
+                raise
+
+
+class ConditionalListMixin:
+    fingerprint_fields = ("updated_at",)
+    deletion_key = None
+
+    def get_extra_timestamps(self):
+        return ()
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag, last_modified = fingerprint(
+            request, queryset, self.fingerprint_fields, self.get_extra_timestamps(), self.deletion_key
+        )
+        return conditional_response(
+            request,
+            etag,
+            last_modified,
+            lambda: super(ConditionalListMixin, self).list(request, *args, **kwargs),
+        )
 
 
 class IsStaffUser(permissions.BasePermission):
@@ -22,9 +255,14 @@ class IsStaffUser(permissions.BasePermission):
         return bool(request.user and request.user.is_authenticated and request.user.is_staff)
 
 
-class IntegrationVolunteerViewSet(viewsets.ReadOnlyModelViewSet):
+class IntegrationVolunteerViewSet(ConditionalListMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = VolunteerProfileSerializer
     permission_classes = [IsStaffUser]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("volunteer_id",)
+    fingerprint_fields = ("updated_at", "constraints__updated_at")
+    deletion_key = VOLUNTEERS_DELETED
+
 
     def get_queryset(self):
         queryset = VolunteerProfile.objects.select_related("user", "constraints").all()
@@ -34,34 +272,22 @@ class IntegrationVolunteerViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
 
 
-class IntegrationAvailabilityViewSet(viewsets.ReadOnlyModelViewSet):
+class IntegrationAvailabilityViewSet(ConditionalListMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = AvailabilitySerializer
     permission_classes = [IsStaffUser]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("date", "start_time", "id")
+
+    def get_extra_timestamps(self):
+        return (latest_deletion(),)
 
     def get_queryset(self):
         queryset = Availability.objects.select_related("volunteer", "volunteer__user")
-        volunteer_id = self.request.query_params.get("volunteer_id")
-        if volunteer_id:
-            queryset = queryset.filter(volunteer__volunteer_id=volunteer_id)
-
-        start = self.request.query_params.get("start")
-        end = self.request.query_params.get("end")
-        if start:
-            try:
-                start_date = datetime.strptime(start, "%Y-%m-%d").date()
-                queryset = queryset.filter(date__gte=start_date)
-            except ValueError:
-                pass
-        if end:
-            try:
-                end_date = datetime.strptime(end, "%Y-%m-%d").date()
-                queryset = queryset.filter(date__lte=end_date)
-            except ValueError:
-                pass
-        return queryset
+        return filter_availabilities(queryset, self.request.query_params)
 
 
 class IntegrationEventViewSet(
+    ConditionalListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.UpdateModelMixin,
@@ -69,43 +295,97 @@ class IntegrationEventViewSet(
 ):
     serializer_class = IntegrationEventSerializer
     permission_classes = [IsStaffUser]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("created_at", "id")
+    deletion_key = EVENTS_DELETED
     queryset = IntegrationEvent.objects.all()
 
+
     def get_queryset(self):
-        queryset = super().get_queryset()
-        direction = (self.request.query_params.get("direction") or "").strip()
-        if direction:
-            queryset = queryset.filter(direction=direction)
-        status_value = (self.request.query_params.get("status") or "").strip()
-        if status_value:
-            queryset = queryset.filter(status=status_value)
-        source = (self.request.query_params.get("source") or "").strip()
-        if source:
-            queryset = queryset.filter(source=source)
-        event_type = (self.request.query_params.get("event_type") or "").strip()
-        if event_type:
-            queryset = queryset.filter(event_type=event_type)
-        return queryset
+        return filter_events(super().get_queryset(), self.request.query_params)
 
     def get_serializer_class(self):
         if self.action in {"update", "partial_update"}:
             return IntegrationEventStatusSerializer
         return IntegrationEventSerializer
 
-    def perform_create(self, serializer):
-        source = (serializer.validated_data.get("source") or "").strip()
+    def _routing_defaults(self, validated_data):
+        source = (validated_data.get("source") or "").strip()
         if not source:
             source = (self.request.headers.get("X-ASF-Source") or "").strip()
         if not source:
             raise ValidationError({"source": "source is required"})
-        target = (serializer.validated_data.get("target") or "").strip()
+        target = (validated_data.get("target") or "").strip()
         if not target:
             target = (self.request.headers.get("X-ASF-Target") or "").strip()
-        serializer.save(
-            source=source,
-            target=target,
-            direction=IntegrationDirection.INBOUND,
-            status=IntegrationStatus.PENDING,
+        return {
+            "source": source,
+            "target": target,
+            "direction": IntegrationDirection.INBOUND,
+            "status": IntegrationStatus.PENDING,
+        }
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        fields = {**serializer.validated_data, **self._routing_defaults(serializer.validated_data)}
+        [(event, created)] = ingest_events([fields])
+        data = IntegrationEventSerializer(event).data
+        return Response(
+            data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+            headers=self.get_success_headers(data),
+        )
+
+    @action(detail=False, methods=["post"], parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request):
+        """Create many events from a JSON array or an NDJSON body in one INSERT batch."""
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({"detail": "Expected a non-empty list of events."})
+        max_events = settings.INTEGRATION_BULK_MAX_EVENTS
+        if len(items) > max_events:
+            raise ValidationError({"detail": f"At most {max_events} events per request."})
+
+        results = [None] * len(items)
+        indexes = []
+        field_sets = []
+        for index, item in enumerate(items):
+            serializer = IntegrationEventSerializer(data=item)
+            try:
+                serializer.is_valid(raise_exception=True)
+                fields = {**serializer.validated_data, **self._routing_defaults(serializer.validated_data)}
+            except ValidationError as exc:
+                results[index] = {"index": index, "errors": exc.detail}
+                continue
+            indexes.append(index)
+            field_sets.append(fields)
+
+        created_count = 0
+        for index, (event, created) in zip(indexes, ingest_events(field_sets)):
+            results[index] = {"index": index, "id": event.pk}
+            if created:
+                created_count += 1
+            else:
+                results[index]["duplicate"] = True
+
+        failed = len(items) - len(field_sets)
+        if not field_sets:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif failed:
+            response_status = status.HTTP_207_MULTI_STATUS
+        elif created_count:
+            response_status = status.HTTP_201_CREATED
+        else:
+            response_status = status.HTTP_200_OK
+        return Response(
+            {
+                "created": created_count,
+                "duplicates": len(field_sets) - created_count,
+                "failed": failed,
+                "results": results,
+            },
+            status=response_status,
         )
 
     def perform_update(self, serializer):
@@ -117,84 +397,199 @@ class IntegrationEventViewSet(
             serializer.save()
 
 
+@gzip_page
 @api_view(["GET"])
 @authentication_classes([SessionAuthentication, TokenAuthentication])
 @permission_classes([IsStaffUser])
-def volunteers_csv(_request):
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = "attachment; filename=volunteers.csv"
-    writer = csv.writer(response)
-    writer.writerow(
-        [
-            "volunteer_id",
-            "first_name",
-            "last_name",
-            "short_name",
-            "email",
-            "phone",
-            "max_days_per_week",
-            "max_expeditions_per_week",
-            "max_expeditions_per_day",
-            "max_wait_hours",
-        ]
+def volunteers_csv(request):
+    queryset = VolunteerProfile.objects.order_by("volunteer_id")
+    etag, last_modified = fingerprint(
+        request, queryset, ("updated_at", "constraints__updated_at"), deletion_key=VOLUNTEERS_DELETED
     )
-    for profile in VolunteerProfile.objects.select_related("user", "constraints").all():
-        try:
-            constraints = profile.constraints
-        except VolunteerConstraint.DoesNotExist:
-            constraints = None
-        writer.writerow(
-            [
-                profile.volunteer_id,
-                profile.user.first_name,
-                profile.user.last_name,
-                profile.short_name,
-                profile.user.email,
-                profile.phone,
-                constraints.max_days_per_week if constraints else "",
-                constraints.max_expeditions_per_week if constraints else "",
-                constraints.max_expeditions_per_day if constraints else "",
-                constraints.max_wait_hours if constraints else "",
-            ]
+
+    def build_response():
+        rows = queryset.values_list(*[field for _column, field in VOLUNTEER_CSV_COLUMNS]).iterator(
+            chunk_size=CSV_CHUNK_SIZE
         )
-    return response
+        header = [column for column, _field in VOLUNTEER_CSV_COLUMNS]
+        return csv_response("volunteers.csv", header, rows)
 
+    return conditional_response(request, etag, last_modified, build_response)
 
+
+@gzip_page
 @api_view(["GET"])
 @authentication_classes([SessionAuthentication, TokenAuthentication])
 @permission_classes([IsStaffUser])
 def availabilities_csv(request):
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = "attachment; filename=availabilities.csv"
-    writer = csv.writer(response)
-    writer.writerow(["volunteer_id", "date", "start_time", "end_time"])
-    queryset = Availability.objects.select_related("volunteer")
+    queryset = filter_availabilities(Availability.objects.all(), request.query_params)
+    etag, last_modified = fingerprint(request, queryset, ("updated_at",), (latest_deletion(),))
 
-    volunteer_id = request.query_params.get("volunteer_id")
-    if volunteer_id:
-        queryset = queryset.filter(volunteer__volunteer_id=volunteer_id)
-    start = request.query_params.get("start")
-    end = request.query_params.get("end")
-    if start:
-        try:
-            start_date = datetime.strptime(start, "%Y-%m-%d").date()
-            queryset = queryset.filter(date__gte=start_date)
-        except ValueError:
-            pass
-    if end:
-        try:
-            end_date = datetime.strptime(end, "%Y-%m-%d").date()
-            queryset = queryset.filter(date__lte=end_date)
-        except ValueError:
-            pass
-
-    for availability in queryset:
-        writer.writerow(
-            [
-                availability.volunteer.volunteer_id,
-                availability.date.isoformat(),
-                availability.start_time.strftime("%H:%M"),
-                availability.end_time.strftime("%H:%M"),
-            ]
+    def build_response():
+        rows = (
+            (
+                volunteer_id,
+                date_value.isoformat(),
+                start_time.strftime("%H:%M"),
+                end_time.strftime("%H:%M"),
+            )
+            for volunteer_id, date_value, start_time, end_time in queryset.values_list(
+                "volunteer__volunteer_id",
+                "date",
+                "start_time",
+                "end_time",
+            ).iterator(chunk_size=CSV_CHUNK_SIZE)
         )
-    return response
+        return csv_response("availabilities.csv", ["volunteer_id", "date", "start_time", "end_time"], rows)
+
+    return conditional_response(request, etag, last_modified, build_response)
+
+
+@api_view(["GET"])
+@authentication_classes([SessionAuthentication, TokenAuthentication])
+@permission_classes([IsStaffUser])
+def availability_changes(request):
+    """Delta feed of availabilities/unavailabilities since a high-water mark.
+
+    Without ``since`` the full current state is returned. With ``since`` only
+    rows updated in ``(since, next_since]`` are returned, plus tombstones for
+    rows deleted in the same window. ``next_since`` lags ``now`` by
+    ``INTEGRATION_SYNC_LAG_SECONDS`` so transactions still in flight are picked
+    up by the next call rather than skipped.
+    """
+    now = timezone.now()
+    upper = now - timedelta(seconds=settings.INTEGRATION_SYNC_LAG_SECONDS)
+    since = None
+    since_param = (request.query_params.get("since") or "").strip()
+    if since_param:
+        # A raw "+01:00" offset arrives as a space when the caller forgot to encode it.
+        since = parse_datetime(since_param.replace(" ", "+"))
+        if since is None:
+            raise ValidationError({"since": "Invalid datetime"})
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        horizon = now - timedelta(days=settings.INTEGRATION_TOMBSTONE_RETENTION_DAYS)
+        if since < horizon:
+            return Response(
+                {"detail": "since is older than the tombstone retention, resync without since."},
+                status=status.HTTP_410_GONE,
+            )
+        upper = max(upper, since)
+
+    availabilities = Availability.objects.select_related("volunteer").filter(updated_at__lte=upper)
+    unavailabilities = Unavailability.objects.select_related("volunteer").filter(updated_at__lte=upper)
+    tombstones = DeletionTombstone.objects.none()
+    if since:
+        availabilities = availabilities.filter(updated_at__gt=since)
+        unavailabilities = unavailabilities.filter(updated_at__gt=since)
+        tombstones = DeletionTombstone.objects.filter(deleted_at__gt=since, deleted_at__lte=upper)
+
+    return Response(
+        {
+            "since": since,
+            "next_since": upper,
+            "availabilities": AvailabilityChangeSerializer(availabilities, many=True).data,
+            "unavailabilities": UnavailabilityChangeSerializer(unavailabilities, many=True).data,
+            "deleted": DeletionTombstoneSerializer(tombstones, many=True).data,
+        }
+    )
+
+
+def _parse_week_range(params, max_weeks):
+    today = timezone.localdate()
+    iso = today.isocalendar()
+    try:
+        year = int(params.get("year") or iso.year)
+        week = int(params.get("week") or iso.week)
+        weeks = int(params.get("weeks") or 1)
+        start = date.fromisocalendar(year, week, 1)
+    except ValueError:
+        raise ValidationError({"week": "Invalid ISO year/week"})
+    if not 1 <= weeks <= max_weeks:
+        raise ValidationError({"weeks": f"Must be between 1 and {max_weeks}"})
+    return start, weeks
+
+
+@gzip_page
+@api_view(["GET"])
+@authentication_classes([SessionAuthentication, TokenAuthentication])
+@permission_classes([IsStaffUser])
+def availability_matrix(request):
+    """Volunteer x day x quarter-hour matrix for ``weeks`` ISO weeks from ``year``/``week``."""
+    start, weeks = _parse_week_range(request.query_params, settings.INTEGRATION_MATRIX_MAX_WEEKS)
+    end = start + timedelta(days=7 * weeks - 1)
+    volunteers = VolunteerProfile.objects.all()
+    in_range = {"date__range": (start, end)}
+    extra = [
+        Availability.objects.filter(**in_range).aggregate(latest=Max("updated_at"))["latest"],
+        Unavailability.objects.filter(**in_range).aggregate(latest=Max("updated_at"))["latest"],
+        latest_deletion(),
+    ]
+    etag, last_modified = fingerprint(request, volunteers, ("updated_at", "constraints__updated_at"), extra)
+    return conditional_response(
+        request, etag, last_modified, lambda: Response(build_matrix(start, 7 * weeks, volunteers))
+    )
+
+
+@api_view(["GET"])
+@authentication_classes([SessionAuthentication, TokenAuthentication])
+@permission_classes([IsStaffUser])
+def available_volunteers(request):
+    """Volunteers whose availability covers ``start``-``end`` on ``date``, tightest fit first."""
+    params = request.query_params
+    day = _parse_date(params.get("date"))
+    start = _parse_time(params.get("start"))
+    end = _parse_time(params.get("end"))
+    errors = {}
+    if day is None:
+        errors["date"] = "Expected YYYY-MM-DD"
+    grid = f"Expected a quarter hour between {SLOT_START:%H:%M} and {SLOT_END:%H:%M}"
+    if start is None:
+        errors["start"] = "Expected HH:MM"
+    elif not on_grid(start):
+        errors["start"] = grid
+    if end is None:
+        errors["end"] = "Expected HH:MM"
+    elif not on_grid(end):
+        errors["end"] = grid
+    elif start is not None and start >= end:
+        errors["end"] = "Must be after start"
+    if errors:
+        raise ValidationError(errors)
+
+    window = end.hour * 60 + end.minute - start.hour * 60 - start.minute
+    rows = Availability.objects.available_for(day, start, end).values_list(
+        "volunteer__volunteer_id", "volunteer__short_name", "start_time", "end_time", "fit"
+    )
+    results = [
+        {
+            "volunteer_id": volunteer_id,
+            "short_name": short_name,
+            "start_time": start_time.strftime("%H:%M"),
+            "end_time": end_time.strftime("%H:%M"),
+            "slack_minutes": int(fit.total_seconds()) // 60 - window,
+        }
+        for volunteer_id, short_name, start_time, end_time, fit in rows
+    ]
+    return Response({"date": day, "start": start, "end": end, "results": results})
+
+
+@gzip_page
+@api_view(["GET"])
+@authentication_classes([SessionAuthentication, TokenAuthentication])
+@permission_classes([IsStaffUser])
+def availability_coverage(request):
+    """Available volunteer count per day and quarter-hour for ``weeks`` ISO weeks."""
+    start, weeks = _parse_week_range(request.query_params, settings.INTEGRATION_COVERAGE_MAX_WEEKS)
+    days = 7 * weeks
+    return Response(
+        {
+            "start": start,
+            "end": start + timedelta(days=days - 1),
+            "days": days,
+            "slot_start": SLOT_START.strftime("%H:%M"),
+            "slot_minutes": SLOT_MINUTES,
+            "slot_count": SLOT_COUNT,
+            "counts": coverage(start, days),
+        }
+    )
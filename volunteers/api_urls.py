@@ -1,7 +1,20 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .api import IntegrationAvailabilityViewSet, IntegrationEventViewSet, IntegrationVolunteerViewSet, availabilities_csv, volunteers_csv
+from .event_feed import events_poll, events_stream
+from .metrics import metrics_view
+
+from .api import (
+    IntegrationAvailabilityViewSet,
+    IntegrationEventViewSet,
+    IntegrationVolunteerViewSet,
+    availabilities_csv,
+    availability_changes,
+    availability_coverage,
+    availability_matrix,
+    available_volunteers,
+    volunteers_csv,
+)
 
 router = DefaultRouter()
 router.register("integrations/volunteers", IntegrationVolunteerViewSet, basename="integration-volunteers")
@@ -9,7 +22,14 @@ router.register("integrations/availabilities", IntegrationAvailabilityViewSet, b
 router.register("integrations/events", IntegrationEventViewSet, basename="integration-events")
 
 urlpatterns = [
-    path("", include(router.urls)),
     path("integrations/volunteers.csv", volunteers_csv, name="integration-volunteers-csv"),
     path("integrations/availabilities.csv", availabilities_csv, name="integration-availabilities-csv"),
+    path("integrations/changes/", availability_changes, name="integration-changes"),
+    path("integrations/matrix/", availability_matrix, name="integration-matrix"),
+    path("integrations/coverage/", availability_coverage, name="integration-coverage"),
+    path("integrations/available/", available_volunteers, name="integration-available"),
+    path("integrations/events/stream/", events_stream, name="integration-events-stream"),
+    path("integrations/events/poll/", events_poll, name="integration-events-poll"),
+    path("metrics/", metrics_view, name="metrics"),
+    path("", include(router.urls)),
 ]
@@ -0,0 +1,109 @@
+import gzip
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EVENTS_DELETED, IntegrationEvent, mark_deleted
+
+ARCHIVE_FIELDS = IntegrationEvent._meta.concrete_fields
+TIMESTAMP_FIELDS = ["created_at", "updated_at"]
+
+
+def _json_default(value):
+    # DjangoJSONEncoder drops microseconds, which restore must keep.
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def archive_path(root, day):
+    return Path(root) / f"{day:%Y}" / f"{day:%m}" / f"integration-events-{day:%Y-%m-%d}.ndjson.gz"
+
+
+def archive_events(queryset, root, batch_size=1000):
+    """Append events to per-day gzip NDJSON files, then delete them in batches.
+
+    Each batch is written (and the files closed) before its rows are deleted,
+    so a crash can at worst leave a row both archived and in the table; the
+    restore path tolerates such duplicates.
+    """
+    names = [field.attname for field in ARCHIVE_FIELDS]
+    queryset = queryset.order_by("created_at", "pk")
+    total = 0
+    while True:
+        batch = list(queryset.values(*names)[:batch_size])
+        if not batch:
+            return total
+        rows_by_day = defaultdict(list)
+        for row in batch:
+            rows_by_day[timezone.localdate(row["created_at"])].append(row)
+        for day, rows in rows_by_day.items():
+            path = archive_path(root, day)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(path, "at", encoding="utf-8") as handle:
+                for row in rows:
+                    handle.write(json.dumps(row, default=_json_default) + "\n")
+        with transaction.atomic():
+            IntegrationEvent.objects.filter(pk__in=[row["id"] for row in batch]).delete()
+            mark_deleted(EVENTS_DELETED)
+        total += len(batch)
+
+
+def restore_events(root, start, end, batch_size=1000):
+    """Reload archived events created between ``start`` and ``end`` (inclusive)."""
+    total = 0
+    day = start
+    while day <= end:
+        path = archive_path(root, day)
+        if path.exists():
+            chunk = []
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                for line in handle:
+                    if line.strip():
+                        chunk.append(json.loads(line))
+                    if len(chunk) >= batch_size:
+                        total += _restore_chunk(chunk)
+                        chunk = []
+            if chunk:
+                total += _restore_chunk(chunk)
+        day += timedelta(days=1)
+    return total
+
+
+def _restore_chunk(rows):
+    """Insert the archived events that are not in the table; return how many were restored.
+
+    Rows already present (same id, or same source/external_id) are left
+    untouched, so a second restore cannot rewind their timestamps.
+    """
+    events = {}
+    for row in rows:
+        event = IntegrationEvent(**{field.attname: field.to_python(row.get(field.attname)) for field in ARCHIVE_FIELDS})
+        # An event archived twice (see archive_events) appears twice in the file.
+        events.setdefault(event.pk, event)
+    with transaction.atomic():
+        present = set(IntegrationEvent.objects.filter(pk__in=list(events)).values_list("pk", flat=True))
+        external = set(
+            IntegrationEvent.objects.filter(
+                external_id__in={event.external_id for event in events.values() if event.external_id}
+            ).values_list("source", "external_id")
+        )
+        missing = [
+            event
+            for pk, event in events.items()
+            if pk not in present and (event.source, event.external_id) not in external
+        ]
+        if not missing:
+            return 0
+        timestamps = [[getattr(event, name) for name in TIMESTAMP_FIELDS] for event in missing]
+        IntegrationEvent.objects.bulk_create(missing, ignore_conflicts=True)
+        # bulk_create stamps auto_now/auto_now_add fields; put the archived values back.
+        for event, values in zip(missing, timestamps):
+            for name, value in zip(TIMESTAMP_FIELDS, values):
+                setattr(event, name, value)
+        IntegrationEvent.objects.bulk_update(missing, TIMESTAMP_FIELDS)
+    return len(missing)
@@ -0,0 +1,444 @@
+"""Reproducible benchmark dataset and timing harness.
+
+``seed`` fills the database with a dataset fully determined by its arguments:
+volunteers (with constraints) under the ``bench.invalid`` domain, a few weeks
+of availabilities and unavailabilities, and integration events. Running it
+again with the same arguments replaces the previous benchmark rows with
+identical ones; rows created through the application are left alone.
+
+``run`` replays the key paths in-process through the Django test client and
+reports, per scenario, latency percentiles, the number of SQL queries and the
+peak Python memory (``tracemalloc``, measured on one extra run so it does not
+slow down the timed ones). The result is plain JSON, meant to be saved per
+commit and compared with ``compare``.
+"""
+
+import csv
+import platform
+import random
+import subprocess
+import tempfile
+import time as clock
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date, time, timedelta
+from io import StringIO
+from pathlib import Path
+from typing import Callable, Optional
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from . import bulk, recap
+from .models import (
+    EVENTS_DELETED,
+    Availability,
+    IntegrationDirection,
+    IntegrationEvent,
+    IntegrationStatus,
+    Unavailability,
+    VolunteerConstraint,
+    VolunteerProfile,
+    mark_deleted,
+)
+from .outbox import week_start_for
+from .slots import interval_to_mask
+from .utils import generate_short_name
+
+BENCH_DOMAIN = "bench.invalid"
+BENCH_STAFF_EMAIL = f"staff@{BENCH_DOMAIN}"
+BENCH_VOLUNTEER_ID_START = 900_000
+BENCH_EVENT_SOURCE = "benchmark"
+DEFAULT_START = date(2026, 1, 5)
+PERCENTILES = (50, 90, 95, 99)
+
+FIRST_NAMES = ["Jean", "Marie", "Pierre", "Anne", "Luc", "Claire", "Paul", "Sophie", "Marc", "Julie"]
+LAST_NAMES = ["Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy", "Moreau"]
+EVENT_TYPES = ["volunteer.updated", "availability.week_changed", "expedition.assigned", "expedition.cancelled"]
+
+
+def bench_email(index):
+    return f"benevole{index:05d}@{BENCH_DOMAIN}"
+
+
+def _bench_emails():
+    return User.objects.filter(email__endswith=f"@{BENCH_DOMAIN}")
+
+
+def reset():
+    """Delete the benchmark rows and the outbound events they produced."""
+    with transaction.atomic():
+        with bulk._suspend_signals():
+            deleted, _ = _bench_emails().delete()
+        IntegrationEvent.objects.filter(source=BENCH_EVENT_SOURCE).delete()
+        IntegrationEvent.objects.filter(
+            direction=IntegrationDirection.OUTBOUND,
+            payload__volunteer_id__gte=BENCH_VOLUNTEER_ID_START,
+        ).delete()
+        mark_deleted(EVENTS_DELETED)
+        recap.bump_volunteers()
+    return deleted
+
+
+def _random_day(rng):
+    """``None`` (nothing entered), ``"unavailable"`` or a list of non-overlapping ``(start, end)``."""
+    roll = rng.random()
+    if roll < 0.25:
+        return None
+    if roll < 0.4:
+        return "unavailable"
+    slots = []
+    start = rng.randrange(7 * 4, 12 * 4)
+    for _ in range(rng.choice((1, 1, 2))):
+        end = min(start + rng.randrange(4, 20), 22 * 4)
+        slots.append((time(start // 4, start % 4 * 15), time(end // 4, end % 4 * 15)))
+        start = end + rng.randrange(2, 8)
+        if start >= 21 * 4:
+            break
+    return slots
+
+
+def seed(volunteers=200, weeks=8, events=1000, random_seed=0, start=DEFAULT_START, password=None):
+    """Replace the benchmark dataset; returns the number of rows created per table.
+
+    Accounts get an unusable password unless ``password`` is given (needed to
+    log in over HTTP, e.g. for ``load_test``). It is hashed once and shared.
+    """
+    rng = random.Random(random_seed)
+    start = week_start_for(start)
+    reset()
+    password = make_password(password)
+    with transaction.atomic():
+        users = [
+            User(
+                email=bench_email(index),
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                password=password,
+            )
+            for index in range(volunteers)
+        ]
+        users.append(
+            User(email=BENCH_STAFF_EMAIL, first_name="Bench", last_name="Staff", is_staff=True, password=password)
+        )
+        users = User.objects.bulk_create(users, batch_size=settings.INTEGRATION_BULK_BATCH_SIZE)
+        profiles = VolunteerProfile.objects.bulk_create(
+            [
+                VolunteerProfile(
+                    user=user,
+                    volunteer_id=BENCH_VOLUNTEER_ID_START + index,
+                    short_name=generate_short_name(user.first_name),
+                    phone=f"+33 6{rng.randrange(10**8):08d}",
+                    city=rng.choice(["Paris", "Roissy", "Orly", "Lyon"]),
+                    country="France",
+                )
+                for index, user in enumerate(users[:volunteers])
+            ],
+            batch_size=settings.INTEGRATION_BULK_BATCH_SIZE,
+        )
+        constraints = VolunteerConstraint.objects.bulk_create(
+            [
+                VolunteerConstraint(
+                    volunteer=profile,
+                    max_days_per_week=rng.choice([None, 2, 3, 5]),
+                    max_expeditions_per_week=rng.choice([None, 5, 10]),
+                    max_expeditions_per_day=rng.choice([None, 1, 2, 3]),
+                    max_wait_hours=rng.choice([None, 2, 4]),
+                )
+                for profile in profiles
+            ],
+            batch_size=settings.INTEGRATION_BULK_BATCH_SIZE,
+        )
+
+        availabilities = []
+        unavailabilities = []
+        for profile in profiles:
+            for offset in range(weeks * 7):
+                day = start + timedelta(days=offset)
+                entry = _random_day(rng)
+                if entry == "unavailable":
+                    unavailabilities.append(Unavailability(volunteer=profile, date=day))
+                elif entry:
+                    availabilities.extend(
+                        Availability(
+                            volunteer=profile,
+                            date=day,
+                            start_time=slot_start,
+                            end_time=slot_end,
+                            slot_mask=interval_to_mask(slot_start, slot_end),
+                        )
+                        for slot_start, slot_end in entry
+                    )
+        Availability.objects.bulk_create(availabilities, batch_size=settings.INTEGRATION_BULK_BATCH_SIZE)
+        Unavailability.objects.bulk_create(unavailabilities, batch_size=settings.INTEGRATION_BULK_BATCH_SIZE)
+
+        IntegrationEvent.objects.bulk_create(
+            [
+                IntegrationEvent(
+                    direction=rng.choice(IntegrationDirection.values),
+                    source=BENCH_EVENT_SOURCE,
+                    target="asf-benev",
+                    event_type=rng.choice(EVENT_TYPES),
+                    external_id=f"bench-{index:06d}",
+                    payload={"volunteer_id": BENCH_VOLUNTEER_ID_START + rng.randrange(max(volunteers, 1))},
+                    status=rng.choice(IntegrationStatus.values),
+                )
+                for index in range(events)
+            ],
+            batch_size=settings.INTEGRATION_BULK_BATCH_SIZE,
+        )
+        counts = {
+            "volunteers": len(profiles),
+            "constraints": len(constraints),
+            "availabilities": len(availabilities),
+            "unavailabilities": len(unavailabilities),
+            "events": events,
+        }
+    counts["recap_weeks"], _ = recap.rebuild(start, start + timedelta(days=weeks * 7 - 1))
+    recap.bump_volunteers()
+    return counts
+
+
+def percentile(values, rank):
+    """Linear-interpolated percentile of a sorted list."""
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * rank / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+@dataclass
+class Scenario:
+    name: str
+    call: Callable[[int], object]
+    setup: Optional[Callable[[int], None]] = None
+
+
+def measure(scenario, iterations, warmup=1):
+    for index in range(warmup):
+        if scenario.setup:
+            scenario.setup(index)
+        scenario.call(index)
+
+    durations = []
+    queries = []
+    for index in range(iterations):
+        if scenario.setup:
+            scenario.setup(index)
+        with CaptureQueriesContext(connection) as captured:
+            started = clock.perf_counter()
+            scenario.call(index)
+            durations.append((clock.perf_counter() - started) * 1000)
+        queries.append(len(captured))
+
+    if scenario.setup:
+        scenario.setup(iterations)
+    tracemalloc.start()
+    try:
+        scenario.call(iterations)
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    durations.sort()
+    result = {"iterations": iterations}
+    for rank in PERCENTILES:
+        result[f"p{rank}_ms"] = round(percentile(durations, rank), 3)
+    result.update(
+        {
+            "min_ms": round(durations[0], 3),
+            "max_ms": round(durations[-1], 3),
+            "mean_ms": round(sum(durations) / len(durations), 3),
+            "queries": max(queries),
+            "peak_memory_kb": round(peak / 1024, 1),
+        }
+    )
+    return result
+
+
+def _fetch(client, method, url, data=None, expected=(200,)):
+    response = getattr(client, method)(url, data or {})
+    if response.status_code not in expected:
+        raise RuntimeError(f"{method.upper()} {url}: HTTP {response.status_code}")
+    # Streaming responses (CSV exports) only do their work when consumed.
+    if response.streaming:
+        b"".join(response.streaming_content)
+    else:
+        response.content
+    return response
+
+
+def _client_host():
+    for host in settings.ALLOWED_HOSTS:
+        if host not in {"*", ""} and not host.startswith("."):
+            return host
+    return "localhost"
+
+
+def week_post_data(week_start, rng):
+    """A random submission of the weekly availability formset."""
+    data = {"week_start": week_start.isoformat(), "form-TOTAL_FORMS": "7", "form-INITIAL_FORMS": "0"}
+    for offset in range(7):
+        prefix = f"form-{offset}-"
+        data[prefix + "date"] = (week_start + timedelta(days=offset)).isoformat()
+        if rng.random() < 0.6:
+            data[prefix + "availability"] = "available"
+            data[prefix + "start_time"] = f"{rng.randrange(7, 12):02d}:00"
+            data[prefix + "end_time"] = f"{rng.randrange(14, 22):02d}:00"
+        else:
+            data[prefix + "availability"] = "unavailable"
+    return data
+
+
+def _write_import_file(directory, profiles):
+    path = Path(directory) / "benchmark_import.csv"
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["ID", "NOM", "PRENOM", "MAIL", "TELEPHONE", "MAX_JOURS_SEMAINE"])
+        for profile in profiles:
+            writer.writerow(
+                [
+                    profile.volunteer_id,
+                    profile.user.last_name,
+                    profile.user.first_name,
+                    profile.user.email,
+                    profile.phone,
+                    3,
+                ]
+            )
+    return path
+
+
+def scenarios(workdir, start=DEFAULT_START, random_seed=0):
+    """The benchmarked paths; raises ``LookupError`` when no benchmark dataset is loaded."""
+    staff = User.objects.filter(email=BENCH_STAFF_EMAIL).first()
+    profiles = list(
+        VolunteerProfile.objects.filter(volunteer_id__gte=BENCH_VOLUNTEER_ID_START)
+        .select_related("user")
+        .order_by("volunteer_id")
+    )
+    if not staff or not profiles:
+        raise LookupError("no benchmark dataset")
+    start = week_start_for(start)
+    week = start.isocalendar()
+    rng = random.Random(random_seed)
+
+    staff_client = Client(SERVER_NAME=_client_host())
+    staff_client.force_login(staff)
+    volunteer_client = Client(SERVER_NAME=_client_host())
+    volunteer_client.force_login(profiles[0].user)
+    import_path = _write_import_file(workdir, profiles)
+    recap_url = reverse("volunteer-availability-recap")
+    recap_params = {"year": week.year, "week": week.week}
+    create_url = reverse("volunteer-availability-create")
+
+    def api(name, **params):
+        return lambda _index: _fetch(staff_client, "get", reverse(name), params)
+
+    return [
+        Scenario(
+            "availability_recap",
+            lambda _index: _fetch(staff_client, "get", recap_url, recap_params),
+        ),
+        Scenario(
+            "availability_recap_uncached",
+            lambda _index: _fetch(staff_client, "get", recap_url, recap_params),
+            setup=lambda _index: cache.clear(),
+        ),
+        Scenario(
+            "availability_create",
+            lambda _index: _fetch(
+                volunteer_client, "post", create_url, week_post_data(start, rng), expected=(302,)
+            ),
+        ),
+        Scenario("volunteers_csv", api("integration-volunteers-csv")),
+        Scenario("availabilities_csv", api("integration-availabilities-csv")),
+        Scenario("integration_volunteers", api("integration-volunteers-list")),
+        Scenario(
+            "integration_availabilities",
+            api("integration-availabilities-list", start=start.isoformat(), end=(start + timedelta(days=6)).isoformat()),
+        ),
+        Scenario("integration_events", api("integration-events-list")),
+        Scenario(
+            "import_volunteers",
+            lambda _index: call_command(
+                "import_volunteers", str(import_path), "--update", "--dry-run", verbosity=0, stdout=StringIO()
+            ),
+        ),
+        Scenario(
+            "import_volunteers_bulk",
+            lambda _index: call_command(
+                "import_volunteers",
+                str(import_path),
+                "--update",
+                "--dry-run",
+                "--bulk",
+                verbosity=0,
+                stdout=StringIO(),
+            ),
+        ),
+    ]
+
+
+def _commit():
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+            timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return output.stdout.strip() if output.returncode == 0 else ""
+
+
+def run(iterations=20, warmup=1, only=None, start=DEFAULT_START):
+    with tempfile.TemporaryDirectory() as workdir:
+        selected = [scenario for scenario in scenarios(workdir, start) if not only or scenario.name in only]
+        results = {scenario.name: measure(scenario, iterations, warmup) for scenario in selected}
+    return {
+        "meta": {
+            "commit": _commit(),
+            "created_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "dataset": {
+                "volunteers": VolunteerProfile.objects.filter(volunteer_id__gte=BENCH_VOLUNTEER_ID_START).count(),
+                "availabilities": Availability.objects.count(),
+                "unavailabilities": Unavailability.objects.count(),
+                "events": IntegrationEvent.objects.count(),
+            },
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, tolerance=0.2):
+    """Scenarios slower (p95) or issuing more queries than ``baseline`` beyond ``tolerance``.
+
+    Returns a list of ``(scenario, metric, before, after)``.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        if result["queries"] > before["queries"]:
+            regressions.append((name, "queries", before["queries"], result["queries"]))
+        if result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append((name, "p95_ms", before["p95_ms"], result["p95_ms"]))
+    return regressions
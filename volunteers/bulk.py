@@ -0,0 +1,204 @@
+"""Set-based writes of whole days of availabilities.
+
+``replace_days`` rewrites a volunteer's availabilities and unavailabilities
+for a set of dates with one delete per table and bulk inserts, inside one
+transaction. The per-row signal handlers (tombstones, outbox, weekly recap)
+are suspended while it runs and their work is done once for the batch.
+
+``apply_pattern`` ("every Tuesday 09:00-17:00 until ...") and ``copy_week``
+expand into the same batched writes after a single conflict query over the
+whole target range.
+"""
+
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+
+from . import outbox, recap
+from .models import Availability, AvailabilityOverlap, DeletionTombstone, Unavailability, is_overlap_error
+from .slots import interval_to_mask
+
+_state = threading.local()
+
+
+class PatternConflict(Exception):
+    """Target dates already hold rows that the operation would overwrite."""
+
+    def __init__(self, dates):
+        self.dates = sorted(dates)
+        super().__init__(", ".join(day.isoformat() for day in self.dates))
+
+
+def signals_suspended():
+    return getattr(_state, "depth", 0) > 0
+
+
+@contextmanager
+def _suspend_signals():
+    _state.depth = getattr(_state, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _state.depth -= 1
+
+
+def _insert_availabilities(volunteer, availabilities):
+    """Insert ``(date, start, end)`` rows in bulk; the database checks them for overlaps in the same statement."""
+    rows = [
+        Availability(
+            volunteer=volunteer,
+            date=day,
+            start_time=start,
+            end_time=end,
+            slot_mask=interval_to_mask(start, end),
+        )
+        for day, start, end in availabilities
+    ]
+    try:
+        return Availability.objects.bulk_create(rows, batch_size=settings.INTEGRATION_BULK_BATCH_SIZE)
+    except IntegrityError as error:
+        if is_overlap_error(error):
+            raise AvailabilityOverlap() from error
+        raise
+
+
+def _raw_delete(queryset):
+    return queryset._raw_delete(queryset.db)
+
+
+def _weeks_changed(volunteer, dates):
+    for week_start in sorted({outbox.week_start_for(day) for day in dates}):
+        outbox.record(outbox.AVAILABILITY_WEEK_CHANGED, volunteer.pk, week_start, volunteer.volunteer_id)
+        recap.refresh_week(volunteer.pk, week_start)
+
+
+def replace_days(volunteer, availabilities, unavailable_dates, dates=None):
+    """Replace ``volunteer``'s rows on ``dates`` (every date mentioned by default), atomically.
+
+    ``availabilities`` is an iterable of ``(date, start_time, end_time)``;
+    ``unavailable_dates`` the dates to mark unavailable. Existing
+    availabilities on those dates are deleted; unavailabilities are kept,
+    removed or added so that exactly ``unavailable_dates`` remain. Returns
+    the created availabilities.
+    """
+    availabilities = list(availabilities)
+    unavailable_dates = set(unavailable_dates)
+    dates = set(dates or ()) | {day for day, _start, _end in availabilities} | unavailable_dates
+    if not dates:
+        return []
+
+    with outbox.coalesce(), _suspend_signals():
+        removed = list(
+            Availability.objects.filter(volunteer=volunteer, date__in=dates).values_list("pk", "date")
+        )
+        # Nothing references these rows and their signals are suspended: skip
+        # the collector's SELECT and issue the DELETE on the pks just read.
+        if removed:
+            _raw_delete(Availability.objects.filter(pk__in=[pk for pk, _day in removed]))
+
+        existing = dict(
+            Unavailability.objects.filter(volunteer=volunteer, date__in=dates).values_list("date", "pk")
+        )
+        dropped = [(pk, day) for day, pk in existing.items() if day not in unavailable_dates]
+        if dropped:
+            _raw_delete(Unavailability.objects.filter(pk__in=[pk for pk, _day in dropped]))
+
+        DeletionTombstone.objects.bulk_create(
+            [
+                DeletionTombstone(model_name=model._meta.model_name, object_id=pk, date=day)
+                for model, rows in ((Availability, removed), (Unavailability, dropped))
+                for pk, day in rows
+            ]
+        )
+        created = _insert_availabilities(volunteer, availabilities)
+        Unavailability.objects.bulk_create(
+            [Unavailability(volunteer=volunteer, date=day) for day in sorted(unavailable_dates - existing.keys())]
+        )
+        _weeks_changed(volunteer, dates)
+    return created
+
+
+def pattern_dates(first_day, last_day, weekdays):
+    """Dates between ``first_day`` and ``last_day`` (inclusive) whose weekday is in ``weekdays`` (0 = Monday)."""
+    weekdays = set(weekdays)
+    return [
+        first_day + timedelta(days=offset)
+        for offset in range((last_day - first_day).days + 1)
+        if (first_day + timedelta(days=offset)).weekday() in weekdays
+    ]
+
+
+def conflicting_dates(volunteer, dates, mask=None):
+    """Dates among ``dates`` holding an unavailability or an availability (overlapping ``mask`` if given).
+
+    Runs as one UNION query over both tables.
+    """
+    availabilities = Availability.objects.filter(volunteer=volunteer, date__in=dates)
+    if mask is not None:
+        availabilities = availabilities.overlapping(mask)
+    unavailabilities = Unavailability.objects.filter(volunteer=volunteer, date__in=dates)
+    return set(
+        availabilities.order_by().values_list("date", flat=True).union(
+            unavailabilities.order_by().values_list("date", flat=True)
+        )
+    )
+
+
+def apply_pattern(volunteer, weekdays, start_time, end_time, first_day, last_day, replace=False):
+    """Add ``start_time``-``end_time`` on each matching weekday from ``first_day`` to ``last_day``.
+
+    Without ``replace``, raises ``PatternConflict`` when a target day is
+    unavailable or already has an overlapping availability; other
+    availabilities of those days are kept. With ``replace``, the target days
+    are rewritten to hold only the pattern. Returns the created availabilities.
+    """
+    dates = pattern_dates(first_day, last_day, weekdays)
+    if not dates:
+        return []
+    rows = [(day, start_time, end_time) for day in dates]
+    if replace:
+        return replace_days(volunteer, rows, [])
+    with outbox.coalesce(), _suspend_signals():
+        conflicts = conflicting_dates(volunteer, dates, interval_to_mask(start_time, end_time))
+        if conflicts:
+            raise PatternConflict(conflicts)
+        created = _insert_availabilities(volunteer, rows)
+        _weeks_changed(volunteer, dates)
+    return created
+
+
+def copy_week(volunteer, source_week_start, weeks, replace=False):
+    """Copy the week starting ``source_week_start`` onto the ``weeks`` following weeks.
+
+    Each target week ends up identical to the source, empty days included.
+    Without ``replace``, raises ``PatternConflict`` when a target week already
+    holds any row. Returns the created availabilities.
+    """
+    source_end = source_week_start + timedelta(days=6)
+    source_availabilities = list(
+        Availability.objects.filter(volunteer=volunteer, date__range=(source_week_start, source_end)).values_list(
+            "date", "start_time", "end_time"
+        )
+    )
+    source_unavailable = list(
+        Unavailability.objects.filter(volunteer=volunteer, date__range=(source_week_start, source_end)).values_list(
+            "date", flat=True
+        )
+    )
+    target_start = source_week_start + timedelta(days=7)
+    dates = [target_start + timedelta(days=offset) for offset in range(7 * weeks)]
+    availabilities = [
+        (day + timedelta(days=7 * week), start, end)
+        for week in range(1, weeks + 1)
+        for day, start, end in source_availabilities
+    ]
+    unavailable = [day + timedelta(days=7 * week) for week in range(1, weeks + 1) for day in source_unavailable]
+    with outbox.coalesce():
+        if not replace:
+            conflicts = conflicting_dates(volunteer, dates)
+            if conflicts:
+                raise PatternConflict(conflicts)
+        return replace_days(volunteer, availabilities, unavailable, dates=dates)
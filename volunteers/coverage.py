@@ -0,0 +1,61 @@
+"""Number of available volunteers per day and quarter-hour slot.
+
+Availabilities are grouped by (date, slot_mask) in the database, then the
+masks are unpacked into a ``(rows, SLOT_COUNT)`` bit array and summed per day
+with NumPy. Without NumPy the same counts are accumulated bit by bit.
+"""
+
+from datetime import timedelta
+
+from django.db.models import Count
+
+from .models import Availability
+from .slots import SLOT_COUNT
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+_SHIFTS = np.arange(SLOT_COUNT, dtype=np.uint64) if np is not None else None
+
+
+def _grouped_masks(start, end):
+    return (
+        Availability.objects.filter(date__range=(start, end), slot_mask__gt=0)
+        .values_list("date", "slot_mask")
+        .annotate(total=Count("pk"))
+        .order_by()
+    )
+
+
+def _coverage_numpy(rows, start, days):
+    counts = np.zeros((days, SLOT_COUNT), dtype=np.int64)
+    if not rows:
+        return counts
+    dates, masks, totals = zip(*rows)
+    offsets = np.array([(value - start).days for value in dates], dtype=np.intp)
+    masks = np.array(masks, dtype=np.uint64)
+    totals = np.array(totals, dtype=np.int64)
+    bits = ((masks[:, None] >> _SHIFTS) & np.uint64(1)).astype(np.int64)
+    np.add.at(counts, offsets, bits * totals[:, None])
+    return counts
+
+
+def _coverage_python(rows, start, days):
+    counts = [[0] * SLOT_COUNT for _ in range(days)]
+    for value, mask, total in rows:
+        day_counts = counts[(value - start).days]
+        while mask:
+            low = mask & -mask
+            day_counts[low.bit_length() - 1] += total
+            mask ^= low
+    return counts
+
+
+def coverage(start, days):
+    """Return ``days`` lists of ``SLOT_COUNT`` volunteer counts starting at ``start``."""
+    rows = list(_grouped_masks(start, start + timedelta(days=days - 1)))
+    if np is None:
+        return _coverage_python(rows, start, days)
+    return _coverage_numpy(rows, start, days).tolist()
@@ -0,0 +1,218 @@
+"""Push feeds of newly created integration events.
+
+``events_stream`` is a Server-Sent Events endpoint for ASGI deployments
+(``asf_benev.asgi``); ``events_poll`` is the long-poll equivalent for WSGI.
+Both take the same filters as ``/api/integrations/events/`` and resume from an
+event id (``Last-Event-ID`` header or ``after`` parameter).
+
+Idle consumers share one probe for the newest deliverable id per process and
+poll interval; the filtered query only runs once that probe shows events past
+the consumer's cursor.
+
+Ids are assigned at insert time but become visible at commit, and outbound
+events are inserted at the end of request transactions: a lower id can
+appear after a higher one. The cursor therefore carries, besides the last
+id handed out, the ids below it that were not visible yet ("gaps"). Each
+fetch re-checks those few ids along with the new ones, so events go out as
+soon as they commit. A gap is dropped once an event with a higher id is older
+than ``INTEGRATION_FEED_GAP_SECONDS``: its transaction was rolled back, or
+the row was archived.
+
+A cursor is written ``<last id>`` or ``<last id>:<gap>.<gap>...``; it is the
+SSE event id and the ``cursor`` field of a long-poll response.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.authentication import SessionAuthentication, TokenAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .api import IsStaffUser, filter_events
+from .models import IntegrationEvent
+from .serializers import IntegrationEventSerializer
+
+FEED_BATCH_SIZE = 100
+HEARTBEAT_SECONDS = 15
+# Bounds the cursor; beyond that many open transactions the oldest gaps are given up.
+MAX_GAPS = 100
+
+
+class _Probe:
+    """Share the result of ``func()`` between consumers for ``max_age`` seconds."""
+
+    def __init__(self, func):
+        self._func = func
+        self._lock = threading.Lock()
+        self._value = 0
+        self._checked_at = None
+
+    def get(self, max_age):
+        with self._lock:
+            now = time.monotonic()
+            if self._checked_at is None or now - self._checked_at >= max_age:
+                self._value = self._func()
+                self._checked_at = now
+            return self._value
+
+
+def current_max_id():
+    """Id of the newest visible event (0 if none)."""
+    return IntegrationEvent.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+
+
+def gap_horizon():
+    """Ids below this one are no longer waited for: a higher id is older than the gap delay."""
+    cutoff = timezone.now() - timedelta(seconds=settings.INTEGRATION_FEED_GAP_SECONDS)
+    horizon = (
+        IntegrationEvent.objects.filter(created_at__lte=cutoff)
+        .order_by("-created_at", "-pk")
+        .values_list("pk", flat=True)
+        .first()
+    )
+    return horizon or 0
+
+
+_latest = _Probe(current_max_id)
+_horizon = _Probe(gap_horizon)
+
+
+def fetch_events(params, after_id, gaps=()):
+    """Return ``(events, cursor, gaps)`` for events past ``after_id`` or in ``gaps`` matching ``params``.
+
+    At most ``FEED_BATCH_SIZE`` ids are looked at. When fewer are visible, the
+    cursor jumps to the probed id so non-matching events are not rescanned on
+    every tick.
+    """
+    max_age = settings.INTEGRATION_FEED_POLL_SECONDS
+    latest = _latest.get(max_age)
+    gaps = set(gaps)
+    if latest <= after_id and not gaps:
+        return [], after_id, []
+    visible = list(
+        IntegrationEvent.objects.filter(Q(pk__gt=after_id, pk__lte=latest) | Q(pk__in=gaps))
+        .order_by("pk")
+        .values_list("pk", flat=True)[:FEED_BATCH_SIZE]
+    )
+    if len(visible) == FEED_BATCH_SIZE:
+        cursor = max(after_id, visible[-1])
+    else:
+        cursor = max(after_id, latest)
+    horizon = _horizon.get(max_age)
+    seen = set(visible)
+    gaps = {pk for pk in gaps if pk not in seen and pk > horizon}
+    # Only the highest MAX_GAPS missing ids are kept, so no need to look further down.
+    lowest = max(after_id, horizon, cursor - MAX_GAPS - len(visible))
+    gaps.update(pk for pk in range(lowest + 1, cursor + 1) if pk not in seen)
+    gaps = sorted(gaps)[-MAX_GAPS:]
+    events = []
+    if visible:
+        queryset = filter_events(IntegrationEvent.objects.filter(pk__in=visible), params)
+        events = IntegrationEventSerializer(queryset.order_by("pk"), many=True).data
+    return events, cursor, gaps
+
+
+def format_cursor(after_id, gaps):
+    if not gaps:
+        return str(after_id)
+    return f"{after_id}:{'.'.join(str(pk) for pk in gaps)}"
+
+
+def _parse_cursor(value):
+    """``(after_id, gaps)`` from a cursor written by ``format_cursor``, or None."""
+    if not value:
+        return None
+    after_id, _sep, gaps = str(value).partition(":")
+    try:
+        return int(after_id), [int(pk) for pk in gaps.split(".") if pk][:MAX_GAPS]
+    except ValueError:
+        return None
+
+
+def _is_allowed(request):
+    drf_request = Request(request, authenticators=[SessionAuthentication(), TokenAuthentication()])
+    try:
+        return IsStaffUser().has_permission(drf_request, None)
+    except APIException:
+        return False
+
+
+async def _sse_messages(params, after_id, gaps):
+    poll_seconds = settings.INTEGRATION_FEED_POLL_SECONDS
+    # Django 4.2 does not notice client disconnects on streams; bound each
+    # connection and let EventSource reconnect with Last-Event-ID.
+    deadline = time.monotonic() + settings.INTEGRATION_FEED_MAX_SECONDS
+    idle = 0.0
+    cursor = format_cursor(after_id, gaps)
+    yield f"retry: {int(poll_seconds * 1000)}\n\n"
+    while time.monotonic() < deadline:
+        events, after_id, gaps = await sync_to_async(fetch_events)(params, after_id, gaps)
+        previous, cursor = cursor, format_cursor(after_id, gaps)
+        # Only the last event of a batch carries the cursor: a client cut off
+        # mid-batch resumes from the previous one and gets the rest again.
+        for index, event in enumerate(events, start=1):
+            payload = json.dumps(event, cls=JSONEncoder)
+            event_id = f"id: {cursor}\n" if index == len(events) else ""
+            yield f"{event_id}event: {event['event_type']}\ndata: {payload}\n\n"
+        if events:
+            idle = 0.0
+            continue
+        if cursor != previous:
+            # No matching event, but the cursor moved: an id-only message updates Last-Event-ID.
+            yield f"id: {cursor}\n\n"
+        await asyncio.sleep(poll_seconds)
+        idle += poll_seconds
+        if idle >= HEARTBEAT_SECONDS:
+            idle = 0.0
+            yield ": keepalive\n\n"
+
+
+async def events_stream(request):
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"detail": "Server-Sent Events require the ASGI server; use /api/integrations/events/poll/."},
+            status=501,
+        )
+    if not await sync_to_async(_is_allowed)(request):
+        return JsonResponse({"detail": "Forbidden"}, status=403)
+    cursor = _parse_cursor(request.headers.get("Last-Event-ID") or request.GET.get("after"))
+    if cursor is None:
+        cursor = await sync_to_async(current_max_id)(), []
+    response = StreamingHttpResponse(_sse_messages(request.GET.copy(), *cursor), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@api_view(["GET"])
+@authentication_classes([SessionAuthentication, TokenAuthentication])
+@permission_classes([IsStaffUser])
+def events_poll(request):
+    params = request.query_params
+    try:
+        timeout = float(params.get("timeout", settings.INTEGRATION_FEED_LONG_POLL_SECONDS))
+    except ValueError:
+        timeout = settings.INTEGRATION_FEED_LONG_POLL_SECONDS
+    timeout = max(0.0, min(timeout, settings.INTEGRATION_FEED_LONG_POLL_SECONDS))
+    cursor = _parse_cursor(params.get("after") or request.headers.get("Last-Event-ID"))
+    after_id, gaps = cursor if cursor is not None else (current_max_id(), [])
+
+    deadline = time.monotonic() + timeout
+    events, after_id, gaps = fetch_events(params, after_id, gaps)
+    while not events and time.monotonic() < deadline:
+        time.sleep(settings.INTEGRATION_FEED_POLL_SECONDS)
+        events, after_id, gaps = fetch_events(params, after_id, gaps)
+    return Response({"last_id": after_id, "cursor": format_cursor(after_id, gaps), "events": events})
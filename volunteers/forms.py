@@ -1,13 +1,12 @@
-from datetime import time
-
 from django import forms
 
 from accounts.models import User
 from .models import Availability, VolunteerConstraint, VolunteerProfile
+from .slots import SLOT_END, SLOT_START
 from .utils import PHONE_COUNTRY_CHOICES, format_phone, normalize_phone_number, split_phone
 
-MIN_TIME = time(7, 0)
-MAX_TIME = time(22, 0)
+MIN_TIME = SLOT_START
+MAX_TIME = SLOT_END
 TIME_CHOICES = [("", "--:--")]
 for hour in range(7, 23):
     for minute in (0, 15, 30, 45):
@@ -155,19 +154,7 @@ class AvailabilityForm(forms.ModelForm):
             return cleaned
         if start >= end:
             raise forms.ValidationError("L'heure de fin doit etre apres l'heure de debut.")
-
-        if self.volunteer:
-            overlaps = Availability.objects.filter(
-                volunteer=self.volunteer,
-                date=date,
-                start_time__lt=end,
-                end_time__gt=start,
-            )
-            if self.instance.pk:
-                overlaps = overlaps.exclude(pk=self.instance.pk)
-            if overlaps.exists():
-                raise forms.ValidationError("Cette plage horaire chevauche une disponibilite existante.")
-
+        # Overlaps with other availabilities are rejected by the database on save.
         return cleaned
 
 
@@ -231,3 +218,76 @@ class AvailabilityWeekForm(forms.Form):
             return cleaned
 
         return cleaned
+
+
+WEEKDAY_CHOICES = [
+    (0, "Lundi"),
+    (1, "Mardi"),
+    (2, "Mercredi"),
+    (3, "Jeudi"),
+    (4, "Vendredi"),
+    (5, "Samedi"),
+    (6, "Dimanche"),
+]
+MAX_PATTERN_DAYS = 366
+MAX_COPY_WEEKS = 12
+
+
+class RecurringAvailabilityForm(forms.Form):
+    weekdays = forms.TypedMultipleChoiceField(
+        label="Jours",
+        choices=WEEKDAY_CHOICES,
+        coerce=int,
+        widget=forms.CheckboxSelectMultiple,
+    )
+    start_time = forms.TimeField(label="Heure premier vol", widget=TIME_SELECT_WIDGET)
+    end_time = forms.TimeField(label="Heure dernier vol", widget=TIME_SELECT_WIDGET)
+    first_day = forms.DateField(label="A partir du", widget=forms.DateInput(attrs={"type": "date"}))
+    last_day = forms.DateField(label="Jusqu'au", widget=forms.DateInput(attrs={"type": "date"}))
+    replace = forms.BooleanField(label="Remplacer les jours deja remplis", required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["start_time"].input_formats = ["%H:%M", "%H:%M:%S"]
+        self.fields["end_time"].input_formats = ["%H:%M", "%H:%M:%S"]
+
+    def clean(self):
+        cleaned = super().clean()
+        start = cleaned.get("start_time")
+        end = cleaned.get("end_time")
+        first_day = cleaned.get("first_day")
+        last_day = cleaned.get("last_day")
+        if start and end:
+            if start.minute % 15 != 0:
+                self.add_error("start_time", "Les minutes doivent etre par tranche de 15 minutes.")
+            if end.minute % 15 != 0:
+                self.add_error("end_time", "Les minutes doivent etre par tranche de 15 minutes.")
+            if start < MIN_TIME or start > MAX_TIME:
+                self.add_error("start_time", "L'heure doit etre entre 07:00 et 22:00.")
+            if end < MIN_TIME or end > MAX_TIME:
+                self.add_error("end_time", "L'heure doit etre entre 07:00 et 22:00.")
+            if not self.has_error("start_time") and not self.has_error("end_time") and start >= end:
+                self.add_error("end_time", "L'heure de fin doit etre apres l'heure de debut.")
+        if first_day and last_day:
+            if last_day < first_day:
+                self.add_error("last_day", "La date de fin doit etre apres la date de debut.")
+            elif (last_day - first_day).days >= MAX_PATTERN_DAYS:
+                self.add_error("last_day", f"La periode est limitee a {MAX_PATTERN_DAYS} jours.")
+        return cleaned
+
+
+class CopyWeekForm(forms.Form):
+    week_start = forms.DateField(widget=forms.HiddenInput)
+    weeks = forms.TypedChoiceField(
+        label="Copier sur les semaines suivantes",
+        choices=[(count, str(count)) for count in range(1, MAX_COPY_WEEKS + 1)],
+        coerce=int,
+        initial=1,
+    )
+    replace = forms.BooleanField(label="Remplacer les semaines deja remplies", required=False)
+
+    def clean_week_start(self):
+        value = self.cleaned_data["week_start"]
+        if value.weekday() != 0:
+            raise forms.ValidationError("La semaine doit commencer un lundi.")
+        return value
@@ -0,0 +1,198 @@
+"""Opt-in per-request timing: SQL queries, database time, view and template time.
+
+With ``REQUEST_INSTRUMENTATION=1``, ``InstrumentationMiddleware`` measures
+every request and reports it three ways:
+
+- a ``Server-Timing`` response header (shown by browser dev tools);
+- one JSON log line on the ``volunteers.instrumentation`` logger;
+- in-process totals per URL name, read with ``summary()``.
+
+With ``METRICS_ENABLED=1`` the same measures also feed the Prometheus
+histograms of ``volunteers.metrics``; the header and the log line stay off
+unless ``REQUEST_INSTRUMENTATION`` is set too.
+
+Queries are counted with a ``connection.execute_wrapper``, so the numbers are
+the same with ``DEBUG`` off. Streaming responses (the CSV exports) run most
+of their queries after the view returns: their header only covers the view,
+while the log line and the totals are written once the body is consumed.
+"""
+
+import json
+import logging
+import threading
+import time as clock
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.backends.django import Template
+
+from . import metrics as prometheus
+
+logger = logging.getLogger(__name__)
+
+_state = threading.local()
+_lock = threading.Lock()
+_totals = {}
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = clock.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.view_seconds = 0.0
+        self.total_seconds = 0.0
+        self._template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = clock.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += clock.perf_counter() - started
+            self.queries += 1
+
+    def server_timing(self):
+        return ", ".join(
+            [
+                f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries"',
+                f"view;dur={self.view_seconds * 1000:.1f}",
+                f"tpl;dur={self.template_seconds * 1000:.1f}",
+                f"total;dur={self.total_seconds * 1000:.1f}",
+            ]
+        )
+
+    def as_dict(self):
+        return {
+            "queries": self.queries,
+            "db_ms": round(self.db_seconds * 1000, 2),
+            "view_ms": round(self.view_seconds * 1000, 2),
+            "template_ms": round(self.template_seconds * 1000, 2),
+            "total_ms": round(self.total_seconds * 1000, 2),
+        }
+
+
+def current():
+    """Metrics of the request being handled by this thread, or None."""
+    return getattr(_state, "metrics", None)
+
+
+_original_render = Template.render
+
+
+def _timed_render(self, context=None, request=None):
+    metrics = current()
+    if metrics is None:
+        return _original_render(self, context, request)
+    # Only the outermost render counts; render_to_string inside a template would be counted twice.
+    metrics._template_depth += 1
+    started = clock.perf_counter()
+    try:
+        return _original_render(self, context, request)
+    finally:
+        metrics._template_depth -= 1
+        if not metrics._template_depth:
+            metrics.template_seconds += clock.perf_counter() - started
+
+
+def _route_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match and match.view_name:
+        return match.view_name
+    return "<unresolved>"
+
+
+def record(route, method, status, metrics):
+    """Add one finished request to the per-route totals and log it."""
+    values = metrics.as_dict()
+    with _lock:
+        totals = _totals.setdefault(
+            route,
+            {"requests": 0, "queries": 0, "max_queries": 0, "db_ms": 0.0, "total_ms": 0.0, "max_ms": 0.0},
+        )
+        totals["requests"] += 1
+        totals["queries"] += metrics.queries
+        totals["max_queries"] = max(totals["max_queries"], metrics.queries)
+        totals["db_ms"] += values["db_ms"]
+        totals["total_ms"] += values["total_ms"]
+        totals["max_ms"] = max(totals["max_ms"], values["total_ms"])
+    logger.info(json.dumps({"route": route, "method": method, "status": status, **values}, sort_keys=True))
+
+
+def summary():
+    """Per-route totals since the process started (or the last ``reset``), with averages."""
+    with _lock:
+        snapshot = {route: dict(values) for route, values in _totals.items()}
+    for values in snapshot.values():
+        values["avg_queries"] = round(values["queries"] / values["requests"], 2)
+        values["avg_ms"] = round(values["total_ms"] / values["requests"], 2)
+    return snapshot
+
+
+def reset():
+    with _lock:
+        _totals.clear()
+
+
+class InstrumentationMiddleware:
+    """Measure each request; disabled unless ``REQUEST_INSTRUMENTATION`` or ``METRICS_ENABLED`` is set."""
+
+    def __init__(self, get_response):
+        self.report = getattr(settings, "REQUEST_INSTRUMENTATION", False)
+        self.export = getattr(settings, "METRICS_ENABLED", False)
+        if not self.report and not self.export:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if self.report:
+            Template.render = _timed_render
+
+    def _finish(self, route, request, response, metrics):
+        if self.report:
+            record(route, request.method, response.status_code, metrics)
+        if self.export:
+            prometheus.get_store().observe(
+                route, metrics.total_seconds, metrics.queries, metrics.db_seconds, response.status_code
+            )
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        hooks = ExitStack()
+        for connection in connections.all():
+            hooks.enter_context(connection.execute_wrapper(metrics))
+        _state.metrics = metrics
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            _state.metrics = None
+            hooks.close()
+            raise
+        finished = clock.perf_counter()
+        metrics.total_seconds = finished - metrics.started
+        view_started = getattr(request, "_instrumentation_view_started", None)
+        if view_started is not None:
+            metrics.view_seconds = finished - view_started
+        if self.report:
+            response["Server-Timing"] = metrics.server_timing()
+
+        route = _route_name(request)
+        if not response.streaming:
+            _state.metrics = None
+            hooks.close()
+            self._finish(route, request, response, metrics)
+            return response
+
+        def finish():
+            _state.metrics = None
+            hooks.close()
+            metrics.total_seconds = clock.perf_counter() - metrics.started
+            self._finish(route, request, response, metrics)
+
+        # The server closes the response once the body is sent, or when the client goes away.
+        response._resource_closers.append(finish)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._instrumentation_view_started = clock.perf_counter()
@@ -0,0 +1,139 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import IntegrationDirection, IntegrationEvent, IntegrationStatus
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def register_handler(event_type):
+    """Register ``func(event)`` as the handler for inbound events of ``event_type``.
+
+    A handler that returns normally marks the event processed; any exception
+    marks it failed with the exception text as ``error_message``.
+    """
+
+    def decorator(func):
+        _registry[event_type] = func
+        return func
+
+    return decorator
+
+
+def get_handlers():
+    handlers = {
+        event_type: import_string(path)
+        for event_type, path in getattr(settings, "INTEGRATION_EVENT_HANDLERS", {}).items()
+    }
+    handlers.update(_registry)
+    return handlers
+
+
+def claim_events(worker_id, event_types, limit):
+    """Move up to ``limit`` pending inbound events to ``processing`` for this worker.
+
+    On Postgres the candidates are read with ``FOR UPDATE SKIP LOCKED`` so
+    concurrent workers never wait on each other. Elsewhere (SQLite) the
+    conditional UPDATE on ``status=pending`` is what keeps claims exclusive.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        candidates = IntegrationEvent.objects.filter(
+            direction=IntegrationDirection.INBOUND,
+            status=IntegrationStatus.PENDING,
+            event_type__in=list(event_types),
+        ).order_by("created_at")
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        ids = list(candidates.values_list("pk", flat=True)[:limit])
+        if not ids:
+            return []
+        IntegrationEvent.objects.filter(pk__in=ids, status=IntegrationStatus.PENDING).update(
+            status=IntegrationStatus.PROCESSING,
+            claimed_by=worker_id,
+            claimed_at=now,
+            updated_at=now,
+        )
+    return list(
+        IntegrationEvent.objects.filter(pk__in=ids, status=IntegrationStatus.PROCESSING, claimed_by=worker_id).order_by(
+            "created_at"
+        )
+    )
+
+
+def release_stale_claims(timeout_seconds):
+    """Put back events whose worker died mid-batch."""
+    now = timezone.now()
+    return IntegrationEvent.objects.filter(
+        direction=IntegrationDirection.INBOUND,
+        status=IntegrationStatus.PROCESSING,
+        claimed_at__lt=now - timedelta(seconds=timeout_seconds),
+    ).update(status=IntegrationStatus.PENDING, claimed_by="", claimed_at=None, updated_at=now)
+
+
+def _run_handler(handler, event):
+    try:
+        handler(event)
+    except Exception as exc:
+        logger.exception("Integration event %s (%s) failed", event.pk, event.event_type)
+        return str(exc) or exc.__class__.__name__
+    return None
+
+
+def close_pool_connections(executor, threads, force=False):
+    """Run ``close_old_connections()`` (``close()`` with ``force``) once in each pool thread.
+
+    Pool threads open their own connection on first ORM use and keep it for
+    the following events; the worker calls this between batches, as Django
+    does between requests, and with ``force`` on shutdown. The barrier makes
+    each of the ``threads`` tasks run on a different thread.
+    """
+    barrier = threading.Barrier(threads)
+
+    def close():
+        barrier.wait()
+        if force:
+            connection.close()
+        else:
+            close_old_connections()
+
+    for future in [executor.submit(close) for _ in range(threads)]:
+        future.result()
+
+
+def process_batch(events, handlers, executor):
+    """Run handlers for ``events`` on ``executor`` and store outcomes in one bulk update.
+
+    Only rows still claimed by the worker that claimed ``events`` are written:
+    if the claim went stale and another worker took the event over, the new
+    owner's result is kept.
+    """
+    if not events:
+        return 0, 0
+    futures = [executor.submit(_run_handler, handlers[event.event_type], event) for event in events]
+    now = timezone.now()
+    failed = 0
+    for event, future in zip(events, futures):
+        error = future.result()
+        if error:
+            failed += 1
+            event.status = IntegrationStatus.FAILED
+            event.error_message = error
+        else:
+            event.status = IntegrationStatus.PROCESSED
+            event.error_message = ""
+        event.processed_at = now
+        event.updated_at = now
+    owned = IntegrationEvent.objects.filter(status=IntegrationStatus.PROCESSING, claimed_by=events[0].claimed_by)
+    written = owned.bulk_update(events, ["status", "error_message", "processed_at", "updated_at"])
+    if written < len(events):
+        logger.warning("%s integration event(s) were claimed by another worker meanwhile", len(events) - written)
+    return len(events) - failed, failed
@@ -0,0 +1,315 @@
+"""Concurrent load generator for a running server (``runserver`` or gunicorn).
+
+Virtual volunteers log in through the login form with the accounts created
+by ``seed_benchmark_data --password``, then submit the weekly availability
+formset (page GET, then POST with the CSRF token) and read the recap.
+Integration clients poll the CSV exports and the ``/api/integrations/``
+endpoints, authenticated by the integration key or, without one, by the
+benchmark staff account. A thread pool draws actions from a weighted mix
+until the duration or request budget is spent.
+
+Only the standard library is used on the client side (``urllib``), so the
+tool runs wherever the project does. Requests go over plain HTTP: run the
+server with ``DJANGO_DEBUG=1`` so session and CSRF cookies are not marked
+secure.
+"""
+
+import queue
+import random
+import threading
+import time as clock
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+
+from django.urls import reverse
+
+from .benchmarks import BENCH_STAFF_EMAIL, DEFAULT_START, bench_email, percentile, week_post_data
+from .outbox import week_start_for
+
+VOLUNTEER_ACTIONS = ("week_form", "recap")
+INTEGRATION_ACTIONS = (
+    "volunteers_csv",
+    "availabilities_csv",
+    "volunteers_api",
+    "availabilities_api",
+    "events_api",
+)
+DEFAULT_MIX = {
+    "week_form": 4,
+    "recap": 3,
+    "volunteers_csv": 1,
+    "availabilities_csv": 1,
+    "volunteers_api": 1,
+    "availabilities_api": 1,
+    "events_api": 1,
+}
+REQUEST_TIMEOUT = 30
+
+
+class LoadTestError(Exception):
+    """The load test cannot start (bad mix, login refused, server unreachable)."""
+
+
+def parse_mix(text):
+    """``"week_form=4,recap=2"`` -> ``{"week_form": 4, "recap": 2}``."""
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in VOLUNTEER_ACTIONS + INTEGRATION_ACTIONS:
+            raise LoadTestError(f"Action inconnue: {name}")
+        try:
+            mix[name] = int(weight or 1)
+        except ValueError:
+            raise LoadTestError(f"Poids invalide pour {name}: {weight}")
+        if mix[name] < 0:
+            raise LoadTestError(f"Poids invalide pour {name}: {weight}")
+    if not any(mix.values()):
+        raise LoadTestError("Le melange ne contient aucune action.")
+    return mix
+
+
+class _NoRedirect(HTTPRedirectHandler):
+    # A redirect is a result to record (login, form POST), not something to follow.
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Session:
+    """One HTTP client with its own cookies, like one browser."""
+
+    def __init__(self, base_url, headers=None):
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers or {}
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies), _NoRedirect())
+
+    def request(self, method, path, params=None, data=None):
+        """Return the status code, reading the whole body; 0 when the server is unreachable."""
+        url = self.base_url + path
+        if params:
+            url += "?" + urlencode(params)
+        headers = dict(self.headers)
+        body = None
+        if data is not None:
+            body = urlencode(data).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+            headers["Referer"] = url
+        request = Request(url, data=body, headers=headers, method=method)
+        try:
+            with self.opener.open(request, timeout=REQUEST_TIMEOUT) as response:
+                response.read()
+                return response.status
+        except HTTPError as error:
+            error.read()
+            return error.code
+        except (URLError, OSError):
+            return 0
+
+    def csrf_token(self):
+        for cookie in self.cookies:
+            if cookie.name == "csrftoken":
+                return cookie.value
+        return ""
+
+    def login(self, email, password):
+        path = reverse("login")
+        self.request("GET", path)
+        status = self.request(
+            "POST",
+            path,
+            data={"username": email, "password": password, "csrfmiddlewaretoken": self.csrf_token()},
+        )
+        if status != 302:
+            raise LoadTestError(f"Connexion refusee pour {email} (HTTP {status}).")
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.durations = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.errors = Counter()
+
+    def record(self, endpoint, seconds, status, expected):
+        with self.lock:
+            self.durations[endpoint].append(seconds * 1000)
+            self.statuses[endpoint][status] += 1
+            if status not in expected:
+                self.errors[endpoint] += 1
+
+    def summary(self, elapsed):
+        endpoints = {}
+        for endpoint, durations in sorted(self.durations.items()):
+            durations = sorted(durations)
+            endpoints[endpoint] = {
+                "requests": len(durations),
+                "errors": self.errors[endpoint],
+                "error_rate": round(self.errors[endpoint] / len(durations), 4),
+                "throughput_rps": round(len(durations) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": round(percentile(durations, 50), 1),
+                "p95_ms": round(percentile(durations, 95), 1),
+                "p99_ms": round(percentile(durations, 99), 1),
+                "max_ms": round(durations[-1], 1),
+                "statuses": {str(code): count for code, count in sorted(self.statuses[endpoint].items())},
+            }
+        total = sum(item["requests"] for item in endpoints.values())
+        errors = sum(item["errors"] for item in endpoints.values())
+        return {
+            "requests": total,
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "elapsed_s": round(elapsed, 2),
+            "endpoints": endpoints,
+        }
+
+
+class LoadTest:
+    def __init__(
+        self,
+        base_url,
+        users=20,
+        password=None,
+        api_key="",
+        mix=None,
+        concurrency=10,
+        duration=30.0,
+        requests=None,
+        start=DEFAULT_START,
+        weeks=4,
+        random_seed=0,
+    ):
+        self.base_url = base_url
+        self.users = users
+        self.password = password
+        self.api_key = api_key
+        self.mix = mix or DEFAULT_MIX
+        self.concurrency = concurrency
+        self.duration = duration
+        self.requests = requests
+        self.weeks = [week_start_for(start) + timedelta(weeks=offset) for offset in range(max(weeks, 1))]
+        self.random_seed = random_seed
+        self.stats = Stats()
+        self.login_stats = Stats()
+        self._claimed = 0
+        self._claim_lock = threading.Lock()
+
+    def _timed(self, endpoint, session, method, path, expected=(200,), **kwargs):
+        started = clock.perf_counter()
+        status = session.request(method, path, **kwargs)
+        self.stats.record(endpoint, clock.perf_counter() - started, status, expected)
+        return status
+
+    def _login(self, email):
+        session = Session(self.base_url)
+        started = clock.perf_counter()
+        try:
+            session.login(email, self.password)
+        except LoadTestError:
+            self.login_stats.record("login", clock.perf_counter() - started, 0, (302,))
+            raise
+        self.login_stats.record("login", clock.perf_counter() - started, 302, (302,))
+        return session
+
+    def _integration_session(self):
+        if self.api_key:
+            return Session(self.base_url, headers={"X-ASF-Integration-Key": self.api_key})
+        if self.password is None:
+            raise LoadTestError("Il faut une cle d'integration ou le mot de passe des comptes de benchmark.")
+        return self._login(BENCH_STAFF_EMAIL)
+
+    def _week_params(self, rng):
+        week = rng.choice(self.weeks)
+        meta = week.isocalendar()
+        return week, {"year": meta.year, "week": meta.week}
+
+    def _act(self, action, rng, volunteers, integration):
+        if action in VOLUNTEER_ACTIONS:
+            session = volunteers.get()
+            try:
+                week, params = self._week_params(rng)
+                if action == "recap":
+                    self._timed("recap", session, "GET", reverse("volunteer-availability-recap"), params=params)
+                    return
+                path = reverse("volunteer-availability-create")
+                if self._timed("week_form:get", session, "GET", path, params=params) != 200:
+                    return
+                data = week_post_data(week, rng)
+                data["csrfmiddlewaretoken"] = session.csrf_token()
+                self._timed("week_form:post", session, "POST", path, expected=(302,), data=data)
+            finally:
+                volunteers.put(session)
+            return
+
+        week, _params = self._week_params(rng)
+        window = {"start": week.isoformat(), "end": (week + timedelta(days=6)).isoformat()}
+        if action == "volunteers_csv":
+            self._timed(action, integration, "GET", reverse("integration-volunteers-csv"))
+        elif action == "availabilities_csv":
+            self._timed(action, integration, "GET", reverse("integration-availabilities-csv"), params=window)
+        elif action == "volunteers_api":
+            self._timed(action, integration, "GET", reverse("integration-volunteers-list"))
+        elif action == "availabilities_api":
+            self._timed(action, integration, "GET", reverse("integration-availabilities-list"), params=window)
+        elif action == "events_api":
+            self._timed(action, integration, "GET", reverse("integration-events-list"), params={"status": "pending"})
+
+    def _claim(self, deadline):
+        if clock.monotonic() >= deadline:
+            return False
+        if self.requests is None:
+            return True
+        with self._claim_lock:
+            if self._claimed >= self.requests:
+                return False
+            self._claimed += 1
+            return True
+
+    def _worker(self, index, deadline, volunteers, integration):
+        rng = random.Random(self.random_seed * 1000 + index)
+        actions = [name for name, weight in self.mix.items() if weight]
+        weights = [self.mix[name] for name in actions]
+        while self._claim(deadline):
+            self._act(rng.choices(actions, weights)[0], rng, volunteers, integration)
+
+    def run(self):
+        uses_volunteers = any(self.mix.get(name) for name in VOLUNTEER_ACTIONS)
+        uses_integration = any(self.mix.get(name) for name in INTEGRATION_ACTIONS)
+        if uses_volunteers and (self.password is None or self.users < 1):
+            raise LoadTestError("Les actions benevoles demandent --users et le mot de passe des comptes de benchmark.")
+
+        login_started = clock.monotonic()
+        integration = self._integration_session() if uses_integration else None
+        # A logged-in volunteer is used by one thread at a time, like a person.
+        volunteers = queue.Queue()
+        # Logins are set-up, not load: one at a time, so a locked SQLite file cannot abort the run.
+        for index in range(self.users if uses_volunteers else 0):
+            volunteers.put(self._login(bench_email(index)))
+        login_elapsed = clock.monotonic() - login_started
+
+        started = clock.monotonic()
+        deadline = started + self.duration if self.duration else float("inf")
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = [
+                executor.submit(self._worker, index, deadline, volunteers, integration)
+                for index in range(self.concurrency)
+            ]
+            for future in futures:
+                future.result()
+        report = self.stats.summary(clock.monotonic() - started)
+        report["login"] = self.login_stats.summary(login_elapsed)
+        report["config"] = {
+            "url": self.base_url,
+            "users": self.users if uses_volunteers else 0,
+            "concurrency": self.concurrency,
+            "mix": self.mix,
+            "duration_s": self.duration,
+            "requests": self.requests,
+        }
+        return report
+
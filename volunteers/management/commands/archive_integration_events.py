@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from volunteers.archive import archive_events
+from volunteers.models import IntegrationEvent, IntegrationStatus
+
+
+class Command(BaseCommand):
+    help = "Archive (gzip NDJSON par jour) puis supprime les evenements d'integration traites anciens."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.INTEGRATION_EVENT_RETENTION_DAYS,
+            help="Age minimum en jours (INTEGRATION_EVENT_RETENTION_DAYS par defaut)",
+        )
+        parser.add_argument("--include-failed", action="store_true", help="Archiver aussi les evenements en echec")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Evenements par lot")
+        parser.add_argument("--dry-run", action="store_true", help="Compter sans archiver")
+
+    def handle(self, *args, **options):
+        statuses = [IntegrationStatus.PROCESSED]
+        if options["include_failed"]:
+            statuses.append(IntegrationStatus.FAILED)
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        queryset = IntegrationEvent.objects.filter(status__in=statuses, created_at__lt=cutoff)
+
+        if options["dry_run"]:
+            self.stdout.write(f"Evenements a archiver: {queryset.count()}")
+            return
+
+        archived = archive_events(queryset, settings.INTEGRATION_ARCHIVE_DIR, options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Evenements archives: {archived} (dans {settings.INTEGRATION_ARCHIVE_DIR}).")
+        )
@@ -1,12 +1,25 @@
 import csv
+import hashlib
+import json
+import os
+import time as clock
 import unicodedata
+from collections import deque
+from contextlib import ExitStack
+from itertools import islice
 from pathlib import Path
 
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
 
 from accounts.models import User
+from volunteers import outbox, recap
 from volunteers.models import VolunteerConstraint, VolunteerProfile
+from volunteers.utils import generate_short_name
 
 try:
     import openpyxl
@@ -60,13 +73,153 @@ def normalize_phone(value):
     return text.replace(" ", "")
 
 
+CONSTRAINT_FIELDS = ["max_days_per_week", "max_expeditions_per_week", "max_expeditions_per_day", "max_wait_hours"]
+
+
+def parse_identity(mapped):
+    """``(volunteer_id, email, first_name, last_name)`` of a mapped row, or None without id or email."""
+    volunteer_id = parse_int(mapped.get("volunteer_id"))
+    email = (mapped.get("email") or "").strip().lower()
+    if not volunteer_id or not email:
+        return None
+
+    first_name = (mapped.get("first_name") or "").strip()
+    last_name = (mapped.get("last_name") or "").strip()
+    full_name = (mapped.get("full_name") or "").strip()
+    if full_name and (not first_name or not last_name):
+        parts = full_name.split()
+        if len(parts) >= 2:
+            last_name = last_name or parts[0]
+            first_name = first_name or " ".join(parts[1:])
+        elif not first_name:
+            first_name = full_name
+    return volunteer_id, email, first_name, last_name
+
+
+def resolve_columns(headers):
+    """``[(index, field)]`` for the recognised columns, resolved once per file."""
+    columns = []
+    for index, header in enumerate(headers):
+        target = HEADER_MAP.get(normalize_header(header))
+        if target:
+            columns.append((index, target))
+    return columns
+
+
+def map_rows(rows):
+    """Turn an iterator of raw rows (header first) into mapped dicts, lazily."""
+    headers = next(rows, None)
+    if headers is None:
+        return
+    columns = resolve_columns(headers)
+    for row in rows:
+        yield {field: row[index] if index < len(row) else None for index, field in columns}
+
+
+def read_rows(path: Path):
+    """Mapped rows of a CSV or XLSX file, read one at a time."""
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        with path.open(newline="", encoding="utf-8-sig") as handle:
+            # Blank lines are ignored, as csv.DictReader does.
+            yield from map_rows(row for row in csv.reader(handle) if row)
+        return
+    if suffix in {".xlsx", ".xlsm"}:
+        if openpyxl is None:
+            raise CommandError("openpyxl n'est pas installe. Ajoutez-le dans requirements.txt.")
+        workbook = openpyxl.load_workbook(path, read_only=True)
+        try:
+            yield from map_rows(workbook.active.iter_rows(values_only=True))
+        finally:
+            workbook.close()
+        return
+    raise CommandError("Format non supporte. Utilisez CSV ou XLSX.")
+
+
+def chunks(rows, size):
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def digested(rows, digest):
+    """Pass rows through, adding each one to ``digest``."""
+    for mapped in rows:
+        digest.update(json.dumps(mapped, sort_keys=True, default=str).encode())
+        yield mapped
+
+
+class Checkpoint:
+    """Progress of an import, saved after each committed batch so it can be resumed.
+
+    Besides the counts, the file keeps a digest of the rows already imported:
+    rows after the checkpoint may be corrected before resuming, rows before
+    it may not. The file is written after its batch commits, not with it, so
+    a crash in between replays that batch on resume.
+    """
+
+    def __init__(self, path, source: Path):
+        self.path = Path(path)
+        self.source = str(source.resolve())
+
+    def load(self):
+        if not self.path.exists():
+            return None
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Point de reprise illisible: {self.path} ({exc})")
+        if data.get("source") != self.source:
+            raise CommandError(f"Le point de reprise {self.path} correspond a un autre fichier: {data.get('source')}")
+        return data["progress"]
+
+    def save(self, progress):
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        temporary.write_text(json.dumps({"source": self.source, "progress": progress}), encoding="utf-8")
+        os.replace(temporary, self.path)
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+
+
 class Command(BaseCommand):
-    help = "Importe des benevoles depuis un fichier CSV ou XLSX."
+    help = (
+        "Importe des benevoles depuis un fichier CSV ou XLSX, lu en flux et enregistre par lots "
+        "(une transaction par lot)."
+    )
 
     def add_arguments(self, parser):
         parser.add_argument("path", type=str, help="Chemin vers le fichier CSV ou XLSX")
         parser.add_argument("--update", action="store_true", help="Mettre a jour les benevoles existants")
         parser.add_argument("--dry-run", action="store_true", help="Afficher sans enregistrer")
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help="Import ensembliste : quelques requetes par lot au lieu de plusieurs par ligne",
+        )
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=settings.INTEGRATION_BULK_BATCH_SIZE,
+            help="Nombre de lignes par lot, chaque lot etant enregistre dans sa propre transaction",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default=None,
+            help=(
+                "Fichier de reprise, mis a jour apres chaque lot enregistre et supprime en fin d'import. "
+                "Il est ecrit apres le commit du lot : un arret entre les deux fait rejouer ce lot a la reprise, "
+                "ses lignes etant alors comptees comme ignorees ou mises a jour"
+            ),
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Reprendre apres le dernier lot enregistre dans --checkpoint",
+        )
         parser.add_argument(
             "--default-password",
             dest="default_password",
@@ -78,114 +231,264 @@ class Command(BaseCommand):
         path = Path(options["path"])
         if not path.exists():
             raise CommandError(f"Fichier introuvable: {path}")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size doit etre superieur a 0.")
+        if options["resume"] and not options["checkpoint"]:
+            raise CommandError("--resume demande --checkpoint.")
+
+        checkpoint = Checkpoint(options["checkpoint"], path) if options["checkpoint"] else None
+        progress = {"rows": 0, "created": 0, "updated": 0, "skipped": 0, "digest": ""}
+        if options["resume"]:
+            progress = checkpoint.load() or progress
+            if progress["rows"]:
+                self._progress(f"Reprise apres la ligne {progress['rows']}.", options)
 
-        rows = self._load_rows(path)
-        if not rows:
+        digest = hashlib.sha256()
+        rows = digested(read_rows(path), digest)
+        if progress["rows"]:
+            # Rows already committed are read again (the file is a stream) but not imported.
+            deque(islice(rows, progress["rows"]), maxlen=0)
+            if digest.hexdigest() != progress["digest"]:
+                raise CommandError("Les lignes deja importees ont change depuis le point de reprise.")
+        password = make_password(options["default_password"]) if options["default_password"] else None
+        started = clock.monotonic()
+        imported = 0
+
+        with ExitStack() as stack:
+            if options["dry_run"]:
+                # One transaction rolled back at the end, so later batches still see the earlier ones.
+                stack.enter_context(transaction.atomic())
+            for chunk in chunks(rows, options["batch_size"]):
+                with transaction.atomic():
+                    if options["bulk"]:
+                        created, updated, skipped = self._import_bulk(chunk, options, password)
+                    else:
+                        created, updated, skipped = self._import_rows(chunk, options)
+                imported += len(chunk)
+                progress = {
+                    "rows": progress["rows"] + len(chunk),
+                    "created": progress["created"] + created,
+                    "updated": progress["updated"] + updated,
+                    "skipped": progress["skipped"] + skipped,
+                    "digest": digest.hexdigest(),
+                }
+                if checkpoint and not options["dry_run"]:
+                    checkpoint.save(progress)
+                elapsed = clock.monotonic() - started
+                self._progress(
+                    f"{progress['rows']} lignes traitees ({imported / elapsed if elapsed else 0:.0f} lignes/s).",
+                    options,
+                )
+            if options["dry_run"]:
+                transaction.set_rollback(True)
+
+        if not progress["rows"]:
             raise CommandError("Aucune ligne detectee dans le fichier.")
+        if checkpoint:
+            checkpoint.clear()
 
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Import termine. Crees: {progress['created']}, mis a jour: {progress['updated']}, "
+                f"ignores: {progress['skipped']}."
+            )
+        )
+
+    def _progress(self, message, options):
+        if options["verbosity"] >= 1:
+            self.stderr.write(message)
+
+    def _import_rows(self, rows, options):
         created = 0
         updated = 0
         skipped = 0
 
-        with transaction.atomic():
-            for row in rows:
-                mapped = self._map_row(row)
-                volunteer_id = parse_int(mapped.get("volunteer_id"))
-                email = (mapped.get("email") or "").strip().lower()
-                if not volunteer_id or not email:
+        for mapped in rows:
+            identity = parse_identity(mapped)
+            if identity is None:
+                skipped += 1
+                continue
+            volunteer_id, email, first_name, last_name = identity
+
+            profile = VolunteerProfile.objects.filter(volunteer_id=volunteer_id).select_related("user").first()
+            was_existing = bool(profile)
+            if profile:
+                if not options["update"]:
                     skipped += 1
                     continue
+                user = profile.user
+            else:
+                user = User.objects.filter(email=email).first()
 
-                first_name = (mapped.get("first_name") or "").strip()
-                last_name = (mapped.get("last_name") or "").strip()
-                full_name = (mapped.get("full_name") or "").strip()
-                if full_name and (not first_name or not last_name):
-                    parts = full_name.split()
-                    if len(parts) >= 2:
-                        last_name = last_name or parts[0]
-                        first_name = first_name or " ".join(parts[1:])
-                    elif not first_name:
-                        first_name = full_name
-
-                profile = VolunteerProfile.objects.filter(volunteer_id=volunteer_id).select_related("user").first()
-                was_existing = bool(profile)
-                if profile:
-                    if not options["update"]:
-                        skipped += 1
-                        continue
-                    user = profile.user
-                else:
-                    user = User.objects.filter(email=email).first()
-
-                if user and not profile:
-                    profile = VolunteerProfile(user=user, volunteer_id=volunteer_id)
-
-                if not user:
-                    user = User.objects.create_user(
-                        email=email,
-                        password=options["default_password"],
-                        first_name=first_name,
-                        last_name=last_name,
-                    )
-                else:
-                    user.first_name = first_name or user.first_name
-                    user.last_name = last_name or user.last_name
-                    user.email = email
-                    user.save(update_fields=["first_name", "last_name", "email"])
-
-                if not profile:
-                    profile = VolunteerProfile(user=user, volunteer_id=volunteer_id)
-
-                profile.short_name = mapped.get("short_name", "")
-                profile.phone = normalize_phone(mapped.get("phone"))
-                profile.save()
-
-                constraints, _ = VolunteerConstraint.objects.get_or_create(volunteer=profile)
-                constraints.max_days_per_week = parse_int(mapped.get("max_days_per_week"))
-                constraints.max_expeditions_per_week = parse_int(mapped.get("max_expeditions_per_week"))
-                constraints.max_expeditions_per_day = parse_int(mapped.get("max_expeditions_per_day"))
-                constraints.max_wait_hours = parse_int(mapped.get("max_wait_hours"))
-                constraints.save()
-
-                if was_existing:
-                    updated += 1
-                else:
-                    created += 1
+            if user and not profile:
+                profile = VolunteerProfile(user=user, volunteer_id=volunteer_id)
 
-            if options["dry_run"]:
-                transaction.set_rollback(True)
+            if not user:
+                user = User.objects.create_user(
+                    email=email,
+                    password=options["default_password"],
+                    first_name=first_name,
+                    last_name=last_name,
+                )
+            else:
+                user.first_name = first_name or user.first_name
+                user.last_name = last_name or user.last_name
+                user.email = email
+                user.save(update_fields=["first_name", "last_name", "email"])
 
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"Import termine. Crees: {created}, mis a jour: {updated}, ignores: {skipped}."
+            if not profile:
+                profile = VolunteerProfile(user=user, volunteer_id=volunteer_id)
+
+            profile.short_name = mapped.get("short_name", "")
+            profile.phone = normalize_phone(mapped.get("phone"))
+            profile.save()
+
+            constraints, _ = VolunteerConstraint.objects.get_or_create(volunteer=profile)
+            constraints.max_days_per_week = parse_int(mapped.get("max_days_per_week"))
+            constraints.max_expeditions_per_week = parse_int(mapped.get("max_expeditions_per_week"))
+            constraints.max_expeditions_per_day = parse_int(mapped.get("max_expeditions_per_day"))
+            constraints.max_wait_hours = parse_int(mapped.get("max_wait_hours"))
+            constraints.save()
+
+            if was_existing:
+                updated += 1
+            else:
+                created += 1
+
+        return created, updated, skipped
+
+    def _import_bulk(self, rows, options, password):
+        """Same result as ``_import_rows`` with a fixed number of queries per batch.
+
+        The users, profiles and constraints the batch refers to are loaded in
+        three queries (users matched on email, profiles on
+        ``volunteer_id``), rows are applied to those objects in memory (a later
+        row sees the effect of an earlier one, as in the row-by-row import),
+        then the differences are written with ``bulk_create``/``bulk_update``.
+        The signals that ``save()`` would fire are replaced by one outbox event
+        per volunteer and one recap bump.
+        """
+        batch_size = options["batch_size"]
+        entries = [(parse_identity(mapped), mapped) for mapped in rows]
+        volunteer_ids = {identity[0] for identity, _mapped in entries if identity}
+        emails = {identity[1] for identity, _mapped in entries if identity}
+
+        profiles = {
+            profile.volunteer_id: profile
+            for profile in VolunteerProfile.objects.filter(volunteer_id__in=volunteer_ids).select_related("user")
+        }
+        users = {profile.user.email: profile.user for profile in profiles.values()}
+        # Unsaved users have no pk to hash on: accounts that have a profile are tracked by identity.
+        profiled = {id(profile.user) for profile in profiles.values()}
+        loaded = {profile.user_id for profile in profiles.values()}
+        # Imported emails are stored lowercased, as the row-by-row import
+        # compares them: an exact match keeps the unique email index usable.
+        for user in User.objects.annotate(profile_pk=F("volunteer_profile__id")).filter(email__in=emails):
+            if user.pk in loaded:
+                continue
+            users.setdefault(user.email, user)
+            if user.profile_pk is not None:
+                profiled.add(id(user))
+        existing = {
+            constraints.volunteer_id: constraints
+            for constraints in VolunteerConstraint.objects.filter(volunteer__volunteer_id__in=volunteer_ids)
+        }
+
+        new_users = []
+        new_profiles = []
+        changed_users = {}
+        changed_profiles = {}
+        constraint_values = {}
+        created = 0
+        updated = 0
+        skipped = 0
+
+        for identity, mapped in entries:
+            if identity is None:
+                skipped += 1
+                continue
+            volunteer_id, email, first_name, last_name = identity
+
+            profile = profiles.get(volunteer_id)
+            was_existing = bool(profile)
+            if profile:
+                if not options["update"]:
+                    skipped += 1
+                    continue
+                user = profile.user
+            else:
+                user = users.get(email)
+                if user and id(user) in profiled:
+                    raise CommandError(f"Le compte {email} est deja lie a un autre benevole que {volunteer_id}.")
+
+            if not user:
+                user = User(
+                    email=email,
+                    first_name=first_name,
+                    last_name=last_name,
+                    password=password or make_password(None),
+                )
+                new_users.append(user)
+            else:
+                users.pop(user.email, None)
+                user.first_name = first_name or user.first_name
+                user.last_name = last_name or user.last_name
+                user.email = email
+                if user.pk:
+                    changed_users[user.pk] = user
+            users[email] = user
+
+            if not profile:
+                profile = VolunteerProfile(user=user, volunteer_id=volunteer_id)
+                new_profiles.append(profile)
+                profiles[volunteer_id] = profile
+                profiled.add(id(user))
+            elif profile.pk:
+                changed_profiles[profile.pk] = profile
+            # VolunteerProfile.save() derives short_name from the first name.
+            profile.short_name = generate_short_name(user.first_name)
+            profile.phone = normalize_phone(mapped.get("phone"))
+            constraint_values[volunteer_id] = {field: parse_int(mapped.get(field)) for field in CONSTRAINT_FIELDS}
+
+            if was_existing:
+                updated += 1
+            else:
+                created += 1
+
+        now = timezone.now()
+        with outbox.coalesce():
+            User.objects.bulk_create(new_users, batch_size=batch_size)
+            User.objects.bulk_update(
+                changed_users.values(), ["first_name", "last_name", "email"], batch_size=batch_size
             )
-        )
+            VolunteerProfile.objects.bulk_create(new_profiles, batch_size=batch_size)
+            for profile in changed_profiles.values():
+                profile.updated_at = now
+            VolunteerProfile.objects.bulk_update(
+                changed_profiles.values(), ["short_name", "phone", "updated_at"], batch_size=batch_size
+            )
+
+            touched = [profiles[volunteer_id] for volunteer_id in constraint_values]
+            new_constraints = []
+            changed_constraints = []
+            for profile in touched:
+                constraints = existing.get(profile.pk)
+                if constraints is None:
+                    constraints = VolunteerConstraint(volunteer=profile)
+                    new_constraints.append(constraints)
+                else:
+                    constraints.updated_at = now
+                    changed_constraints.append(constraints)
+                for field, value in constraint_values[profile.volunteer_id].items():
+                    setattr(constraints, field, value)
+            VolunteerConstraint.objects.bulk_create(new_constraints, batch_size=batch_size)
+            VolunteerConstraint.objects.bulk_update(
+                changed_constraints, [*CONSTRAINT_FIELDS, "updated_at"], batch_size=batch_size
+            )
+
+            for profile in touched:
+                outbox.record(outbox.VOLUNTEER_UPDATED, profile.pk, volunteer_id=profile.volunteer_id)
+            if touched:
+                recap.bump_volunteers()
 
-    def _load_rows(self, path: Path):
-        if path.suffix.lower() == ".csv":
-            with path.open(newline="", encoding="utf-8-sig") as handle:
-                reader = csv.DictReader(handle)
-                return list(reader)
-        if path.suffix.lower() in {".xlsx", ".xlsm"}:
-            if openpyxl is None:
-                raise CommandError("openpyxl n'est pas installe. Ajoutez-le dans requirements.txt.")
-            workbook = openpyxl.load_workbook(path, read_only=True)
-            sheet = workbook.active
-            rows = list(sheet.iter_rows(values_only=True))
-            if not rows:
-                return []
-            headers = [normalize_header(value) for value in rows[0]]
-            data = []
-            for row in rows[1:]:
-                data.append({headers[i]: row[i] for i in range(len(headers))})
-            return data
-        raise CommandError("Format non supporte. Utilisez CSV ou XLSX.")
-
-    def _map_row(self, row):
-        mapped = {}
-        for key, value in row.items():
-            normalized = normalize_header(key)
-            target = HEADER_MAP.get(normalized)
-            if target:
-                mapped[target] = value
-        return mapped
+        return created, updated, skipped
@@ -0,0 +1,90 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from volunteers.benchmarks import DEFAULT_START
+from volunteers.loadtest import DEFAULT_MIX, LoadTest, LoadTestError, parse_mix
+from volunteers.management.utils import parse_date
+
+
+class Command(BaseCommand):
+    help = (
+        "Test de charge contre un serveur lance (runserver ou gunicorn) : benevoles virtuels "
+        "(connexion, saisie de semaine, recap) et clients d'integration (exports CSV, API) en parallele. "
+        "Utilise les comptes de seed_benchmark_data --password."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Adresse du serveur")
+        parser.add_argument("--users", type=int, default=20, help="Benevoles virtuels connectes (defaut: 20)")
+        parser.add_argument("--password", default=None, help="Mot de passe passe a seed_benchmark_data")
+        parser.add_argument(
+            "--api-key",
+            dest="api_key",
+            default=None,
+            help="Cle d'integration (INTEGRATION_API_KEY par defaut ; sinon le compte staff de benchmark)",
+        )
+        parser.add_argument("--concurrency", type=int, default=10, help="Requetes en parallele (defaut: 10)")
+        parser.add_argument("--duration", type=float, default=30, help="Duree en secondes (defaut: 30)")
+        parser.add_argument("--requests", type=int, default=None, help="Arreter apres ce nombre d'actions")
+        parser.add_argument(
+            "--mix",
+            default=",".join(f"{name}={weight}" for name, weight in DEFAULT_MIX.items()),
+            help="Poids des actions, ex. week_form=4,recap=3,volunteers_csv=1 (defaut: %(default)s)",
+        )
+        parser.add_argument(
+            "--start",
+            type=str,
+            default=DEFAULT_START.isoformat(),
+            help="Premiere semaine visee (YYYY-MM-DD), celle passee a seed_benchmark_data",
+        )
+        parser.add_argument("--weeks", type=int, default=4, help="Nombre de semaines visees (defaut: 4)")
+        parser.add_argument("--seed", type=int, default=0, help="Graine du tirage des actions (defaut: 0)")
+        parser.add_argument("--output", type=str, default=None, help="Fichier JSON de sortie")
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency doit etre au moins 1.")
+        if not options["duration"] and not options["requests"]:
+            raise CommandError("Indiquez --duration ou --requests.")
+        api_key = options["api_key"] if options["api_key"] is not None else settings.INTEGRATION_API_KEY
+        try:
+            report = LoadTest(
+                options["url"],
+                users=options["users"],
+                password=options["password"],
+                api_key=api_key,
+                mix=parse_mix(options["mix"]),
+                concurrency=options["concurrency"],
+                duration=options["duration"],
+                requests=options["requests"],
+                start=parse_date(options["start"]),
+                weeks=options["weeks"],
+                random_seed=options["seed"],
+            ).run()
+        except LoadTestError as error:
+            raise CommandError(str(error))
+
+        self._print(report)
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+            self.stdout.write(self.style.SUCCESS(f"Resultats ecrits dans {options['output']}."))
+        if report["errors"]:
+            self.stderr.write(f"{report['errors']} erreur(s) sur {report['requests']} requetes.")
+
+    def _print(self, report):
+        self.stdout.write(
+            f"{'endpoint':<22}{'req':>7}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'erreurs':>9}"
+        )
+        rows = list(report["endpoints"].items()) + list(report["login"]["endpoints"].items())
+        for name, item in rows:
+            self.stdout.write(
+                f"{name:<22}{item['requests']:>7}{item['throughput_rps']:>9}{item['p50_ms']:>9}"
+                f"{item['p95_ms']:>9}{item['p99_ms']:>9}{item['error_rate']:>9.1%}"
+            )
+        self.stdout.write(
+            f"Total: {report['requests']} requetes en {report['elapsed_s']} s, "
+            f"{report['throughput_rps']} req/s, erreurs {report['error_rate']:.1%}."
+        )
@@ -0,0 +1,74 @@
+import os
+import signal
+import socket
+import threading
+import time as clock
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from volunteers.integrations import (
+    claim_events,
+    close_pool_connections,
+    get_handlers,
+    process_batch,
+    release_stale_claims,
+)
+
+# Upper bound between two sweeps for claims left by a stopped worker, busy queue or not.
+RELEASE_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = "Traite les evenements d'integration entrants en attente (worker longue duree)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50, help="Evenements reclames par lot")
+        parser.add_argument("--threads", type=int, default=4, help="Threads de traitement")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Attente (s) quand la file est vide")
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=300,
+            help="Delai (s) apres lequel un evenement reclame par un worker arrete est remis en attente",
+        )
+        parser.add_argument("--once", action="store_true", help="Vider la file puis s'arreter")
+
+    def handle(self, *args, **options):
+        handlers = get_handlers()
+        if not handlers:
+            self.stdout.write(self.style.WARNING("Aucun handler enregistre (INTEGRATION_EVENT_HANDLERS)."))
+            return
+
+        worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_args: stop.set())
+
+        self.stdout.write(f"Worker {worker_id} demarre ({', '.join(sorted(handlers))}).")
+        total_processed = 0
+        total_failed = 0
+        release_every = min(RELEASE_INTERVAL, options["stale_after"])
+        next_release = 0.0
+        with ThreadPoolExecutor(max_workers=options["threads"]) as executor:
+            while not stop.is_set():
+                if clock.monotonic() >= next_release:
+                    release_stale_claims(options["stale_after"])
+                    next_release = clock.monotonic() + release_every
+                events = claim_events(worker_id, handlers.keys(), options["batch_size"])
+                if not events:
+                    if options["once"]:
+                        break
+                    stop.wait(options["poll_interval"])
+                    continue
+                processed, failed = process_batch(events, handlers, executor)
+                close_pool_connections(executor, options["threads"])
+                total_processed += processed
+                total_failed += failed
+                self.stdout.write(f"Lot traite: {processed} ok, {failed} en echec.")
+            close_pool_connections(executor, options["threads"], force=True)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Worker arrete. Traites: {total_processed}, en echec: {total_failed}.")
+        )
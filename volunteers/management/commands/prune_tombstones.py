@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from volunteers.models import DeletionTombstone
+
+
+class Command(BaseCommand):
+    help = "Supprime les traces de suppression plus anciennes que la retention de synchronisation."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.INTEGRATION_TOMBSTONE_RETENTION_DAYS,
+            help="Retention en jours (INTEGRATION_TOMBSTONE_RETENTION_DAYS par defaut)",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        deleted, _details = DeletionTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Traces supprimees: {deleted}"))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from volunteers.management.utils import parse_date
+from volunteers.recap import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recalcule le recap hebdomadaire des disponibilites (toutes les semaines par defaut)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=str, help="Premier jour (YYYY-MM-DD), semaine entiere incluse")
+        parser.add_argument("--end", type=str, help="Dernier jour (YYYY-MM-DD), semaine entiere incluse")
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Compter les ecarts sans rien ecrire (code de sortie 1 si ecarts)",
+        )
+
+    def handle(self, *args, **options):
+        start = parse_date(options["start"]) if options["start"] else None
+        end = parse_date(options["end"]) if options["end"] else None
+        if start and end and end < start:
+            raise CommandError("La date de fin doit etre apres la date de debut.")
+        weeks, differences = rebuild(start, end, check=options["check"])
+        if options["check"]:
+            message = f"Semaines benevole: {weeks}, ecarts: {differences}."
+            if differences:
+                raise CommandError(message)
+            self.stdout.write(self.style.SUCCESS(message))
+            return
+        self.stdout.write(self.style.SUCCESS(f"Semaines benevole: {weeks}, lignes corrigees: {differences}."))
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from volunteers.archive import restore_events
+from volunteers.management.utils import parse_date
+
+
+class Command(BaseCommand):
+    help = "Restaure les evenements d'integration archives sur une plage de dates."
+
+    def add_arguments(self, parser):
+        parser.add_argument("start", type=str, help="Premier jour (YYYY-MM-DD)")
+        parser.add_argument("end", type=str, help="Dernier jour inclus (YYYY-MM-DD)")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Evenements par lot")
+
+    def handle(self, *args, **options):
+        start = parse_date(options["start"])
+        end = parse_date(options["end"])
+        if end < start:
+            raise CommandError("La date de fin doit etre apres la date de debut.")
+        restored = restore_events(settings.INTEGRATION_ARCHIVE_DIR, start, end, options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Evenements relus depuis l'archive: {restored}."))
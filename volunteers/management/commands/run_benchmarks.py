@@ -0,0 +1,69 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from volunteers.benchmarks import DEFAULT_START, compare, run
+from volunteers.management.utils import parse_date
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure les chemins principaux (recap, saisie, exports CSV, API, import) sur le jeu de donnees "
+        "de seed_benchmark_data et ecrit le resultat en JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20, help="Mesures par scenario (defaut: 20)")
+        parser.add_argument("--warmup", type=int, default=1, help="Executions non mesurees avant (defaut: 1)")
+        parser.add_argument("--only", nargs="+", default=None, help="Scenarios a executer (tous par defaut)")
+        parser.add_argument(
+            "--start",
+            type=str,
+            default=DEFAULT_START.isoformat(),
+            help="Semaine mesuree (YYYY-MM-DD), celle passee a seed_benchmark_data",
+        )
+        parser.add_argument("--output", type=str, default=None, help="Fichier JSON de sortie (stdout par defaut)")
+        parser.add_argument("--baseline", type=str, default=None, help="Resultat JSON d'un commit precedent")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Hausse de p95 toleree par rapport a --baseline (defaut: 0.2 = 20%%)",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations doit etre au moins 1.")
+        baseline = None
+        if options["baseline"]:
+            path = Path(options["baseline"])
+            if not path.exists():
+                raise CommandError(f"Fichier introuvable: {path}")
+            baseline = json.loads(path.read_text(encoding="utf-8"))
+
+        try:
+            report = run(
+                iterations=options["iterations"],
+                warmup=max(options["warmup"], 0),
+                only=set(options["only"]) if options["only"] else None,
+                start=parse_date(options["start"]),
+            )
+        except LookupError:
+            raise CommandError("Aucun jeu de donnees de benchmark. Lancez d'abord seed_benchmark_data.")
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            Path(options["output"]).write_text(output + "\n", encoding="utf-8")
+            self.stdout.write(self.style.SUCCESS(f"Resultats ecrits dans {options['output']}."))
+        else:
+            self.stdout.write(output)
+
+        if baseline is None:
+            return
+        regressions = compare(baseline, report, options["tolerance"])
+        for name, metric, before, after in regressions:
+            self.stderr.write(f"{name}: {metric} {before} -> {after}")
+        if regressions:
+            raise CommandError(f"{len(regressions)} regression(s) par rapport a {options['baseline']}.")
+        self.stdout.write(self.style.SUCCESS("Aucune regression par rapport a la reference."))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from volunteers.benchmarks import BENCH_DOMAIN, DEFAULT_START, reset, seed
+from volunteers.management.utils import parse_date
+
+
+class Command(BaseCommand):
+    help = (
+        f"Genere un jeu de donnees reproductible pour les benchmarks (comptes @{BENCH_DOMAIN}). "
+        "Les donnees de benchmark existantes sont remplacees, les autres ne sont pas touchees."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--volunteers", type=int, default=200, help="Nombre de benevoles (defaut: 200)")
+        parser.add_argument("--weeks", type=int, default=8, help="Nombre de semaines de disponibilites (defaut: 8)")
+        parser.add_argument("--events", type=int, default=1000, help="Nombre d'evenements d'integration (defaut: 1000)")
+        parser.add_argument("--seed", type=int, default=0, help="Graine du generateur aleatoire (defaut: 0)")
+        parser.add_argument(
+            "--start",
+            type=str,
+            default=DEFAULT_START.isoformat(),
+            help="Premier jour (YYYY-MM-DD), ramene au lundi",
+        )
+        parser.add_argument(
+            "--password",
+            default=None,
+            help="Mot de passe commun des comptes generes (inutilisable par defaut ; requis pour load_test)",
+        )
+        parser.add_argument("--reset", action="store_true", help="Supprimer les donnees de benchmark sans en recreer")
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            reset()
+            self.stdout.write(self.style.SUCCESS("Donnees de benchmark supprimees."))
+            return
+        for name in ("volunteers", "weeks", "events"):
+            if options[name] < 0:
+                raise CommandError(f"--{name} doit etre positif.")
+        counts = seed(
+            volunteers=options["volunteers"],
+            weeks=options["weeks"],
+            events=options["events"],
+            random_seed=options["seed"],
+            start=parse_date(options["start"]),
+            password=options["password"],
+        )
+        summary = ", ".join(f"{name}: {count}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Jeu de donnees genere. {summary}."))
@@ -0,0 +1,11 @@
+from datetime import datetime
+
+from django.core.management.base import CommandError
+
+
+def parse_date(value):
+    """Parse a YYYY-MM-DD command argument."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"Date invalide: {value} (format attendu YYYY-MM-DD)")
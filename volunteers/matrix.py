@@ -0,0 +1,74 @@
+"""Dense volunteer x day x quarter-hour matrix for the scheduler.
+
+Each volunteer gets one hex string holding ``days`` chunks of
+``SLOT_HEX_DIGITS`` characters; ``int(chunk, 16)`` is that day's slot mask
+(bit ``i`` = slot ``i``, see ``volunteers.slots``). Unavailable days are a
+string of ``0``/``1`` flags, one per day. The matrix is built from one query
+per table.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from .models import Availability, Unavailability, VolunteerProfile
+from .slots import SLOT_COUNT, SLOT_MINUTES, SLOT_START
+
+SLOT_HEX_DIGITS = -(-SLOT_COUNT // 4)
+CONSTRAINT_FIELDS = [
+    "max_days_per_week",
+    "max_expeditions_per_week",
+    "max_expeditions_per_day",
+    "max_wait_hours",
+]
+
+
+def encode_masks(masks):
+    return "".join(format(mask, f"0{SLOT_HEX_DIGITS}x") for mask in masks)
+
+
+def decode_masks(value):
+    return [int(value[index : index + SLOT_HEX_DIGITS], 16) for index in range(0, len(value), SLOT_HEX_DIGITS)]
+
+
+def build_matrix(start, days, volunteers=None):
+    """Return the matrix payload for ``days`` days starting at ``start``."""
+    end = start + timedelta(days=days - 1)
+    if volunteers is None:
+        volunteers = VolunteerProfile.objects.all()
+
+    masks = defaultdict(lambda: [0] * days)
+    for volunteer_pk, day, mask in (
+        Availability.objects.filter(volunteer__in=volunteers, date__range=(start, end))
+        .values_list("volunteer_id", "date", "slot_mask")
+        .iterator()
+    ):
+        masks[volunteer_pk][(day - start).days] |= mask
+
+    unavailable = defaultdict(lambda: ["0"] * days)
+    for volunteer_pk, day in Unavailability.objects.filter(
+        volunteer__in=volunteers, date__range=(start, end)
+    ).values_list("volunteer_id", "date"):
+        unavailable[volunteer_pk][(day - start).days] = "1"
+
+    empty_masks = encode_masks([0] * days)
+    empty_days = "0" * days
+    rows = []
+    for values in volunteers.order_by("volunteer_id").values_list(
+        "pk", "volunteer_id", *[f"constraints__{field}" for field in CONSTRAINT_FIELDS]
+    ):
+        volunteer_pk, volunteer_id, *constraints = values
+        row = {"volunteer_id": volunteer_id}
+        row.update(zip(CONSTRAINT_FIELDS, constraints))
+        row["unavailable"] = "".join(unavailable[volunteer_pk]) if volunteer_pk in unavailable else empty_days
+        row["slots"] = encode_masks(masks[volunteer_pk]) if volunteer_pk in masks else empty_masks
+        rows.append(row)
+
+    return {
+        "start": start,
+        "end": end,
+        "days": days,
+        "slot_start": SLOT_START.strftime("%H:%M"),
+        "slot_minutes": SLOT_MINUTES,
+        "slot_count": SLOT_COUNT,
+        "volunteers": rows,
+    }
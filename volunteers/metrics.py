@@ -0,0 +1,232 @@
+"""Prometheus metrics, shared across gunicorn workers through files.
+
+Each process accumulates per-view request metrics in memory (latency
+histogram, query count, database time, 5xx responses) and writes them to its
+own JSON file in ``METRICS_DIR`` at most every ``METRICS_FLUSH_SECONDS``, with
+an atomic rename. ``/api/metrics/`` sums the files of every process, so the
+counters cover all workers whichever one answers the scrape. The files of
+stopped workers are kept: their counts stay in the totals, as Prometheus
+expects from counters. Empty the directory on deploy (a fresh container
+does it).
+
+Integration queue depth and table row counts are read from the database at
+scrape time.
+"""
+
+import json
+import logging
+import os
+import threading
+import time as clock
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Count, Min
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework.authentication import SessionAuthentication, TokenAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+
+from accounts.models import User
+from .api import IsStaffUser
+from .models import (
+    Availability,
+    DeletionTombstone,
+    IntegrationEvent,
+    IntegrationStatus,
+    Unavailability,
+    VolunteerConstraint,
+    VolunteerProfile,
+    WeeklyRecap,
+)
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+TABLES = {
+    "users": User,
+    "volunteers": VolunteerProfile,
+    "volunteer_constraints": VolunteerConstraint,
+    "availabilities": Availability,
+    "unavailabilities": Unavailability,
+    "weekly_recaps": WeeklyRecap,
+    "integration_events": IntegrationEvent,
+    "deletion_tombstones": DeletionTombstone,
+}
+
+
+def _empty_view():
+    return {
+        "count": 0,
+        "sum": 0.0,
+        "buckets": [0] * len(LATENCY_BUCKETS),
+        "queries": 0,
+        "db_seconds": 0.0,
+        "errors": 0,
+    }
+
+
+class MetricsStore:
+    """This process's counters, flushed to ``<directory>/<pid>-<start>.json``."""
+
+    def __init__(self, directory, flush_seconds=1.0):
+        self.directory = Path(directory)
+        self.flush_seconds = flush_seconds
+        self.path = self.directory / f"{os.getpid()}-{int(clock.time() * 1000)}.json"
+        self.views = {}
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.flushed_at = 0.0
+
+    def observe(self, view, seconds, queries, db_seconds, status):
+        with self.lock:
+            values = self.views.setdefault(view, _empty_view())
+            values["count"] += 1
+            values["sum"] += seconds
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    values["buckets"][index] += 1
+                    break
+            values["queries"] += queries
+            values["db_seconds"] += db_seconds
+            if status >= 500:
+                values["errors"] += 1
+            due = self._due()
+        # A thread already writing the file will include this observation or the next one will.
+        if due and self.flush_lock.acquire(blocking=False):
+            try:
+                self._write(only_if_due=True)
+            finally:
+                self.flush_lock.release()
+
+    def _due(self):
+        return clock.monotonic() - self.flushed_at >= self.flush_seconds
+
+    def flush(self):
+        with self.flush_lock:
+            self._write()
+
+    def _write(self, only_if_due=False):
+        # Called with flush_lock held, so a single writer uses the temporary file.
+        with self.lock:
+            if only_if_due and not self._due():
+                return
+            payload = json.dumps({"views": self.views})
+            self.flushed_at = clock.monotonic()
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temporary = self.path.with_suffix(".tmp")
+            temporary.write_text(payload, encoding="utf-8")
+            os.replace(temporary, self.path)
+        except OSError:
+            # The export must never fail the request being measured.
+            logger.warning("Could not write metrics to %s", self.path, exc_info=True)
+
+    def collect(self):
+        """Per-view totals summed over every process's file."""
+        self.flush()
+        views = {}
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            for view, values in data.get("views", {}).items():
+                total = views.setdefault(view, _empty_view())
+                for key in ("count", "sum", "queries", "db_seconds", "errors"):
+                    total[key] += values.get(key, 0)
+                for index, count in enumerate(values.get("buckets", [])[: len(LATENCY_BUCKETS)]):
+                    total["buckets"][index] += count
+        return views
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    directory = Path(settings.METRICS_DIR)
+    with _store_lock:
+        if _store is None or _store.directory != directory:
+            _store = MetricsStore(directory, settings.METRICS_FLUSH_SECONDS)
+        return _store
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+def _request_lines(views):
+    lines = [
+        "# HELP asf_request_duration_seconds Request latency per view.",
+        "# TYPE asf_request_duration_seconds histogram",
+    ]
+    for view, values in sorted(views.items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, values["buckets"]):
+            cumulative += count
+            lines.append(f'asf_request_duration_seconds_bucket{{view="{_label(view)}",le="{bound}"}} {cumulative}')
+        lines.append(f'asf_request_duration_seconds_bucket{{view="{_label(view)}",le="+Inf"}} {values["count"]}')
+        lines.append(f'asf_request_duration_seconds_sum{{view="{_label(view)}"}} {_format(values["sum"])}')
+        lines.append(f'asf_request_duration_seconds_count{{view="{_label(view)}"}} {values["count"]}')
+    for name, key, kind, help_text in (
+        ("asf_request_db_queries_total", "queries", "counter", "SQL queries run by requests, per view."),
+        ("asf_request_db_seconds_total", "db_seconds", "counter", "Time spent in SQL by requests, per view."),
+        ("asf_request_errors_total", "errors", "counter", "Responses with a 5xx status, per view."),
+    ):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for view, values in sorted(views.items()):
+            lines.append(f'{name}{{view="{_label(view)}"}} {_format(values[key])}')
+    return lines
+
+
+def _queue_lines(now):
+    rows = (
+        IntegrationEvent.objects.filter(status__in=[IntegrationStatus.PENDING, IntegrationStatus.FAILED])
+        .values("source", "event_type", "status")
+        .annotate(count=Count("id"), oldest=Min("created_at"))
+        .order_by("source", "event_type", "status")
+    )
+    lines = [
+        "# HELP asf_integration_events Integration events waiting (pending) or in error (failed).",
+        "# TYPE asf_integration_events gauge",
+    ]
+    ages = []
+    for row in rows:
+        labels = f'source="{_label(row["source"])}",event_type="{_label(row["event_type"])}"'
+        lines.append(f'asf_integration_events{{{labels},status="{row["status"]}"}} {row["count"]}')
+        if row["status"] == IntegrationStatus.PENDING:
+            age = (now - row["oldest"]).total_seconds()
+            ages.append(f"asf_integration_oldest_pending_age_seconds{{{labels}}} {_format(age)}")
+    lines.append("# HELP asf_integration_oldest_pending_age_seconds Age of the oldest pending event.")
+    lines.append("# TYPE asf_integration_oldest_pending_age_seconds gauge")
+    return lines + ages
+
+
+def _table_lines():
+    lines = ["# HELP asf_table_rows Rows in the main tables.", "# TYPE asf_table_rows gauge"]
+    for table, model in TABLES.items():
+        lines.append(f'asf_table_rows{{table="{table}"}} {model.objects.count()}')
+    return lines
+
+
+def render(now=None):
+    store = get_store()
+    lines = _request_lines(store.collect()) + _queue_lines(now or timezone.now()) + _table_lines()
+    return "\n".join(lines) + "\n"
+
+
+@api_view(["GET"])
+@authentication_classes([SessionAuthentication, TokenAuthentication])
+@permission_classes([IsStaffUser])
+def metrics_view(request):
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
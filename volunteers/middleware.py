@@ -0,0 +1,27 @@
+from django.db import transaction
+
+from . import outbox
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS", "TRACE"}
+
+
+class OutboxMiddleware:
+    """Run write requests in one transaction and coalesce their outbound events.
+
+    This is ``ATOMIC_REQUESTS`` for non-safe methods, plus the outbox. By the
+    time the response gets here Django has already turned a view exception
+    into a 500 response, so the transaction is rolled back on any 5xx status:
+    a failed request keeps neither its writes nor their events.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method in SAFE_METHODS:
+            return self.get_response(request)
+        with outbox.coalesce():
+            response = self.get_response(request)
+            if response.status_code >= 500:
+                transaction.set_rollback(True)
+            return response
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("volunteers", "0004_integration_event"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="availability",
+            index=models.Index(fields=["date", "start_time", "id"], name="volunteers__date_43aa51_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="integrationevent",
+            index=models.Index(fields=["created_at", "id"], name="volunteers__created_f8a88c_idx"),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("volunteers", "0005_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeletionTombstone",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("model_name", models.CharField(max_length=40)),
+                ("object_id", models.BigIntegerField()),
+                ("date", models.DateField()),
+                ("deleted_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "ordering": ["deleted_at"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="deletiontombstone",
+            index=models.Index(fields=["deleted_at"], name="volunteers__deleted_138f53_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="availability",
+            index=models.Index(fields=["updated_at"], name="volunteers__updated_fbc7a9_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="unavailability",
+            index=models.Index(fields=["updated_at"], name="volunteers__updated_ebb22e_idx"),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def clear_duplicate_external_ids(apps, schema_editor):
+    # Keep the key on the oldest event of each duplicate group so the unique
+    # constraint can be created; later copies stay in the table without it.
+    IntegrationEvent = apps.get_model("volunteers", "IntegrationEvent")
+    duplicates = (
+        IntegrationEvent.objects.exclude(external_id="")
+        .values("source", "external_id")
+        .annotate(total=Count("id"), keep=Min("id"))
+        .filter(total__gt=1)
+    )
+    for group in duplicates:
+        IntegrationEvent.objects.filter(source=group["source"], external_id=group["external_id"]).exclude(
+            pk=group["keep"]
+        ).update(external_id="")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("volunteers", "0007_integrationevent_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_duplicate_external_ids, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="integrationevent",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("external_id", ""), _negated=True),
+                fields=("source", "external_id"),
+                name="unique_event_external_id_per_source",
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+from volunteers.slots import interval_to_mask
+
+
+def fill_slot_masks(apps, schema_editor):
+    Availability = apps.get_model("volunteers", "Availability")
+    batch = []
+    for availability in Availability.objects.only("start_time", "end_time").iterator(chunk_size=1000):
+        availability.slot_mask = interval_to_mask(availability.start_time, availability.end_time)
+        batch.append(availability)
+        if len(batch) >= 1000:
+            Availability.objects.bulk_update(batch, ["slot_mask"])
+            batch = []
+    if batch:
+        Availability.objects.bulk_update(batch, ["slot_mask"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("volunteers", "0009_integration_event_claims"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="availability",
+            name="slot_mask",
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_slot_masks, migrations.RunPython.noop),
+    ]
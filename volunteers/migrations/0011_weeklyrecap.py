@@ -0,0 +1,84 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Max, Min
+import django.db.models.deletion
+
+
+def fill_weekly_recap(apps, schema_editor):
+    # Self-contained copy of recap.collect_weeks as it was when this migration
+    # was written; `manage.py rebuild_weekly_recap` repairs any later drift.
+    Availability = apps.get_model("volunteers", "Availability")
+    Unavailability = apps.get_model("volunteers", "Unavailability")
+    WeeklyRecap = apps.get_model("volunteers", "WeeklyRecap")
+
+    def week_start_for(day):
+        return day - timedelta(days=day.weekday())
+
+    availability = defaultdict(dict)
+    for row in (
+        Availability.objects.order_by()
+        .values("volunteer_id", "date")
+        .annotate(start=Min("start_time"), end=Max("end_time"))
+    ):
+        availability[(row["volunteer_id"], week_start_for(row["date"]))][row["date"]] = (row["start"], row["end"])
+    unavailable = defaultdict(set)
+    for volunteer_pk, day in Unavailability.objects.order_by().values_list("volunteer_id", "date"):
+        unavailable[(volunteer_pk, week_start_for(day))].add(day)
+
+    recaps = []
+    for volunteer_pk, week_start in availability.keys() | unavailable.keys():
+        days = []
+        for offset in range(7):
+            day = week_start + timedelta(days=offset)
+            if day in availability[(volunteer_pk, week_start)]:
+                start_time, end_time = availability[(volunteer_pk, week_start)][day]
+                days.append(
+                    {"status": "available", "start": start_time.strftime("%Hh%M"), "end": end_time.strftime("%Hh%M")}
+                )
+            elif day in unavailable[(volunteer_pk, week_start)]:
+                days.append({"status": "unavailable", "start": "--", "end": "--"})
+            else:
+                days.append({"status": "empty", "start": "", "end": ""})
+        recaps.append(WeeklyRecap(volunteer_id=volunteer_pk, week_start=week_start, days=days))
+    WeeklyRecap.objects.bulk_create(recaps, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("volunteers", "0010_availability_slot_mask"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WeeklyRecap",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("week_start", models.DateField()),
+                ("days", models.JSONField(default=list)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "volunteer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="weekly_recaps",
+                        to="volunteers.volunteerprofile",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["week_start"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="weeklyrecap",
+            index=models.Index(fields=["week_start"], name="volunteers__week_st_0dfab6_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="weeklyrecap",
+            constraint=models.UniqueConstraint(fields=("volunteer", "week_start"), name="unique_recap_per_week"),
+        ),
+        migrations.RunPython(fill_weekly_recap, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,85 @@
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+
+# Postgres gets an exclusion constraint, SQLite (local development) triggers.
+# SQLite drops triggers when Django rebuilds the table for an AlterField on
+# Availability: such a migration must recreate them.
+CONSTRAINT = "availability_no_overlap"
+TABLE = "volunteers_availability"
+
+OVERLAPS = f"""
+SELECT COUNT(*) FROM {TABLE} a JOIN {TABLE} b
+  ON a.volunteer_id = b.volunteer_id AND a.date = b.date AND a.id < b.id
+ AND a.start_time < b.end_time AND b.start_time < a.end_time
+"""
+
+POSTGRES_FORWARD = [
+    f"""
+    ALTER TABLE {TABLE} ADD CONSTRAINT {CONSTRAINT} EXCLUDE USING gist (
+        volunteer_id WITH =,
+        tsrange(date + start_time, date + end_time, '[)') WITH &&
+    )
+    """,
+]
+POSTGRES_BACKWARD = [f"ALTER TABLE {TABLE} DROP CONSTRAINT IF EXISTS {CONSTRAINT}"]
+
+SQLITE_CONFLICT = f"""
+    SELECT 1 FROM {TABLE} other
+     WHERE other.volunteer_id = NEW.volunteer_id AND other.date = NEW.date
+       AND other.start_time < NEW.end_time AND other.end_time > NEW.start_time
+"""
+SQLITE_FORWARD = [
+    f"""
+    CREATE TRIGGER {CONSTRAINT}_insert BEFORE INSERT ON {TABLE}
+    WHEN EXISTS ({SQLITE_CONFLICT})
+    BEGIN SELECT RAISE(ABORT, '{CONSTRAINT}'); END
+    """,
+    f"""
+    CREATE TRIGGER {CONSTRAINT}_update BEFORE UPDATE OF volunteer_id, date, start_time, end_time ON {TABLE}
+    WHEN EXISTS ({SQLITE_CONFLICT} AND other.id != NEW.id)
+    BEGIN SELECT RAISE(ABORT, '{CONSTRAINT}'); END
+    """,
+]
+SQLITE_BACKWARD = [
+    f"DROP TRIGGER IF EXISTS {CONSTRAINT}_insert",
+    f"DROP TRIGGER IF EXISTS {CONSTRAINT}_update",
+]
+
+
+def add_constraint(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in ("postgresql", "sqlite"):
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(OVERLAPS)
+        (count,) = cursor.fetchone()
+    if count:
+        raise RuntimeError(
+            f"{count} paire(s) de disponibilites se chevauchent ; corrigez-les dans l'admin avant de migrer."
+        )
+    for statement in POSTGRES_FORWARD if vendor == "postgresql" else SQLITE_FORWARD:
+        schema_editor.execute(statement)
+
+
+def remove_constraint(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        statements = POSTGRES_BACKWARD
+    elif vendor == "sqlite":
+        statements = SQLITE_BACKWARD
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("volunteers", "0012_cachegeneration"),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.RunPython(add_constraint, remove_constraint),
+    ]
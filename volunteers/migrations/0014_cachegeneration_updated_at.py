@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("volunteers", "0013_availability_no_overlap"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cachegeneration",
+            name="updated_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
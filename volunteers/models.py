@@ -1,8 +1,9 @@
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models import Max
+from django.db import IntegrityError, models, transaction
+from django.db.models import DurationField, ExpressionWrapper, F, Max
 from django.utils import timezone
 
+from . import slots
 from .utils import generate_short_name
 
 
@@ -45,33 +46,111 @@ class VolunteerConstraint(models.Model):
         return f"Contraintes {self.volunteer.volunteer_id}"
 
 
+OVERLAP_CONSTRAINT = "availability_no_overlap"
+OVERLAP_MESSAGE = "Cette plage horaire chevauche une disponibilite existante."
+
+
+class AvailabilityOverlap(ValidationError):
+    """The database rejected an availability overlapping another one of the same day."""
+
+    def __init__(self, message=OVERLAP_MESSAGE):
+        super().__init__(message)
+
+
+def is_overlap_error(error: IntegrityError) -> bool:
+    return OVERLAP_CONSTRAINT in str(error)
+
+
+class AvailabilityQuerySet(models.QuerySet):
+    def overlapping(self, mask: int):
+        """Availabilities sharing at least one quarter-hour slot with ``mask``."""
+        return self.annotate(slot_overlap=F("slot_mask").bitand(mask)).exclude(slot_overlap=0)
+
+    def free_at(self, value):
+        """Availabilities whose slots include the quarter hour containing ``value``."""
+        return self.overlapping(slots.slot_bit(value))
+
+    def covering(self, start, end):
+        """Availabilities containing ``[start, end)``.
+
+        The mask test narrows the rows; the times are compared as well because
+        an off-grid bound is widened to whole quarter hours in the mask.
+        """
+        window = slots.interval_to_mask(start, end)
+        if not window:
+            # Outside 07:00-22:00: an empty mask would match every row.
+            return self.none()
+        return (
+            self.annotate(slot_cover=F("slot_mask").bitand(window))
+            .filter(slot_cover=window)
+            .filter(start_time__lte=start, end_time__gte=end)
+        )
+
+    def available_for(self, day, start, end):
+        """Availabilities covering ``[start, end)`` on ``day``, tightest fit first.
+
+        The date predicate uses the (date, start_time, id) index, so only that
+        day's rows are tested against the window mask. ``fit`` is the length of
+        the covering availability; the shortest one wastes the least time.
+        """
+        unavailable = Unavailability.objects.filter(date=day).values("volunteer_id")
+        return (
+            self.filter(date=day)
+            .covering(start, end)
+            .exclude(volunteer_id__in=unavailable)
+            .annotate(fit=ExpressionWrapper(F("end_time") - F("start_time"), output_field=DurationField()))
+            .order_by("fit", "start_time", "pk")
+        )
+
+
 class Availability(models.Model):
     volunteer = models.ForeignKey(VolunteerProfile, on_delete=models.CASCADE, related_name="availabilities")
     date = models.DateField()
     start_time = models.TimeField()
     end_time = models.TimeField()
+    slot_mask = models.BigIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AvailabilityQuerySet.as_manager()
+
     class Meta:
         ordering = ["date", "start_time"]
+        indexes = [
+            models.Index(fields=["date", "start_time", "id"]),
+            models.Index(fields=["updated_at"]),
+        ]
 
     def __str__(self) -> str:
         return f"{self.volunteer.volunteer_id} {self.date} {self.start_time}-{self.end_time}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored date so moving a slot to another week notifies both weeks.
+        instance._loaded_date = dict(zip(field_names, values)).get("date")
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.slot_mask = slots.interval_to_mask(self.start_time, self.end_time)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"start_time", "end_time"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "slot_mask"}
+        # Overlaps are rejected by the database (migration 0013), not by a
+        # query beforehand, so concurrent submissions cannot both get in.
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except IntegrityError as error:
+            if is_overlap_error(error):
+                raise AvailabilityOverlap() from error
+            raise
+        self._loaded_date = self.date
+
     def clean(self) -> None:
         if self.start_time >= self.end_time:
             raise ValidationError("L'heure de fin doit etre apres l'heure de debut.")
 
-        overlaps = Availability.objects.filter(
-            volunteer=self.volunteer,
-            date=self.date,
-            start_time__lt=self.end_time,
-            end_time__gt=self.start_time,
-        ).exclude(pk=self.pk)
-        if overlaps.exists():
-            raise ValidationError("Cette plage horaire chevauche une disponibilite existante.")
-
 
 class Unavailability(models.Model):
     volunteer = models.ForeignKey(VolunteerProfile, on_delete=models.CASCADE, related_name="unavailabilities")
@@ -83,12 +162,80 @@ class Unavailability(models.Model):
         constraints = [
             models.UniqueConstraint(fields=["volunteer", "date"], name="unique_unavailability_per_day"),
         ]
+        indexes = [
+            models.Index(fields=["updated_at"]),
+        ]
         ordering = ["date"]
 
     def __str__(self) -> str:
         return f"Indisponible {self.volunteer.volunteer_id} {self.date}"
 
 
+class WeeklyRecap(models.Model):
+    """One volunteer's week as shown by the recap page, kept up to date on write."""
+
+    volunteer = models.ForeignKey(VolunteerProfile, on_delete=models.CASCADE, related_name="weekly_recaps")
+    week_start = models.DateField()
+    days = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["volunteer", "week_start"], name="unique_recap_per_week"),
+        ]
+        indexes = [
+            models.Index(fields=["week_start"]),
+        ]
+        ordering = ["week_start"]
+
+    def __str__(self) -> str:
+        return f"Recap {self.volunteer.volunteer_id} {self.week_start}"
+
+
+class CacheGeneration(models.Model):
+    """Counter bumped on every write affecting a cached page; cache keys embed it."""
+
+    key = models.CharField(max_length=60, unique=True)
+    value = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"{self.key}={self.value}"
+
+
+VOLUNTEERS_DELETED = "deleted:volunteers"
+EVENTS_DELETED = "deleted:integration-events"
+
+
+def mark_deleted(key):
+    """Record, in the current transaction, that rows counted under ``key`` were deleted now.
+
+    Integration listings add this time to their Last-Modified: a deletion
+    leaves no ``updated_at`` behind to move it forward.
+    """
+    now = timezone.now()
+    if not CacheGeneration.objects.filter(key=key).update(value=F("value") + 1, updated_at=now):
+        generation, created = CacheGeneration.objects.get_or_create(key=key, defaults={"value": 1, "updated_at": now})
+        if not created:
+            CacheGeneration.objects.filter(pk=generation.pk).update(value=F("value") + 1, updated_at=now)
+
+
+class DeletionTombstone(models.Model):
+    model_name = models.CharField(max_length=40)
+    object_id = models.BigIntegerField()
+    date = models.DateField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["deleted_at"]
+        indexes = [
+            models.Index(fields=["deleted_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"Suppression {self.model_name} {self.object_id}"
+
+
 class IntegrationDirection(models.TextChoices):
     INBOUND = "inbound", "Inbound"
     OUTBOUND = "outbound", "Outbound"
@@ -96,6 +243,7 @@ class IntegrationDirection(models.TextChoices):
 
 class IntegrationStatus(models.TextChoices):
     PENDING = "pending", "Pending"
+    PROCESSING = "processing", "Processing"
     PROCESSED = "processed", "Processed"
     FAILED = "failed", "Failed"
 
@@ -117,14 +265,25 @@ class IntegrationEvent(models.Model):
         default=IntegrationStatus.PENDING,
     )
     error_message = models.TextField(blank=True)
+    claimed_by = models.CharField(max_length=120, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     processed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source", "external_id"],
+                condition=~models.Q(external_id=""),
+                name="unique_event_external_id_per_source",
+            ),
+        ]
         indexes = [
             models.Index(fields=["direction", "status", "created_at"]),
             models.Index(fields=["source", "event_type"]),
+            models.Index(fields=["created_at", "id"]),
         ]
 
     def __str__(self) -> str:
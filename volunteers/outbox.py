@@ -0,0 +1,113 @@
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import IntegrationDirection, IntegrationEvent, IntegrationStatus, VolunteerProfile
+
+AVAILABILITY_WEEK_CHANGED = "availability.week_changed"
+VOLUNTEER_UPDATED = "volunteer.updated"
+VOLUNTEER_DELETED = "volunteer.deleted"
+
+_state = threading.local()
+
+
+def _buffers():
+    if not hasattr(_state, "buffers"):
+        _state.buffers = []
+    return _state.buffers
+
+
+def week_start_for(day):
+    return day - timedelta(days=day.weekday())
+
+
+@contextmanager
+def coalesce():
+    """Collect outbound changes and write them once, inside one transaction.
+
+    Every change recorded in the block is keyed by (event type, volunteer,
+    week), so rewriting seven days of a week yields a single event. The events
+    are inserted just before the block's transaction commits; if the block
+    raises or is marked with ``transaction.set_rollback(True)``, both the data
+    changes and the events roll back. Nested blocks add their changes to the
+    outermost one and run in a savepoint; when the savepoint rolls back, the
+    changes they recorded are dropped with it.
+    """
+    buffers = _buffers()
+    if buffers:
+        # A savepoint, so a caller catching an error from the inner block
+        # keeps neither its partial writes nor the events they queued.
+        snapshot = dict(buffers[-1])
+        kept = False
+        try:
+            with transaction.atomic():
+                yield
+                kept = not transaction.get_rollback()
+        finally:
+            if not kept:
+                buffers[-1].clear()
+                buffers[-1].update(snapshot)
+        return
+    with transaction.atomic():
+        buffers.append({})
+        try:
+            yield
+            changes = buffers[-1]
+        finally:
+            buffers.pop()
+        if not transaction.get_rollback():
+            _write(changes)
+
+
+def record(event_type, volunteer_pk, week_start=None, volunteer_id=None):
+    """Queue an outbound event; written immediately when no ``coalesce`` block is open.
+
+    Outside a block the insert joins whatever transaction the caller is in
+    (the admin and management commands run their writes in ``atomic``).
+    """
+    key = (event_type, volunteer_pk, week_start)
+    buffers = _buffers()
+    if buffers:
+        buffers[-1].setdefault(key, volunteer_id)
+    else:
+        _write({key: volunteer_id})
+
+
+def record_week(volunteer_pk, day):
+    record(AVAILABILITY_WEEK_CHANGED, volunteer_pk, week_start_for(day))
+
+
+def _write(changes):
+    if not changes:
+        return
+    missing = {volunteer_pk for (_type, volunteer_pk, _week), volunteer_id in changes.items() if volunteer_id is None}
+    public_ids = dict(VolunteerProfile.objects.filter(pk__in=missing).values_list("pk", "volunteer_id"))
+    events = []
+    for (event_type, volunteer_pk, week_start), volunteer_id in changes.items():
+        volunteer_id = volunteer_id or public_ids.get(volunteer_pk)
+        if volunteer_id is None:
+            # The volunteer is gone in this same transaction; volunteer.deleted covers it.
+            continue
+        payload = {"volunteer_id": volunteer_id}
+        if week_start is not None:
+            iso = week_start.isocalendar()
+            payload.update(
+                {
+                    "week_start": week_start.isoformat(),
+                    "iso_year": iso.year,
+                    "iso_week": iso.week,
+                }
+            )
+        events.append(
+            IntegrationEvent(
+                direction=IntegrationDirection.OUTBOUND,
+                source=settings.INTEGRATION_OUTBOX_SOURCE,
+                event_type=event_type,
+                payload=payload,
+                status=IntegrationStatus.PENDING,
+            )
+        )
+    IntegrationEvent.objects.bulk_create(events)
@@ -0,0 +1,194 @@
+"""Materialized weekly recap: one ``WeeklyRecap`` row per volunteer and week.
+
+Rows hold the seven cells shown by ``availability_recap`` (first start and
+last end of the day, unavailable, or empty). Signals refresh the affected
+volunteer-week on every availability/unavailability write, in the same
+transaction; ``rebuild_weekly_recap`` recomputes whole ranges.
+
+The rendered recap table is cached per week under a key that embeds two
+``CacheGeneration`` counters: one for the week, bumped with every refresh of
+that week, and one for the volunteer list (names, additions, deletions). The
+counters live in the database and are bumped once the writing transaction
+has committed: the counter row is never locked for the length of a request,
+and a table cached under the new key is always rendered from committed data,
+whatever the cache backend.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max, Min, QuerySet
+from django.utils import timezone
+
+from accounts.models import User
+
+from .models import Availability, CacheGeneration, Unavailability, VolunteerProfile, WeeklyRecap
+from .outbox import week_start_for
+
+EMPTY_DAY = {"status": "empty", "start": "", "end": ""}
+UNAVAILABLE_DAY = {"status": "unavailable", "start": "--", "end": "--"}
+EMPTY_WEEK = [EMPTY_DAY] * 7
+
+VOLUNTEERS_GENERATION = "recap:volunteers"
+
+
+def build_days(week_start, availability, unavailable):
+    """Seven recap cells from ``{date: (start, end)}`` and a set of unavailable dates."""
+    days = []
+    for offset in range(7):
+        day = week_start + timedelta(days=offset)
+        if day in availability:
+            start_time, end_time = availability[day]
+            days.append(
+                {
+                    "status": "available",
+                    "start": start_time.strftime("%Hh%M"),
+                    "end": end_time.strftime("%Hh%M"),
+                }
+            )
+        elif day in unavailable:
+            days.append(UNAVAILABLE_DAY)
+        else:
+            days.append(EMPTY_DAY)
+    return days
+
+
+def collect_weeks(availabilities, unavailabilities):
+    """Return ``{(volunteer_pk, week_start): days}`` for the given querysets, in two queries."""
+    availability = defaultdict(dict)
+    for row in (
+        availabilities.order_by()
+        .values("volunteer_id", "date")
+        .annotate(start=Min("start_time"), end=Max("end_time"))
+    ):
+        availability[(row["volunteer_id"], week_start_for(row["date"]))][row["date"]] = (row["start"], row["end"])
+    unavailable = defaultdict(set)
+    for volunteer_pk, day in unavailabilities.order_by().values_list("volunteer_id", "date"):
+        unavailable[(volunteer_pk, week_start_for(day))].add(day)
+    return {
+        key: build_days(key[1], availability.get(key, {}), unavailable.get(key, set()))
+        for key in availability.keys() | unavailable.keys()
+    }
+
+
+def week_generation_key(week_start):
+    return f"recap:week:{week_start.isoformat()}"
+
+
+def bump_generation(key):
+    """Bump the ``key`` counter after the current transaction commits (at once outside one)."""
+    transaction.on_commit(lambda: _bump(key))
+
+
+def _bump(key):
+    if CacheGeneration.objects.filter(key=key).update(value=F("value") + 1):
+        return
+    try:
+        with transaction.atomic():
+            CacheGeneration.objects.create(key=key, value=1)
+    except IntegrityError:
+        CacheGeneration.objects.filter(key=key).update(value=F("value") + 1)
+
+
+def bump_volunteers():
+    bump_generation(VOLUNTEERS_GENERATION)
+
+
+def cached_table(week_start, render):
+    """Return the cached recap table for ``week_start``, calling ``render()`` on a miss."""
+    week_key = week_generation_key(week_start)
+    values = dict(
+        CacheGeneration.objects.filter(key__in=[week_key, VOLUNTEERS_GENERATION]).values_list("key", "value")
+    )
+    cache_key = f"recap-table:{week_start.isoformat()}:{values.get(VOLUNTEERS_GENERATION, 0)}:{values.get(week_key, 0)}"
+    return cache.get_or_set(cache_key, render, settings.RECAP_CACHE_SECONDS)
+
+
+def week_options(year, build):
+    # Only depends on the calendar, so no generation is needed.
+    return cache.get_or_set(f"recap-week-options:{year}", build, None)
+
+
+def refresh_week(volunteer_pk, week_start):
+    """Recompute one volunteer-week; the row is removed when the week is empty."""
+    week_end = week_start + timedelta(days=6)
+    weeks = collect_weeks(
+        Availability.objects.filter(volunteer_id=volunteer_pk, date__range=(week_start, week_end)),
+        Unavailability.objects.filter(volunteer_id=volunteer_pk, date__range=(week_start, week_end)),
+    )
+    days = weeks.get((volunteer_pk, week_start))
+    recaps = WeeklyRecap.objects.filter(volunteer_id=volunteer_pk, week_start=week_start)
+    if days is None:
+        recaps.delete()
+    elif not recaps.update(days=days, updated_at=timezone.now()):
+        WeeklyRecap.objects.create(volunteer_id=volunteer_pk, week_start=week_start, days=days)
+    bump_generation(week_generation_key(week_start))
+
+
+def refresh_day(volunteer_pk, day):
+    refresh_week(volunteer_pk, week_start_for(day))
+
+
+def deleting_volunteer(origin):
+    """True when a delete was started from a volunteer or its account.
+
+    ``origin`` is what the ``post_delete`` signal reports as the start of the
+    deletion. The volunteer's recap rows go away with the cascade, so
+    refreshing them from the availability/unavailability delete signals
+    would only recreate them.
+    """
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model in (VolunteerProfile, User)
+
+
+def rebuild(start=None, end=None, check=False):
+    """Recompute recap rows for weeks between ``start`` and ``end`` (all weeks by default).
+
+    Returns ``(expected, differences)``: the number of non-empty volunteer-weeks
+    and how many stored rows were missing, stale or superfluous. With
+    ``check`` nothing is written.
+    """
+    availabilities = Availability.objects.all()
+    unavailabilities = Unavailability.objects.all()
+    recaps = WeeklyRecap.objects.all()
+    if start:
+        start = week_start_for(start)
+        availabilities = availabilities.filter(date__gte=start)
+        unavailabilities = unavailabilities.filter(date__gte=start)
+        recaps = recaps.filter(week_start__gte=start)
+    if end:
+        end = week_start_for(end) + timedelta(days=6)
+        availabilities = availabilities.filter(date__lte=end)
+        unavailabilities = unavailabilities.filter(date__lte=end)
+        recaps = recaps.filter(week_start__lte=end)
+
+    expected = collect_weeks(availabilities, unavailabilities)
+    stored = {(row.volunteer_id, row.week_start): row for row in recaps}
+    stale = [row for key, row in stored.items() if key in expected and row.days != expected[key]]
+    missing = [key for key in expected if key not in stored]
+    extra = [row for key, row in stored.items() if key not in expected]
+    differences = len(stale) + len(missing) + len(extra)
+    if check or not differences:
+        return len(expected), differences
+
+    now = timezone.now()
+    with transaction.atomic():
+        for row in stale:
+            row.days = expected[(row.volunteer_id, row.week_start)]
+            row.updated_at = now
+        WeeklyRecap.objects.bulk_update(stale, ["days", "updated_at"], batch_size=500)
+        WeeklyRecap.objects.bulk_create(
+            [
+                WeeklyRecap(volunteer_id=volunteer_pk, week_start=week_start, days=expected[(volunteer_pk, week_start)])
+                for volunteer_pk, week_start in missing
+            ],
+            batch_size=500,
+        )
+        WeeklyRecap.objects.filter(pk__in=[row.pk for row in extra]).delete()
+        changed_weeks = {row.week_start for row in stale + extra} | {week_start for _pk, week_start in missing}
+        for week_start in changed_weeks:
+            bump_generation(week_generation_key(week_start))
+    return len(expected), differences
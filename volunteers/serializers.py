@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from .models import Availability, IntegrationEvent, VolunteerConstraint, VolunteerProfile
+from .models import Availability, DeletionTombstone, IntegrationEvent, Unavailability, VolunteerConstraint, VolunteerProfile
 
 
 class VolunteerConstraintSerializer(serializers.ModelSerializer):
@@ -53,6 +53,28 @@ class AvailabilitySerializer(serializers.ModelSerializer):
         fields = ["volunteer_id", "date", "start_time", "end_time"]
 
 
+class AvailabilityChangeSerializer(AvailabilitySerializer):
+    class Meta(AvailabilitySerializer.Meta):
+        fields = ["id", *AvailabilitySerializer.Meta.fields, "updated_at"]
+
+
+class UnavailabilityChangeSerializer(serializers.ModelSerializer):
+    volunteer_id = serializers.IntegerField(source="volunteer.volunteer_id")
+
+    class Meta:
+        model = Unavailability
+        fields = ["id", "volunteer_id", "date", "updated_at"]
+
+
+class DeletionTombstoneSerializer(serializers.ModelSerializer):
+    model = serializers.CharField(source="model_name")
+    id = serializers.IntegerField(source="object_id")
+
+    class Meta:
+        model = DeletionTombstone
+        fields = ["model", "id", "date", "deleted_at"]
+
+
 class IntegrationEventSerializer(serializers.ModelSerializer):
     class Meta:
         model = IntegrationEvent
@@ -81,6 +103,8 @@ class IntegrationEventSerializer(serializers.ModelSerializer):
             "source": {"required": False},
             "target": {"required": False},
         }
+        # (source, external_id) duplicates resolve to the existing event in the view.
+        validators = []
 
 
 class IntegrationEventStatusSerializer(serializers.ModelSerializer):
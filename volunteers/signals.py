@@ -0,0 +1,89 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from accounts.models import User
+
+from . import bulk, outbox, recap
+from .models import (
+    VOLUNTEERS_DELETED,
+    Availability,
+    DeletionTombstone,
+    Unavailability,
+    VolunteerConstraint,
+    VolunteerProfile,
+    mark_deleted,
+)
+
+
+@receiver(post_delete, sender=Availability)
+@receiver(post_delete, sender=Unavailability)
+def record_deletion(sender, instance, **kwargs):
+    if bulk.signals_suspended():
+        return
+    DeletionTombstone.objects.create(
+        model_name=sender._meta.model_name,
+        object_id=instance.pk,
+        date=instance.date,
+    )
+
+
+@receiver(post_save, sender=Availability)
+@receiver(post_save, sender=Unavailability)
+@receiver(post_delete, sender=Availability)
+@receiver(post_delete, sender=Unavailability)
+def record_week_change(sender, instance, **kwargs):
+    if bulk.signals_suspended():
+        return
+    outbox.record_week(instance.volunteer_id, instance.date)
+    loaded_date = getattr(instance, "_loaded_date", None)
+    if loaded_date and loaded_date != instance.date:
+        outbox.record_week(instance.volunteer_id, loaded_date)
+
+
+@receiver(post_save, sender=Availability)
+@receiver(post_save, sender=Unavailability)
+@receiver(post_delete, sender=Availability)
+@receiver(post_delete, sender=Unavailability)
+def refresh_weekly_recap(sender, instance, origin=None, **kwargs):
+    if bulk.signals_suspended() or recap.deleting_volunteer(origin):
+        return
+    recap.refresh_day(instance.volunteer_id, instance.date)
+    loaded_date = getattr(instance, "_loaded_date", None)
+    if loaded_date and recap.week_start_for(loaded_date) != recap.week_start_for(instance.date):
+        recap.refresh_day(instance.volunteer_id, loaded_date)
+
+
+@receiver(post_save, sender=VolunteerProfile)
+def record_profile_change(sender, instance, **kwargs):
+    outbox.record(outbox.VOLUNTEER_UPDATED, instance.pk, volunteer_id=instance.volunteer_id)
+    recap.bump_volunteers()
+
+
+@receiver(post_delete, sender=VolunteerProfile)
+def record_profile_deletion(sender, instance, **kwargs):
+    outbox.record(outbox.VOLUNTEER_DELETED, instance.pk, volunteer_id=instance.volunteer_id)
+    mark_deleted(VOLUNTEERS_DELETED)
+    recap.bump_volunteers()
+
+
+@receiver(post_save, sender=VolunteerConstraint)
+def record_constraint_change(sender, instance, **kwargs):
+    outbox.record(outbox.VOLUNTEER_UPDATED, instance.volunteer_id)
+
+
+@receiver(post_save, sender=User)
+def touch_volunteer_profile(sender, instance, created, update_fields=None, **kwargs):
+    # Name/email live on User; bump the profile so integration fingerprints change.
+    # Logins and password changes leave the exported fields alone.
+    if update_fields is not None and not set(update_fields) & set(User.IDENTITY_FIELDS):
+        return
+    loaded = getattr(instance, "_loaded_identity", None)
+    instance._loaded_identity = instance.identity()
+    if created or loaded == instance._loaded_identity:
+        return
+    profiles = VolunteerProfile.objects.filter(user=instance)
+    for pk, volunteer_id in profiles.values_list("pk", "volunteer_id"):
+        outbox.record(outbox.VOLUNTEER_UPDATED, pk, volunteer_id=volunteer_id)
+    if profiles.update(updated_at=timezone.now()):
+        recap.bump_volunteers()
@@ -0,0 +1,110 @@
+"""Quarter-hour slot bitmaps for availabilities.
+
+Availabilities are entered on a 15-minute grid between 07:00 and 22:00, so a
+volunteer-day fits in 60 bits: bit ``i`` covers ``[07:00 + 15*i, 07:00 + 15*(i+1))``.
+Overlap, "free at" and coverage questions then become integer bit operations.
+
+Times off the grid or outside the window (possible through the admin) are
+widened to the enclosing slots and clipped to the window, so a mask never
+under-reports a busy slot.
+"""
+
+import math
+from datetime import time
+
+SLOT_MINUTES = 15
+SLOT_START = time(7, 0)
+SLOT_END = time(22, 0)
+_SLOT_SECONDS = SLOT_MINUTES * 60
+
+
+def _seconds(value: time) -> float:
+    return value.hour * 3600 + value.minute * 60 + value.second + value.microsecond / 1_000_000
+
+
+_START_SECONDS = _seconds(SLOT_START)
+SLOT_COUNT = int(_seconds(SLOT_END) - _START_SECONDS) // _SLOT_SECONDS
+FULL_MASK = (1 << SLOT_COUNT) - 1
+
+
+def slot_index(value: time) -> int:
+    """Index of the slot starting at ``value``; raises ValueError when off the grid."""
+    offset = _seconds(value) - _START_SECONDS
+    if offset % _SLOT_SECONDS or not 0 <= offset <= SLOT_COUNT * _SLOT_SECONDS:
+        raise ValueError(f"{value} is not a slot boundary between {SLOT_START} and {SLOT_END}")
+    return int(offset) // _SLOT_SECONDS
+
+
+def on_grid(value: time) -> bool:
+    """True for a quarter-hour boundary between SLOT_START and SLOT_END (inclusive)."""
+    try:
+        slot_index(value)
+    except ValueError:
+        return False
+    return True
+
+
+def slot_time(index: int) -> time:
+    minutes = int(_START_SECONDS) // 60 + index * SLOT_MINUTES
+    return time(minutes // 60, minutes % 60)
+
+
+def slot_bit(value: time) -> int:
+    """Mask of the single slot containing ``value`` (0 outside the window)."""
+    offset = _seconds(value) - _START_SECONDS
+    if not 0 <= offset < SLOT_COUNT * _SLOT_SECONDS:
+        return 0
+    return 1 << int(offset // _SLOT_SECONDS)
+
+
+def interval_to_mask(start: time, end: time) -> int:
+    first = max(0, math.floor((_seconds(start) - _START_SECONDS) / _SLOT_SECONDS))
+    last = min(SLOT_COUNT, math.ceil((_seconds(end) - _START_SECONDS) / _SLOT_SECONDS))
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def intervals_to_mask(intervals) -> int:
+    mask = 0
+    for start, end in intervals:
+        mask |= interval_to_mask(start, end)
+    return mask
+
+
+def mask_to_intervals(mask: int) -> list[tuple[time, time]]:
+    """Split a mask into its maximal runs of set bits, as (start, end) times."""
+    intervals = []
+    index = 0
+    mask &= FULL_MASK
+    while mask:
+        if not mask & 1:
+            skip = (mask & -mask).bit_length() - 1
+            mask >>= skip
+            index += skip
+            continue
+        run = (~mask & (mask + 1)).bit_length() - 1
+        intervals.append((slot_time(index), slot_time(index + run)))
+        mask >>= run
+        index += run
+    return intervals
+
+
+def overlaps(mask_a: int, mask_b: int) -> bool:
+    return bool(mask_a & mask_b)
+
+
+def covers(mask: int, start: time, end: time) -> bool:
+    window = interval_to_mask(start, end)
+    return bool(window) and mask & window == window
+
+
+def coverage_counts(masks) -> list[int]:
+    """Number of masks covering each slot."""
+    counts = [0] * SLOT_COUNT
+    for mask in masks:
+        while mask:
+            low = mask & -mask
+            counts[low.bit_length() - 1] += 1
+            mask ^= low
+    return counts
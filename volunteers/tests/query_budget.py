@@ -0,0 +1,21 @@
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """``assertQueryBudget(n)``: like ``assertNumQueries``, but ``n`` is an upper bound.
+
+    Declare the budget of a view once and check it with a small and a larger
+    dataset: a view that stays under the same budget does not run queries per row.
+    Streaming responses must be consumed inside the block.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, budget, using="default"):
+        with CaptureQueriesContext(connections[using]) as captured:
+            yield captured
+        if len(captured) > budget:
+            queries = "\n".join(f"{index}. {query['sql']}" for index, query in enumerate(captured.captured_queries, 1))
+            self.fail(f"{len(captured)} queries executed, budget is {budget}\nCaptured queries were:\n{queries}")
@@ -0,0 +1,66 @@
+from datetime import date, time
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import User
+from volunteers.admin import parse_window_search
+from volunteers.models import OVERLAP_MESSAGE, Availability, VolunteerProfile
+
+
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class AvailabilityAdminSearchTests(TestCase):
+    def setUp(self):
+        admin = User.objects.create_superuser(email="admin@example.org", password="secret")
+        self.client.force_login(admin)
+        day = date(2026, 1, 6)
+        for volunteer_id, start, end in ((7, 7, 18), (8, 9, 12), (9, 13, 15)):
+            user = User.objects.create_user(email=f"b{volunteer_id}@example.org", first_name="Benevole")
+            profile = VolunteerProfile.objects.create(user=user, volunteer_id=volunteer_id)
+            Availability.objects.create(volunteer=profile, date=day, start_time=time(start), end_time=time(end))
+
+    def test_parse_window_search(self):
+        self.assertEqual(parse_window_search("2026-01-06 9:30-11:00"), (date(2026, 1, 6), time(9, 30), time(11)))
+        self.assertIsNone(parse_window_search("2026-01-06 11:00-09:00"))
+        self.assertIsNone(parse_window_search("dupont"))
+        self.assertIsNone(parse_window_search("2026-01-06 05:00-06:00"))
+        self.assertIsNone(parse_window_search("2026-01-06 09:10-11:00"))
+
+    def test_window_search_lists_best_fit_first(self):
+        response = self.client.get(reverse("admin:volunteers_availability_changelist"), {"q": "2026-01-06 10:00-11:00"})
+        self.assertEqual(response.status_code, 200)
+        found = [availability.volunteer.volunteer_id for availability in response.context["cl"].result_list]
+        self.assertEqual(found, [8, 7])
+
+
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class AvailabilityAdminFormTests(TestCase):
+    def setUp(self):
+        admin = User.objects.create_superuser(email="admin@example.org", password="secret")
+        self.client.force_login(admin)
+        user = User.objects.create_user(email="jean@example.org", first_name="Jean")
+        self.profile = VolunteerProfile.objects.create(user=user, volunteer_id=7)
+        Availability.objects.create(volunteer=self.profile, date=date(2026, 1, 6), start_time=time(9), end_time=time(12))
+
+    def post(self, start, end):
+        return self.client.post(
+            reverse("admin:volunteers_availability_add"),
+            {
+                "volunteer": self.profile.pk,
+                "date": "2026-01-06",
+                "start_time": start,
+                "end_time": end,
+                "created_at_0": "2026-01-01",
+                "created_at_1": "08:00:00",
+            },
+        )
+
+    def test_overlap_is_a_form_error(self):
+        response = self.post("11:00", "14:00")
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, OVERLAP_MESSAGE)
+        self.assertContains(response, 'value="11:00"')
+        self.assertEqual(Availability.objects.count(), 1)
+
+        self.assertEqual(self.post("12:00", "14:00").status_code, 302)
+        self.assertEqual(Availability.objects.count(), 2)
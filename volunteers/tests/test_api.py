@@ -0,0 +1,417 @@
+import gzip
+import json
+import tempfile
+from datetime import date, time, timedelta
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from volunteers.archive import archive_events
+from volunteers.matrix import decode_masks
+from volunteers.models import (
+    Availability,
+    IntegrationDirection,
+    IntegrationEvent,
+    Unavailability,
+    VolunteerConstraint,
+    VolunteerProfile,
+)
+from volunteers.pagination import KeysetPagination
+from volunteers.slots import interval_to_mask
+
+API_KEY = "test-key"
+
+
+@override_settings(INTEGRATION_API_KEY=API_KEY)
+class IntegrationApiTestCase(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(email="jean@example.org", first_name="Jean", last_name="Dupont")
+        self.profile = VolunteerProfile.objects.create(user=user, volunteer_id=7, phone="+33 601020304")
+        VolunteerConstraint.objects.create(volunteer=self.profile, max_days_per_week=3, max_wait_hours=2)
+        other = User.objects.create_user(email="anne@example.org", first_name="Anne", last_name="Martin")
+        self.other_profile = VolunteerProfile.objects.create(user=other, volunteer_id=8)
+
+    def get(self, url, **extra):
+        return self.client.get(url, HTTP_X_ASF_INTEGRATION_KEY=API_KEY, **extra)
+
+    def inbound_events(self):
+        return IntegrationEvent.objects.filter(direction=IntegrationDirection.INBOUND)
+
+
+class CsvExportTests(IntegrationApiTestCase):
+    def test_volunteers_csv_layout(self):
+        response = self.get(reverse("integration-volunteers-csv"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            lines,
+            [
+                "volunteer_id,first_name,last_name,short_name,email,phone,"
+                "max_days_per_week,max_expeditions_per_week,max_expeditions_per_day,max_wait_hours",
+                "7,Jean,Dupont,J.,jean@example.org,+33 601020304,3,,,2",
+                "8,Anne,Martin,A.,anne@example.org,,,,,",
+            ],
+        )
+
+    def test_availabilities_csv_filters(self):
+        Availability.objects.create(volunteer=self.profile, date=date(2026, 1, 5), start_time=time(8), end_time=time(12))
+        Availability.objects.create(volunteer=self.profile, date=date(2026, 1, 12), start_time=time(9), end_time=time(10))
+        response = self.get(reverse("integration-availabilities-csv"), data={"end": "2026-01-10"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines, ["volunteer_id,date,start_time,end_time", "7,2026-01-05,08:00,12:00"])
+
+    def test_csv_gzip_when_accepted(self):
+        response = self.get(reverse("integration-volunteers-csv"), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        content = gzip.decompress(b"".join(response.streaming_content)).decode()
+        self.assertTrue(content.startswith("volunteer_id,first_name"))
+
+    def test_csv_requires_key(self):
+        response = self.client.get(reverse("integration-volunteers-csv"))
+        self.assertEqual(response.status_code, 403)
+
+
+class AvailabilityMatrixTests(IntegrationApiTestCase):
+    def test_dense_matrix_for_week_range(self):
+        Availability.objects.create(volunteer=self.profile, date=date(2026, 1, 6), start_time=time(8), end_time=time(12))
+        Availability.objects.create(volunteer=self.profile, date=date(2026, 1, 6), start_time=time(14), end_time=time(15))
+        Availability.objects.create(volunteer=self.profile, date=date(2026, 1, 13), start_time=time(9), end_time=time(10))
+        Availability.objects.create(volunteer=self.profile, date=date(2026, 1, 20), start_time=time(9), end_time=time(10))
+        Unavailability.objects.create(volunteer=self.other_profile, date=date(2026, 1, 12))
+
+        with self.assertNumQueries(7):
+            response = self.get(reverse("integration-matrix"), data={"year": 2026, "week": 2, "weeks": 2})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data["start"], data["end"], data["days"]), ("2026-01-05", "2026-01-18", 14))
+        first, second = data["volunteers"]
+        self.assertEqual(first["volunteer_id"], 7)
+        self.assertEqual((first["max_days_per_week"], first["max_wait_hours"]), (3, 2))
+        masks = decode_masks(first["slots"])
+        self.assertEqual(len(masks), 14)
+        self.assertEqual(masks[1], interval_to_mask(time(8), time(12)) | interval_to_mask(time(14), time(15)))
+        self.assertEqual(masks[8], interval_to_mask(time(9), time(10)))
+        self.assertEqual(sum(1 for mask in masks if mask), 2)
+        self.assertEqual(second["unavailable"], "00000001000000")
+        self.assertEqual(set(decode_masks(second["slots"])), {0})
+
+    def test_conditional_get_and_validation(self):
+        url = reverse("integration-matrix")
+        response = self.get(url, data={"year": 2026, "week": 2})
+        self.assertEqual(self.get(url, data={"year": 2026, "week": 2}, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+        self.assertEqual(self.get(url, data={"year": 2026, "week": 60}).status_code, 400)
+        self.assertEqual(self.get(url, data={"weeks": 100}).status_code, 400)
+
+
+class AvailableVolunteersTests(IntegrationApiTestCase):
+    def setUp(self):
+        super().setUp()
+        third = User.objects.create_user(email="paul@example.org", first_name="Paul", last_name="Durand")
+        self.third_profile = VolunteerProfile.objects.create(user=third, volunteer_id=9)
+        day = date(2026, 1, 6)
+        Availability.objects.create(volunteer=self.profile, date=day, start_time=time(7), end_time=time(18))
+        Availability.objects.create(volunteer=self.other_profile, date=day, start_time=time(9), end_time=time(12))
+        Availability.objects.create(volunteer=self.third_profile, date=day, start_time=time(10), end_time=time(12))
+        Availability.objects.create(volunteer=self.third_profile, date=date(2026, 1, 7), start_time=time(7), end_time=time(22))
+
+    def test_ranked_by_fit(self):
+        response = self.get(
+            reverse("integration-available"), data={"date": "2026-01-06", "start": "09:30", "end": "11:30"}
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual([row["volunteer_id"] for row in results], [8, 7])
+        self.assertEqual([row["slack_minutes"] for row in results], [60, 540])
+
+    def test_unavailable_volunteers_are_excluded(self):
+        Unavailability.objects.create(volunteer=self.other_profile, date=date(2026, 1, 6))
+        response = self.get(
+            reverse("integration-available"), data={"date": "2026-01-06", "start": "10:00", "end": "11:00"}
+        )
+        self.assertEqual([row["volunteer_id"] for row in response.json()["results"]], [9, 7])
+
+    def test_invalid_window(self):
+        response = self.get(reverse("integration-available"), data={"date": "2026-01-06", "start": "11:00", "end": "10:00"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("end", response.json())
+        for start, end in (("05:00", "06:00"), ("09:10", "11:00"), ("21:00", "23:00")):
+            response = self.get(reverse("integration-available"), data={"date": "2026-01-06", "start": start, "end": end})
+            self.assertEqual(response.status_code, 400, (start, end))
+
+    def test_covering_compares_real_times(self):
+        day = date(2026, 1, 6)
+        self.assertFalse(Availability.objects.filter(date=day).covering(time(5), time(6)).exists())
+        # Both 09:05 and an off-grid 09:10 start fall in the 09:00 slot of the masks.
+        later = date(2026, 1, 8)
+        Availability.objects.create(volunteer=self.profile, date=later, start_time=time(9), end_time=time(12))
+        Availability.objects.create(volunteer=self.other_profile, date=later, start_time=time(9, 10), end_time=time(12))
+        covering = Availability.objects.filter(date=later).covering(time(9, 5), time(11))
+        self.assertEqual(list(covering.values_list("volunteer__volunteer_id", flat=True)), [7])
+
+
+class KeysetPaginationTests(IntegrationApiTestCase):
+    def setUp(self):
+        super().setUp()
+        for day in (5, 6):
+            for hour in (8, 10, 12):
+                Availability.objects.create(
+                    volunteer=self.profile,
+                    date=date(2026, 1, day),
+                    start_time=time(hour),
+                    end_time=time(hour + 1),
+                )
+
+    def test_unpaginated_by_default(self):
+        response = self.get(reverse("integration-availabilities-list"))
+        self.assertIsInstance(response.json(), list)
+        self.assertEqual(len(response.json()), 6)
+
+    def test_walks_all_pages_with_cursor(self):
+        url = reverse("integration-availabilities-list") + "?page_size=4"
+        seen = []
+        while url:
+            payload = self.get(url).json()
+            seen.extend((row["date"], row["start_time"]) for row in payload["results"])
+            url = payload["next"]
+        self.assertEqual(len(seen), 6)
+        self.assertEqual(seen, sorted(seen))
+
+    def test_page_size_is_capped(self):
+        with override_settings(INTEGRATION_MAX_PAGE_SIZE=2):
+            payload = self.get(reverse("integration-availabilities-list"), data={"page_size": 50}).json()
+        self.assertEqual(len(payload["results"]), 2)
+        self.assertIn("page_size=2", payload["next"])
+
+    def test_invalid_cursor(self):
+        response = self.get(reverse("integration-availabilities-list"), data={"cursor": "garbage"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_filter_seeks_to_the_cursor(self):
+        paginator = KeysetPagination()
+        for queryset, ordering, values in (
+            (Availability.objects.all(), ("date", "start_time", "id"), [date(2026, 1, 5), time(10), 2]),
+            (IntegrationEvent.objects.all(), ("created_at", "id"), [timezone.now(), 2]),
+        ):
+            with self.subTest(model=queryset.model.__name__):
+                page = queryset.order_by(*ordering).filter(paginator.build_filter(ordering, values))
+                table = queryset.model._meta.db_table
+                first = ordering[0]
+                self.assertIn(f'"{table}"."{first}" >=', str(page.query))
+                if connection.vendor == "sqlite":
+                    plan = page[:5].explain()
+                    self.assertIn(f"SEARCH {table} USING INDEX", plan)
+                    self.assertIn(f"({first}>?)", plan)
+
+
+@override_settings(INTEGRATION_SYNC_LAG_SECONDS=0)
+class AvailabilityChangesTests(IntegrationApiTestCase):
+    def test_delta_reports_upserts_and_deletions(self):
+        old = Availability.objects.create(volunteer=self.profile, date=date(2026, 1, 5), start_time=time(8), end_time=time(9))
+        snapshot = self.get(reverse("integration-changes")).json()
+        self.assertEqual([row["id"] for row in snapshot["availabilities"]], [old.pk])
+        self.assertEqual(snapshot["deleted"], [])
+
+        old_pk = old.pk
+        old.delete()
+        new = Availability.objects.create(volunteer=self.profile, date=date(2026, 1, 5), start_time=time(10), end_time=time(12))
+        delta = self.get(reverse("integration-changes"), data={"since": snapshot["next_since"]}).json()
+        self.assertEqual([row["id"] for row in delta["availabilities"]], [new.pk])
+        self.assertEqual(delta["deleted"][0]["model"], "availability")
+        self.assertEqual(delta["deleted"][0]["id"], old_pk)
+
+    def test_since_older_than_retention_is_gone(self):
+        response = self.get(reverse("integration-changes"), data={"since": "2000-01-01T00:00:00+00:00"})
+        self.assertEqual(response.status_code, 410)
+
+    def test_invalid_since(self):
+        response = self.get(reverse("integration-changes"), data={"since": "yesterday"})
+        self.assertEqual(response.status_code, 400)
+
+
+class ConditionalGetTests(IntegrationApiTestCase):
+    def test_list_returns_304_for_matching_etag(self):
+        url = reverse("integration-availabilities-list")
+        first = self.get(url)
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(2):
+            second = self.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_etag_changes_on_write_and_delete(self):
+        url = reverse("integration-availabilities-list")
+        availability = Availability.objects.create(
+            volunteer=self.profile, date=date(2026, 1, 5), start_time=time(8), end_time=time(9)
+        )
+        before = self.get(url)["ETag"]
+        availability.delete()
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH=before).status_code, 200)
+
+    def test_csv_conditional_get(self):
+        url = reverse("integration-volunteers-csv")
+        first = self.get(url)
+        second = self.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 304)
+        self.profile.user.first_name = "Jacques"
+        self.profile.user.save()
+        third = self.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(third.status_code, 200)
+
+    def test_last_modified_moves_on_deletion(self):
+        hour_ago = timezone.now() - timedelta(hours=1)
+        VolunteerProfile.objects.update(updated_at=hour_ago)
+        VolunteerConstraint.objects.update(updated_at=hour_ago)
+        IntegrationEvent.objects.create(source="asf-wms", event_type="shipment.created")
+        IntegrationEvent.objects.update(created_at=hour_ago - timedelta(days=200), updated_at=hour_ago)
+        urls = [
+            reverse("integration-volunteers-csv"),
+            reverse("integration-volunteers-list"),
+            reverse("integration-events-list"),
+        ]
+        first = {url: self.get(url)["Last-Modified"] for url in urls}
+        for url in urls:
+            self.assertEqual(self.get(url, HTTP_IF_MODIFIED_SINCE=first[url]).status_code, 304)
+
+        self.other_profile.delete()
+        with tempfile.TemporaryDirectory() as root:
+            archive_events(IntegrationEvent.objects.all(), root)
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.get(url, HTTP_IF_MODIFIED_SINCE=first[url]).status_code, 200)
+
+
+class BulkEventTests(IntegrationApiTestCase):
+    def post(self, url, body, content_type="application/json", **extra):
+        return self.client.post(url, body, content_type=content_type, HTTP_X_ASF_INTEGRATION_KEY=API_KEY, **extra)
+
+    def test_bulk_json_array_with_header_defaults(self):
+        events = [{"event_type": "shipment.created", "payload": {"n": n}} for n in range(3)]
+        response = self.post(
+            reverse("integration-events-bulk"),
+            json.dumps(events),
+            HTTP_X_ASF_SOURCE="asf-wms",
+        )
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual(body["created"], 3)
+        ids = [entry["id"] for entry in body["results"]]
+        self.assertEqual(set(self.inbound_events().values_list("pk", flat=True)), set(ids))
+        self.assertTrue(all(event.source == "asf-wms" for event in self.inbound_events()))
+
+    def test_bulk_ndjson_reports_errors_per_event(self):
+        body = "\n".join(
+            [
+                json.dumps({"source": "asf-wms", "event_type": "ok"}),
+                json.dumps({"source": "asf-wms"}),
+            ]
+        )
+        response = self.post(reverse("integration-events-bulk"), body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 207)
+        results = response.json()["results"]
+        self.assertIn("id", results[0])
+        self.assertIn("event_type", results[1]["errors"])
+        self.assertEqual(self.inbound_events().count(), 1)
+
+    def test_bulk_requires_source(self):
+        response = self.post(reverse("integration-events-bulk"), json.dumps([{"event_type": "ok"}]))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("source", response.json()["results"][0]["errors"])
+
+
+class IdempotentEventTests(IntegrationApiTestCase):
+    def post(self, url, payload):
+        return self.client.post(
+            url,
+            json.dumps(payload),
+            content_type="application/json",
+            HTTP_X_ASF_INTEGRATION_KEY=API_KEY,
+        )
+
+    def test_single_create_returns_existing_event(self):
+        payload = {"source": "asf-wms", "event_type": "shipment.created", "external_id": "abc"}
+        first = self.post(reverse("integration-events-list"), payload)
+        second = self.post(reverse("integration-events-list"), payload)
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.json()["id"], second.json()["id"])
+        self.assertEqual(self.inbound_events().count(), 1)
+
+    def test_bulk_deduplicates_against_table_and_batch(self):
+        IntegrationEvent.objects.create(source="asf-wms", event_type="x", external_id="a")
+        events = [
+            {"source": "asf-wms", "event_type": "x", "external_id": "a"},
+            {"source": "asf-wms", "event_type": "x", "external_id": "b"},
+            {"source": "asf-wms", "event_type": "x", "external_id": "b"},
+            {"source": "asf-scheduler", "event_type": "x", "external_id": "a"},
+            {"source": "asf-wms", "event_type": "x"},
+        ]
+        body = self.post(reverse("integration-events-bulk"), events).json()
+        self.assertEqual(body["created"], 3)
+        self.assertEqual(body["duplicates"], 2)
+        results = body["results"]
+        self.assertTrue(results[0]["duplicate"])
+        self.assertEqual(results[1]["id"], results[2]["id"])
+        self.assertEqual(self.inbound_events().count(), 4)
+
+
+@override_settings(INTEGRATION_FEED_POLL_SECONDS=0)
+class EventFeedTests(IntegrationApiTestCase):
+    def test_long_poll_returns_events_after_cursor(self):
+        cursor = self.get(reverse("integration-events-poll"), data={"timeout": 0}).json()["last_id"]
+        event = IntegrationEvent.objects.create(source="asf-wms", event_type="shipment.created")
+        IntegrationEvent.objects.create(source="asf-scheduler", event_type="plan.published")
+        body = self.get(
+            reverse("integration-events-poll"),
+            data={"after": cursor, "source": "asf-wms", "timeout": 0},
+        ).json()
+        self.assertEqual([row["id"] for row in body["events"]], [event.pk])
+        self.assertGreater(body["last_id"], event.pk)
+
+    def test_lower_id_committed_after_a_higher_one_is_not_skipped(self):
+        url = reverse("integration-events-poll")
+        cursor = self.get(url, data={"timeout": 0}).json()["last_id"]
+        later = IntegrationEvent.objects.create(pk=cursor + 2, source="asf-wms", event_type="shipment.created")
+        body = self.get(url, data={"after": cursor, "timeout": 0}).json()
+        self.assertEqual([row["id"] for row in body["events"]], [later.pk])
+        self.assertEqual((body["last_id"], body["cursor"]), (later.pk, f"{later.pk}:{cursor + 1}"))
+
+        # The transaction that took the lower id commits only now.
+        earlier = IntegrationEvent.objects.create(pk=cursor + 1, source="asf-wms", event_type="shipment.created")
+        body = self.get(url, data={"after": body["cursor"], "timeout": 0}).json()
+        self.assertEqual([row["id"] for row in body["events"]], [earlier.pk])
+        self.assertEqual(body["cursor"], str(later.pk))
+
+    def test_gap_is_given_up_once_a_higher_id_is_old(self):
+        url = reverse("integration-events-poll")
+        cursor = self.get(url, data={"timeout": 0}).json()["last_id"]
+        later = IntegrationEvent.objects.create(pk=cursor + 2, source="asf-wms", event_type="shipment.created")
+        IntegrationEvent.objects.filter(pk=later.pk).update(created_at=timezone.now() - timedelta(minutes=5))
+        body = self.get(url, data={"after": f"{cursor}:{cursor - 5}", "timeout": 0}).json()
+        self.assertEqual([row["id"] for row in body["events"]], [later.pk])
+        self.assertEqual(body["cursor"], str(later.pk))
+
+    def test_long_poll_times_out_empty(self):
+        body = self.get(reverse("integration-events-poll"), data={"timeout": 0}).json()
+        self.assertEqual(body["events"], [])
+
+    def test_stream_requires_asgi(self):
+        response = self.get(reverse("integration-events-stream"))
+        self.assertEqual(response.status_code, 501)
+
+    async def test_stream_resumes_from_last_event_id(self):
+        event = await IntegrationEvent.objects.acreate(source="asf-wms", event_type="shipment.created")
+        response = await self.async_client.get(
+            reverse("integration-events-stream"),
+            headers={"X-ASF-Integration-Key": API_KEY, "Last-Event-ID": str(event.pk - 1)},
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        chunks = []
+        async for chunk in response.streaming_content:
+            chunks.append(chunk.decode())
+            if chunk.startswith(b"id:"):
+                break
+        self.assertIn(f"id: {event.pk}\nevent: shipment.created\n", chunks[-1])
@@ -0,0 +1,82 @@
+import json
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from accounts.models import User
+from volunteers import benchmarks
+from volunteers.models import Availability, IntegrationEvent, Unavailability, VolunteerProfile, WeeklyRecap
+
+
+class SeedBenchmarkDataTests(TestCase):
+    def dataset(self):
+        return (
+            list(Availability.objects.values_list("volunteer__volunteer_id", "date", "start_time", "end_time")),
+            list(Unavailability.objects.values_list("volunteer__volunteer_id", "date")),
+            list(IntegrationEvent.objects.order_by("external_id").values_list("external_id", "status", "payload")),
+        )
+
+    def test_seed_is_reproducible_and_leaves_other_rows_alone(self):
+        user = User.objects.create_user(email="jean@example.org", first_name="Jean", last_name="Dupont")
+        VolunteerProfile.objects.create(user=user, volunteer_id=7)
+
+        counts = benchmarks.seed(volunteers=4, weeks=2, events=10, random_seed=3)
+        self.assertEqual(counts["volunteers"], 4)
+        self.assertEqual(counts["events"], 10)
+        self.assertEqual(WeeklyRecap.objects.count(), counts["recap_weeks"])
+        first = self.dataset()
+        self.assertEqual(len(first[0]), counts["availabilities"])
+
+        arguments = ["--volunteers", "4", "--weeks", "2", "--events", "10", "--seed", "3"]
+        call_command("seed_benchmark_data", *arguments, stdout=StringIO())
+        self.assertEqual(self.dataset(), first)
+        self.assertEqual(VolunteerProfile.objects.count(), 5)
+
+        call_command("seed_benchmark_data", "--reset", stdout=StringIO())
+        self.assertEqual(list(VolunteerProfile.objects.values_list("volunteer_id", flat=True)), [7])
+        self.assertFalse(IntegrationEvent.objects.filter(source=benchmarks.BENCH_EVENT_SOURCE).exists())
+
+
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class RunBenchmarksTests(TestCase):
+    def test_reports_every_scenario(self):
+        with self.assertRaises(CommandError):
+            call_command("run_benchmarks", "--iterations", "1", stdout=StringIO())
+
+        benchmarks.seed(volunteers=3, weeks=1, events=5)
+        output = StringIO()
+        call_command("run_benchmarks", "--iterations", "2", "--warmup", "0", stdout=output)
+        report = json.loads(output.getvalue())
+        self.assertEqual(
+            set(report["results"]),
+            {
+                "availability_recap",
+                "availability_recap_uncached",
+                "availability_create",
+                "volunteers_csv",
+                "availabilities_csv",
+                "integration_volunteers",
+                "integration_availabilities",
+                "integration_events",
+                "import_volunteers",
+                "import_volunteers_bulk",
+            },
+        )
+        for result in report["results"].values():
+            self.assertEqual(result["iterations"], 2)
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+            self.assertGreater(result["queries"], 0)
+            self.assertGreater(result["peak_memory_kb"], 0)
+        self.assertEqual(report["meta"]["dataset"]["volunteers"], 3)
+
+    def test_compare_flags_regressions(self):
+        baseline = {"results": {"recap": {"p95_ms": 10.0, "queries": 4}}}
+        current = {"results": {"recap": {"p95_ms": 11.0, "queries": 5}, "new": {"p95_ms": 1.0, "queries": 1}}}
+        self.assertEqual(benchmarks.compare(baseline, current), [("recap", "queries", 4, 5)])
+        self.assertEqual(benchmarks.compare(baseline, current, tolerance=0.05)[1], ("recap", "p95_ms", 10.0, 11.0))
+
+    def test_percentile(self):
+        self.assertEqual(benchmarks.percentile([], 50), 0.0)
+        self.assertEqual(benchmarks.percentile([1.0, 2.0, 3.0, 4.0], 50), 2.5)
+        self.assertEqual(benchmarks.percentile([1.0, 2.0, 3.0, 4.0], 100), 4.0)
@@ -0,0 +1,209 @@
+from datetime import date, time, timedelta
+from unittest import mock
+
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import User
+from volunteers import recap
+from volunteers.bulk import PatternConflict, apply_pattern, conflicting_dates, copy_week, pattern_dates, replace_days
+from volunteers.models import (
+    Availability,
+    AvailabilityOverlap,
+    DeletionTombstone,
+    Unavailability,
+    VolunteerProfile,
+    WeeklyRecap,
+)
+from volunteers.slots import interval_to_mask
+from volunteers.tests.test_outbox import week_post_data
+
+WEEK_START = date(2026, 1, 5)
+
+
+class ReplaceDaysTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="jean@example.org", first_name="Jean", last_name="Dupont")
+        self.profile = VolunteerProfile.objects.create(user=self.user, volunteer_id=7)
+
+    def test_rewrites_days_and_side_effects(self):
+        Availability.objects.create(volunteer=self.profile, date=WEEK_START, start_time=time(8), end_time=time(9))
+        Unavailability.objects.create(volunteer=self.profile, date=WEEK_START + timedelta(days=1))
+        kept = Unavailability.objects.create(volunteer=self.profile, date=WEEK_START + timedelta(days=2))
+
+        created = replace_days(
+            self.profile,
+            [(WEEK_START, time(9), time(12)), (WEEK_START + timedelta(days=1), time(14), time(16))],
+            [WEEK_START + timedelta(days=2), WEEK_START + timedelta(days=3)],
+        )
+
+        self.assertEqual(len(created), 2)
+        self.assertEqual(
+            list(Availability.objects.values_list("date", "start_time", "slot_mask")),
+            [
+                (WEEK_START, time(9), created[0].slot_mask),
+                (WEEK_START + timedelta(days=1), time(14), created[1].slot_mask),
+            ],
+        )
+        self.assertNotEqual(created[0].slot_mask, 0)
+        self.assertEqual(
+            list(Unavailability.objects.values_list("pk", flat=True)),
+            [kept.pk, Unavailability.objects.get(date=WEEK_START + timedelta(days=3)).pk],
+        )
+        self.assertEqual(
+            sorted(DeletionTombstone.objects.values_list("model_name", flat=True)),
+            ["availability", "unavailability"],
+        )
+        self.assertEqual(recap.rebuild(check=True), (1, 0))
+        self.assertEqual(WeeklyRecap.objects.get().days[0]["start"], "09h00")
+
+    def test_failure_leaves_week_untouched(self):
+        Availability.objects.create(volunteer=self.profile, date=WEEK_START, start_time=time(8), end_time=time(9))
+        with mock.patch.object(Unavailability.objects, "bulk_create", side_effect=IntegrityError("boom")):
+            with self.assertRaises(IntegrityError):
+                replace_days(self.profile, [(WEEK_START, time(9), time(12))], [WEEK_START + timedelta(days=1)])
+        self.assertEqual(list(Availability.objects.values_list("start_time", flat=True)), [time(8)])
+        self.assertFalse(DeletionTombstone.objects.exists())
+
+    @override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+    def test_week_form_submit_is_batched(self):
+        self.client.force_login(self.user)
+        url = reverse("volunteer-availability-create")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, week_post_data(WEEK_START, {0, 1, 2}))
+        # The recap counter bump runs after commit and is part of the submit's cost.
+        with self.assertNumQueries(19), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, week_post_data(WEEK_START, {0, 2, 4, 6}))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Availability.objects.count(), 4)
+        self.assertEqual(Unavailability.objects.count(), 3)
+
+
+class RecurringAvailabilityTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="jean@example.org", first_name="Jean", last_name="Dupont")
+        self.profile = VolunteerProfile.objects.create(user=self.user, volunteer_id=7)
+
+    def test_pattern_expands_weekdays(self):
+        created = apply_pattern(self.profile, [1, 3], time(9), time(17), WEEK_START, date(2026, 1, 20))
+        self.assertEqual(
+            [availability.date for availability in created],
+            [date(2026, 1, 6), date(2026, 1, 8), date(2026, 1, 13), date(2026, 1, 15), date(2026, 1, 20)],
+        )
+        self.assertEqual(WeeklyRecap.objects.count(), 3)
+
+    def test_pattern_conflicts_are_reported_in_one_query(self):
+        Availability.objects.create(volunteer=self.profile, date=date(2026, 1, 13), start_time=time(8), end_time=time(10))
+        Availability.objects.create(volunteer=self.profile, date=date(2026, 1, 6), start_time=time(7), end_time=time(9))
+        Unavailability.objects.create(volunteer=self.profile, date=date(2026, 1, 20))
+        with self.assertNumQueries(1):
+            conflicts = conflicting_dates(
+                self.profile, pattern_dates(WEEK_START, date(2026, 1, 31), [1]), interval_to_mask(time(9), time(17))
+            )
+        self.assertEqual(conflicts, {date(2026, 1, 13), date(2026, 1, 20)})
+
+        with self.assertRaises(PatternConflict) as raised:
+            apply_pattern(self.profile, [1], time(9), time(17), WEEK_START, date(2026, 1, 31))
+        self.assertEqual(raised.exception.dates, [date(2026, 1, 13), date(2026, 1, 20)])
+        self.assertEqual(Availability.objects.count(), 2)
+
+        apply_pattern(self.profile, [1], time(9), time(17), WEEK_START, date(2026, 1, 31), replace=True)
+        self.assertEqual(Availability.objects.filter(start_time=time(9)).count(), 4)
+        self.assertFalse(Unavailability.objects.exists())
+
+    def test_copy_week(self):
+        replace_days(self.profile, [(WEEK_START, time(9), time(12))], [WEEK_START + timedelta(days=2)])
+        Availability.objects.create(volunteer=self.profile, date=date(2026, 1, 14), start_time=time(8), end_time=time(9))
+
+        with self.assertRaises(PatternConflict):
+            copy_week(self.profile, WEEK_START, 2)
+        created = copy_week(self.profile, WEEK_START, 2, replace=True)
+
+        self.assertEqual([availability.date for availability in created], [date(2026, 1, 12), date(2026, 1, 19)])
+        self.assertFalse(Availability.objects.filter(date=date(2026, 1, 14)).exists())
+        self.assertEqual(
+            list(Unavailability.objects.values_list("date", flat=True)),
+            [date(2026, 1, 7), date(2026, 1, 14), date(2026, 1, 21)],
+        )
+        self.assertEqual(recap.rebuild(check=True), (3, 0))
+
+    @override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+    def test_repeat_view(self):
+        self.client.force_login(self.user)
+        url = reverse("volunteer-availability-repeat")
+        self.assertEqual(self.client.get(url).status_code, 200)
+        data = {
+            "action": "pattern",
+            "pattern-weekdays": ["1"],
+            "pattern-start_time": "09:00",
+            "pattern-end_time": "17:00",
+            "pattern-first_day": "2026-01-05",
+            "pattern-last_day": "2026-01-20",
+        }
+        self.assertRedirects(self.client.post(url, data), reverse("volunteer-availabilities"))
+        self.assertEqual(Availability.objects.count(), 3)
+
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "06/01/2026")
+
+        response = self.client.post(url, {"action": "copy", "copy-week_start": "2026-01-12", "copy-weeks": "1"})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(
+            url, {"action": "copy", "copy-week_start": "2026-01-12", "copy-weeks": "1", "copy-replace": "on"}
+        )
+        self.assertRedirects(response, reverse("volunteer-availabilities"))
+        self.assertEqual(Availability.objects.filter(date=date(2026, 1, 20)).count(), 1)
+
+
+class AvailabilityOverlapTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="jean@example.org", first_name="Jean", last_name="Dupont")
+        self.profile = VolunteerProfile.objects.create(user=self.user, volunteer_id=7)
+        self.morning = Availability.objects.create(
+            volunteer=self.profile, date=WEEK_START, start_time=time(9), end_time=time(12)
+        )
+
+    def test_database_rejects_overlaps(self):
+        with self.assertRaises(AvailabilityOverlap):
+            Availability.objects.create(volunteer=self.profile, date=WEEK_START, start_time=time(11), end_time=time(13))
+        Availability.objects.create(volunteer=self.profile, date=WEEK_START, start_time=time(12), end_time=time(14))
+        other = User.objects.create_user(email="marie@example.org", first_name="Marie", last_name="Martin")
+        other_profile = VolunteerProfile.objects.create(user=other, volunteer_id=8)
+        Availability.objects.create(volunteer=other_profile, date=WEEK_START, start_time=time(9), end_time=time(12))
+
+        self.morning.end_time = time(13)
+        with self.assertRaises(AvailabilityOverlap):
+            self.morning.save()
+        self.morning.refresh_from_db()
+        self.morning.end_time = time(11)
+        self.morning.save()
+        self.assertEqual(Availability.objects.count(), 3)
+
+    def test_bulk_insert_rejects_overlaps(self):
+        with self.assertRaises(AvailabilityOverlap):
+            replace_days(
+                self.profile,
+                [
+                    (WEEK_START + timedelta(days=1), time(9), time(12)),
+                    (WEEK_START + timedelta(days=1), time(10), time(11)),
+                ],
+                [],
+            )
+        self.assertEqual(list(Availability.objects.values_list("pk", flat=True)), [self.morning.pk])
+
+    @override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+    def test_update_view_reports_overlap(self):
+        afternoon = Availability.objects.create(
+            volunteer=self.profile, date=WEEK_START, start_time=time(14), end_time=time(16)
+        )
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse("volunteer-availability-edit", args=[afternoon.pk]),
+            {"date": "2026-01-05", "start_time": "11:00", "end_time": "16:00"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "chevauche une disponibilite existante")
+        afternoon.refresh_from_db()
+        self.assertEqual(afternoon.start_time, time(14))
@@ -0,0 +1,80 @@
+import random
+from datetime import date, timedelta
+from unittest import skipIf
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import User
+from volunteers import coverage as coverage_module
+from volunteers import slots
+from volunteers.coverage import coverage
+from volunteers.models import Availability, VolunteerProfile
+
+WEEK_START = date(2026, 1, 5)
+
+
+class CoverageTests(TestCase):
+    def setUp(self):
+        rng = random.Random(20260105)
+        self.rows = []
+        for volunteer_id in range(1, 16):
+            user = User.objects.create_user(email=f"b{volunteer_id}@example.org", first_name="Benevole")
+            profile = VolunteerProfile.objects.create(user=user, volunteer_id=volunteer_id)
+            for offset in rng.sample(range(14), 5):
+                first = rng.randrange(slots.SLOT_COUNT)
+                last = rng.randrange(first + 1, slots.SLOT_COUNT + 1)
+                row = (WEEK_START + timedelta(days=offset), slots.slot_time(first), slots.slot_time(last))
+                Availability.objects.create(volunteer=profile, date=row[0], start_time=row[1], end_time=row[2])
+                self.rows.append(row)
+
+    def expected(self, days):
+        counts = [[0] * slots.SLOT_COUNT for _ in range(days)]
+        for day, start, end in self.rows:
+            offset = (day - WEEK_START).days
+            if offset >= days:
+                continue
+            for index in range(slots.SLOT_COUNT):
+                if start <= slots.slot_time(index) < end:
+                    counts[offset][index] += 1
+        return counts
+
+    @skipIf(coverage_module.np is None, "numpy is not installed")
+    def test_numpy_counts_match_intervals(self):
+        self.assertEqual(coverage(WEEK_START, 14), self.expected(14))
+        self.assertEqual(coverage(WEEK_START, 7), self.expected(7))
+
+    def test_python_fallback_matches(self):
+        rows = list(coverage_module._grouped_masks(WEEK_START, WEEK_START + timedelta(days=13)))
+        self.assertEqual(coverage_module._coverage_python(rows, WEEK_START, 14), self.expected(14))
+
+    @override_settings(INTEGRATION_API_KEY="test-key")
+    def test_api(self):
+        response = self.client.get(
+            reverse("integration-coverage"),
+            {"year": 2026, "week": 2, "weeks": 2},
+            HTTP_X_ASF_INTEGRATION_KEY="test-key",
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data["start"], data["days"], data["slot_count"]), ("2026-01-05", 14, 60))
+        self.assertEqual(data["counts"], self.expected(14))
+
+    @override_settings(INTEGRATION_API_KEY="test-key", INTEGRATION_MATRIX_MAX_WEEKS=1, INTEGRATION_COVERAGE_MAX_WEEKS=2)
+    def test_api_week_cap_is_its_own(self):
+        url = reverse("integration-coverage")
+        for weeks, status in ((2, 200), (3, 400)):
+            response = self.client.get(
+                url, {"year": 2026, "week": 2, "weeks": weeks}, HTTP_X_ASF_INTEGRATION_KEY="test-key"
+            )
+            self.assertEqual(response.status_code, status)
+
+    @override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+    def test_view(self):
+        self.client.force_login(User.objects.get(email="b1@example.org"))
+        response = self.client.get(reverse("volunteer-availability-coverage"), {"year": 2026, "week": 2, "weeks": 2})
+        self.assertEqual(response.status_code, 200)
+        weeks = response.context["weeks"]
+        self.assertEqual([week["number"] for week in weeks], [2, 3])
+        self.assertEqual(weeks[1]["rows"][4]["label"], "08h00")
+        self.assertEqual([cell["count"] for cell in weeks[0]["rows"][0]["cells"]], [day[0] for day in self.expected(7)])
@@ -0,0 +1,209 @@
+import csv
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import skipIf
+
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+from volunteers import outbox
+from volunteers.management.commands.import_volunteers import openpyxl
+from volunteers.models import IntegrationEvent, VolunteerConstraint, VolunteerProfile
+
+HEADERS = ["ID", "Benevole", "Prenom", "Telephone", "Mail", "Max jours semaine", "Attente max h"]
+
+
+class ImportVolunteersTests(TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+    def write_csv(self, rows):
+        path = Path(self.workdir.name) / "benevoles.csv"
+        with path.open("w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(HEADERS)
+            writer.writerows(rows)
+        return path
+
+    def run_import(self, path, *arguments):
+        output = StringIO()
+        self.progress = StringIO()
+        call_command("import_volunteers", str(path), *arguments, stdout=output, stderr=self.progress)
+        return output.getvalue().strip()
+
+    def existing(self):
+        user = User.objects.create_user(email="jean@example.org", first_name="Jean", last_name="Dupont")
+        profile = VolunteerProfile.objects.create(user=user, volunteer_id=1)
+        VolunteerConstraint.objects.create(volunteer=profile, max_days_per_week=1)
+        User.objects.create_user(email="marie@example.org", first_name="Marie", last_name="Curie")
+
+    def state(self):
+        return sorted(
+            VolunteerProfile.objects.values_list(
+                "volunteer_id",
+                "short_name",
+                "phone",
+                "user__email",
+                "user__first_name",
+                "user__last_name",
+                "constraints__max_days_per_week",
+                "constraints__max_wait_hours",
+            )
+        )
+
+    def rows(self):
+        return [
+            ["1", "DUPONT Jean-Pierre", "", "06 12 34 56 78", "jean@example.org", "3", ""],
+            ["2", "CURIE Marie", "", "0700000000.0", "marie@example.org", "2", "4"],
+            ["3", "NOBEL Alfred", "", "", "alfred@example.org", "", "1"],
+            ["", "SANS Identifiant", "", "", "sans@example.org", "", ""],
+            ["3", "NOBEL Alfred Bernhard", "", "", "alfred@example.org", "5", "1"],
+        ]
+
+    def test_bulk_matches_row_by_row(self):
+        path = self.write_csv(self.rows())
+        results = []
+        for arguments in (
+            [],
+            ["--bulk"],
+            ["--update"],
+            ["--update", "--bulk"],
+            ["--update", "--batch-size", "2"],
+            ["--update", "--bulk", "--batch-size", "2"],
+        ):
+            with self.subTest(arguments=arguments):
+                IntegrationEvent.objects.all().delete()
+                VolunteerProfile.objects.all().delete()
+                User.objects.all().delete()
+                self.existing()
+                message = self.run_import(path, *arguments)
+                events = set(
+                    IntegrationEvent.objects.filter(event_type=outbox.VOLUNTEER_UPDATED).values_list(
+                        "payload__volunteer_id", flat=True
+                    )
+                )
+                results.append((message, self.state(), events))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[2], results[3])
+        self.assertEqual(results[2], results[4])
+        self.assertEqual(results[2], results[5])
+        self.assertEqual(results[0][0], "Import termine. Crees: 2, mis a jour: 0, ignores: 3.")
+        self.assertEqual(results[2][0], "Import termine. Crees: 2, mis a jour: 2, ignores: 1.")
+        self.assertEqual(results[2][2], {1, 2, 3})
+        self.assertFalse(User.objects.get(email="alfred@example.org").has_usable_password())
+
+    def test_bulk_dry_run_and_default_password(self):
+        path = self.write_csv(self.rows())
+        message = self.run_import(path, "--bulk", "--dry-run")
+        self.assertEqual(message, "Import termine. Crees: 3, mis a jour: 0, ignores: 2.")
+        self.assertFalse(VolunteerProfile.objects.exists())
+        self.assertFalse(IntegrationEvent.objects.exists())
+
+        self.run_import(path, "--bulk", "--default-password", "secret-pass")
+        self.assertTrue(User.objects.get(email="jean@example.org").check_password("secret-pass"))
+        self.assertTrue(User.objects.get(email="alfred@example.org").check_password("secret-pass"))
+
+    def test_bulk_matches_emails_as_stored(self):
+        user = User.objects.create_user(email="jean@example.org", first_name="Jean", last_name="Dupont")
+        self.run_import(self.write_csv([["1", "DUPONT Jean", "", "", "Jean@Example.org", "", ""]]), "--bulk")
+        user.refresh_from_db()
+        self.assertEqual(user.volunteer_profile.volunteer_id, 1)
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_bulk_refuses_an_account_linked_to_another_volunteer(self):
+        self.existing()
+        with self.assertRaises(CommandError):
+            self.run_import(self.write_csv([["9", "DUPONT Jean", "", "", "jean@example.org", "", ""]]), "--bulk")
+
+    def test_bulk_query_count_does_not_grow_with_rows(self):
+        counts = []
+        for size in (5, 40):
+            VolunteerProfile.objects.all().delete()
+            User.objects.all().delete()
+            rows = [
+                [str(index), f"NOM{index} Prenom", "", "", f"b{index}@example.org", "2", ""]
+                for index in range(1, size + 1)
+            ]
+            path = self.write_csv(rows)
+            self.run_import(path, "--bulk")
+            with CaptureQueriesContext(connection) as queries:
+                self.run_import(path, "--bulk", "--update")
+            counts.append(len(queries))
+            self.assertEqual(VolunteerConstraint.objects.filter(max_days_per_week=2).count(), size)
+        self.assertEqual(counts[0], counts[1])
+
+    def test_dry_run_spans_batches(self):
+        path = self.write_csv(self.rows())
+        message = self.run_import(path, "--update", "--dry-run", "--batch-size", "2")
+        self.assertEqual(message, "Import termine. Crees: 3, mis a jour: 1, ignores: 1.")
+        self.assertEqual(self.progress.getvalue().splitlines()[-1][:19], "5 lignes traitees (")
+        self.assertFalse(VolunteerProfile.objects.exists())
+
+    def test_resumes_after_a_failed_batch(self):
+        self.existing()
+        rows = [
+            [str(index), f"NOM{index} Prenom", "", "", f"b{index}@example.org", "", ""] for index in range(10, 15)
+        ]
+        rows.append(["15", "DUPONT Jean", "", "", "jean@example.org", "", ""])
+        path = self.write_csv(rows)
+        checkpoint = Path(self.workdir.name) / "reprise.json"
+        arguments = ["--bulk", "--batch-size", "2", "--checkpoint", str(checkpoint)]
+
+        with self.assertRaises(CommandError):
+            self.run_import(path, *arguments)
+        self.assertEqual(
+            list(VolunteerProfile.objects.order_by("volunteer_id").values_list("volunteer_id", flat=True)),
+            [1, 10, 11, 12, 13],
+        )
+        self.assertEqual(json.loads(checkpoint.read_text())["progress"]["rows"], 4)
+
+        rows[-1][4] = "jean.dupont@example.org"
+        self.write_csv(rows)
+        message = self.run_import(path, *arguments, "--resume")
+        self.assertEqual(message, "Import termine. Crees: 6, mis a jour: 0, ignores: 0.")
+        self.assertIn("Reprise apres la ligne 4.", self.progress.getvalue())
+        self.assertEqual(VolunteerProfile.objects.count(), 7)
+        self.assertFalse(checkpoint.exists())
+
+    def test_refuses_to_resume_when_imported_rows_changed(self):
+        self.existing()
+        rows = [
+            [str(index), f"NOM{index} Prenom", "", "", f"b{index}@example.org", "", ""] for index in range(2, 5)
+        ]
+        rows.append(["9", "DUPONT Jean", "", "", "jean@example.org", "", ""])
+        path = self.write_csv(rows)
+        checkpoint = Path(self.workdir.name) / "reprise.json"
+        arguments = ["--batch-size", "2", "--checkpoint", str(checkpoint)]
+        with self.assertRaises(IntegrityError):
+            self.run_import(path, *arguments)
+        self.assertEqual(json.loads(checkpoint.read_text())["progress"]["rows"], 2)
+
+        rows[0][1] = "AUTRE Nom"
+        self.write_csv(rows)
+        with self.assertRaisesMessage(CommandError, "ont change"):
+            self.run_import(path, *arguments, "--resume")
+
+    @skipIf(openpyxl is None, "openpyxl n'est pas installe")
+    def test_reads_xlsx(self):
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(["ID", "NOM", "PRÉNOM", "Téléphone", "MAIL", "MAX_EXP_JOUR"])
+        sheet.append([4, "Curie", "Marie", 612345678, "marie@example.org", 2.0])
+        sheet.append([5, "Nobel", "Alfred", None, "alfred@example.org"])
+        path = Path(self.workdir.name) / "benevoles.xlsx"
+        workbook.save(path)
+
+        message = self.run_import(path, "--batch-size", "1")
+        self.assertEqual(message, "Import termine. Crees: 2, mis a jour: 0, ignores: 0.")
+        marie = VolunteerProfile.objects.get(volunteer_id=4)
+        self.assertEqual(
+            (marie.user.first_name, marie.phone, marie.constraints.max_expeditions_per_day),
+            ("Marie", "612345678", 2),
+        )
+        self.assertEqual(self.progress.getvalue().count("lignes traitees"), 2)
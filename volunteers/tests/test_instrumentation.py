@@ -0,0 +1,98 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import User
+from volunteers import benchmarks, instrumentation
+from volunteers.tests.query_budget import QueryBudgetMixin
+
+# Queries per request, session and user lookups included. They must not grow with the data.
+QUERY_BUDGETS = {
+    "volunteer-availability-recap": 5,
+    "integration-volunteers-csv": 4,
+    "integration-availabilities-csv": 5,
+    "integration-volunteers-list": 4,
+    "integration-availabilities-list": 5,
+    "integration-events-list": 4,
+    "integration-changes": 4,
+    "integration-matrix": 9,
+    "admin:volunteers_availability_changelist": 5,
+    "admin:volunteers_volunteerprofile_changelist": 5,
+}
+WEEK_PARAMS = {"year": 2026, "week": 2}
+
+
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    def fetch(self, name):
+        params = WEEK_PARAMS if name in {"volunteer-availability-recap", "integration-matrix"} else {}
+        response = self.client.get(reverse(name), params)
+        self.assertEqual(response.status_code, 200, name)
+        if response.streaming:
+            b"".join(response.streaming_content)
+        return response
+
+    def test_views_stay_within_budget_as_data_grows(self):
+        for volunteers in (2, 15):
+            benchmarks.seed(volunteers=volunteers, weeks=2, events=30)
+            User.objects.filter(email=benchmarks.BENCH_STAFF_EMAIL).update(is_superuser=True)
+            self.client.force_login(User.objects.get(email=benchmarks.BENCH_STAFF_EMAIL))
+            for name, budget in QUERY_BUDGETS.items():
+                cache.clear()
+                with self.subTest(name=name, volunteers=volunteers), self.assertQueryBudget(budget):
+                    self.fetch(name)
+
+    def test_budget_failure_lists_the_queries(self):
+        with self.assertRaisesMessage(AssertionError, "2 queries executed, budget is 1"):
+            with self.assertQueryBudget(1):
+                User.objects.count()
+                User.objects.exists()
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage",
+    REQUEST_INSTRUMENTATION=True,
+)
+class InstrumentationMiddlewareTests(TestCase):
+    def setUp(self):
+        instrumentation.reset()
+        benchmarks.seed(volunteers=3, weeks=1, events=5)
+        self.client.force_login(User.objects.get(email=benchmarks.BENCH_STAFF_EMAIL))
+
+    def test_server_timing_log_and_totals(self):
+        with self.assertLogs("volunteers.instrumentation", "INFO") as logs:
+            response = self.client.get(reverse("volunteer-availability-recap"), WEEK_PARAMS)
+        timing = dict(item.strip().split(";", 1) for item in response["Server-Timing"].split(","))
+        self.assertEqual(set(timing), {"db", "view", "tpl", "total"})
+        self.assertRegex(timing["db"], r'desc="\d+ queries"')
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["route"], "volunteer-availability-recap")
+        self.assertEqual(line["status"], 200)
+        self.assertGreater(line["queries"], 0)
+        self.assertGreater(line["template_ms"], 0)
+        self.assertLessEqual(line["template_ms"], line["view_ms"])
+
+        with self.assertLogs("volunteers.instrumentation", "INFO"):
+            self.client.get(reverse("volunteer-availability-recap"), WEEK_PARAMS)
+        totals = instrumentation.summary()["volunteer-availability-recap"]
+        self.assertEqual(totals["requests"], 2)
+        self.assertEqual(totals["queries"], totals["avg_queries"] * 2)
+
+    def test_streaming_response_is_recorded_once_consumed(self):
+        response = self.client.get(reverse("integration-availabilities-csv"))
+        self.assertIn("Server-Timing", response)
+        self.assertEqual(instrumentation.summary(), {})
+        with self.assertLogs("volunteers.instrumentation", "INFO"):
+            b"".join(response.streaming_content)
+            response.close()
+        totals = instrumentation.summary()["integration-availabilities-csv"]
+        self.assertEqual(totals["requests"], 1)
+        self.assertGreater(totals["queries"], 0)
+
+    @override_settings(REQUEST_INSTRUMENTATION=False)
+    def test_disabled_by_default(self):
+        response = self.client.get(reverse("volunteer-availability-recap"), WEEK_PARAMS)
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(instrumentation.summary(), {})
@@ -0,0 +1,132 @@
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from volunteers.archive import archive_events, archive_path, restore_events
+from volunteers.integrations import claim_events, close_pool_connections, process_batch, release_stale_claims
+from volunteers.models import IntegrationDirection, IntegrationEvent, IntegrationStatus
+
+
+def ok_handler(event):
+    return None
+
+
+def failing_handler(event):
+    raise RuntimeError("boom")
+
+
+class IntegrationWorkerTests(TestCase):
+    def setUp(self):
+        for event_type in ("ok", "ok", "boom", "unhandled"):
+            IntegrationEvent.objects.create(source="asf-wms", event_type=event_type)
+        IntegrationEvent.objects.create(
+            source="asf-benev",
+            event_type="ok",
+            direction=IntegrationDirection.OUTBOUND,
+        )
+
+    def test_claim_is_exclusive_and_limited_to_handled_types(self):
+        first = claim_events("worker-a", ["ok", "boom"], limit=2)
+        second = claim_events("worker-b", ["ok", "boom"], limit=10)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertFalse({event.pk for event in first} & {event.pk for event in second})
+        self.assertEqual(IntegrationEvent.objects.filter(event_type="unhandled", status="pending").count(), 1)
+
+    def test_process_batch_writes_outcomes(self):
+        handlers = {"ok": ok_handler, "boom": failing_handler}
+        events = claim_events("worker-a", handlers.keys(), limit=10)
+        with ThreadPoolExecutor(max_workers=2) as executor, self.assertLogs("volunteers.integrations", "ERROR"):
+            processed, failed = process_batch(events, handlers, executor)
+        self.assertEqual((processed, failed), (2, 1))
+        failed_event = IntegrationEvent.objects.get(event_type="boom")
+        self.assertEqual(failed_event.status, IntegrationStatus.FAILED)
+        self.assertEqual(failed_event.error_message, "boom")
+        self.assertIsNotNone(failed_event.processed_at)
+
+    def test_pool_threads_keep_their_connection_for_the_batch(self):
+        events = claim_events("worker-a", ["ok"], limit=10)
+        with ThreadPoolExecutor(max_workers=1) as executor, mock.patch.object(
+            type(connections["default"]), "close", autospec=True
+        ) as close:
+            process_batch(events, {"ok": ok_handler}, executor)
+        self.assertEqual(close.call_count, 0)
+
+    def test_close_pool_connections_runs_once_per_thread(self):
+        threads = set()
+        with ThreadPoolExecutor(max_workers=3) as executor, mock.patch(
+            "volunteers.integrations.close_old_connections", lambda: threads.add(threading.get_ident())
+        ):
+            close_pool_connections(executor, 3)
+        self.assertEqual(len(threads), 3)
+
+    def test_process_batch_keeps_the_result_of_a_new_owner(self):
+        handlers = {"ok": ok_handler}
+        events = claim_events("worker-a", handlers.keys(), limit=10)
+        IntegrationEvent.objects.filter(pk=events[0].pk).update(claimed_by="worker-b")
+        with ThreadPoolExecutor(max_workers=1) as executor, self.assertLogs("volunteers.integrations", "WARNING"):
+            process_batch(events, handlers, executor)
+        taken_over = IntegrationEvent.objects.get(pk=events[0].pk)
+        self.assertEqual((taken_over.status, taken_over.claimed_by), (IntegrationStatus.PROCESSING, "worker-b"))
+        self.assertEqual(IntegrationEvent.objects.get(pk=events[1].pk).status, IntegrationStatus.PROCESSED)
+
+    @override_settings(INTEGRATION_EVENT_HANDLERS={"ok": "volunteers.tests.test_integrations.ok_handler"})
+    def test_worker_releases_stale_claims_while_the_queue_is_busy(self):
+        stale = IntegrationEvent.objects.filter(event_type="ok", direction=IntegrationDirection.INBOUND).first()
+        IntegrationEvent.objects.filter(pk=stale.pk).update(
+            status=IntegrationStatus.PROCESSING,
+            claimed_by="dead-worker",
+            claimed_at=timezone.now() - timedelta(minutes=10),
+        )
+        call_command("process_integration_events", "--once", "--threads", "1", "--batch-size", "1", stdout=StringIO())
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, IntegrationStatus.PROCESSED)
+
+    def test_release_stale_claims(self):
+        claim_events("worker-a", ["ok"], limit=10)
+        IntegrationEvent.objects.filter(status=IntegrationStatus.PROCESSING).update(
+            claimed_at=timezone.now() - timedelta(minutes=10)
+        )
+        self.assertEqual(release_stale_claims(60), 2)
+        self.assertEqual(IntegrationEvent.objects.filter(status=IntegrationStatus.PROCESSING).count(), 0)
+
+
+class IntegrationArchiveTests(TestCase):
+    def test_archive_then_restore_round_trip(self):
+        old = IntegrationEvent.objects.create(
+            source="asf-wms",
+            event_type="ok",
+            external_id="e1",
+            payload={"n": 1},
+            status=IntegrationStatus.PROCESSED,
+        )
+        created_at = timezone.now() - timedelta(days=200)
+        IntegrationEvent.objects.filter(pk=old.pk).update(created_at=created_at)
+        recent = IntegrationEvent.objects.create(source="asf-wms", event_type="ok", status=IntegrationStatus.PROCESSED)
+        cutoff = timezone.now() - timedelta(days=90)
+
+        with tempfile.TemporaryDirectory() as root:
+            queryset = IntegrationEvent.objects.filter(status=IntegrationStatus.PROCESSED, created_at__lt=cutoff)
+            self.assertEqual(archive_events(queryset, root, batch_size=1), 1)
+            self.assertEqual(list(IntegrationEvent.objects.values_list("pk", flat=True)), [recent.pk])
+            day = timezone.localdate(created_at)
+            self.assertTrue(archive_path(root, day).exists())
+
+            self.assertEqual(restore_events(root, day, day), 1)
+            IntegrationEvent.objects.filter(pk=old.pk).update(status=IntegrationStatus.FAILED)
+            live_updated_at = IntegrationEvent.objects.get(pk=old.pk).updated_at
+            self.assertEqual(restore_events(root, day, day), 0)
+
+        restored = IntegrationEvent.objects.get(pk=old.pk)
+        self.assertEqual(restored.payload, {"n": 1})
+        self.assertEqual(restored.created_at, created_at)
+        self.assertEqual((restored.status, restored.updated_at), (IntegrationStatus.FAILED, live_updated_at))
+        self.assertEqual(IntegrationEvent.objects.count(), 2)
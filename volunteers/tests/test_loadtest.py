@@ -0,0 +1,59 @@
+from django.test import LiveServerTestCase, SimpleTestCase, override_settings
+
+from volunteers import benchmarks
+from volunteers.loadtest import DEFAULT_MIX, LoadTest, LoadTestError, parse_mix
+
+
+class ParseMixTests(SimpleTestCase):
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix("week_form=4, recap"), {"week_form": 4, "recap": 1})
+        with self.assertRaises(LoadTestError):
+            parse_mix("week_form=4,unknown=1")
+        with self.assertRaises(LoadTestError):
+            parse_mix("recap=x")
+        with self.assertRaises(LoadTestError):
+            parse_mix("recap=0")
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage",
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    INTEGRATION_API_KEY="test-key",
+)
+class LoadTestTests(LiveServerTestCase):
+    def test_runs_every_action_against_a_live_server(self):
+        benchmarks.seed(volunteers=2, weeks=1, events=5, password="bench-pass")
+        report = LoadTest(
+            self.live_server_url,
+            users=2,
+            password="bench-pass",
+            api_key="test-key",
+            mix=DEFAULT_MIX,
+            concurrency=1,
+            duration=None,
+            requests=100,
+            weeks=1,
+        ).run()
+
+        self.assertEqual(report["errors"], 0, report["endpoints"])
+        self.assertEqual(report["login"]["endpoints"]["login"]["requests"], 2)
+        self.assertEqual(
+            set(report["endpoints"]),
+            {
+                "week_form:get",
+                "week_form:post",
+                "recap",
+                "volunteers_csv",
+                "availabilities_csv",
+                "volunteers_api",
+                "availabilities_api",
+                "events_api",
+            },
+        )
+        posts = report["endpoints"]["week_form:post"]
+        self.assertEqual(posts["statuses"], {"302": posts["requests"]})
+
+    def test_refused_login_stops_the_run(self):
+        benchmarks.seed(volunteers=1, weeks=1, events=0, password="bench-pass")
+        with self.assertRaises(LoadTestError):
+            LoadTest(self.live_server_url, users=1, password="wrong", api_key="test-key", requests=1).run()
@@ -0,0 +1,114 @@
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from volunteers import metrics
+from volunteers.models import IntegrationDirection, IntegrationEvent, IntegrationStatus
+
+
+def sample(text, name):
+    for line in text.splitlines():
+        if line.startswith(name + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{name} missing from:\n{text}")
+
+
+class MetricsTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings_override = override_settings(
+            METRICS_ENABLED=True,
+            METRICS_DIR=self.directory,
+            METRICS_FLUSH_SECONDS=0,
+            INTEGRATION_API_KEY="test-key",
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def scrape(self):
+        response = self.client.get(reverse("metrics"), HTTP_X_ASF_INTEGRATION_KEY="test-key")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        return response.content.decode()
+
+
+class MetricsStoreTests(MetricsTestCase):
+    def test_concurrent_flushes(self):
+        store = metrics.MetricsStore(self.directory, flush_seconds=0)
+
+        def observe_many(_index):
+            for _ in range(300):
+                store.observe("recap", 0.01, 1, 0.001, 200)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(observe_many, range(8)))
+        self.assertEqual(store.collect()["recap"]["count"], 2400)
+        self.assertEqual([path.name for path in self.directory.iterdir()], [store.path.name])
+
+    def test_failed_write_does_not_raise(self):
+        blocker = self.directory / "blocker"
+        blocker.write_text("")
+        store = metrics.MetricsStore(blocker / "metrics", flush_seconds=0)
+        with self.assertLogs("volunteers.metrics", "WARNING"):
+            store.observe("recap", 0.01, 1, 0.001, 200)
+
+    def test_processes_are_summed(self):
+        first = metrics.MetricsStore(self.directory, flush_seconds=0)
+        second = metrics.MetricsStore(self.directory, flush_seconds=0)
+        second.path = self.directory / "other-worker.json"
+        first.observe("recap", 0.02, 4, 0.001, 200)
+        first.observe("recap", 3.0, 5, 0.5, 500)
+        second.observe("recap", 0.004, 4, 0.001, 200)
+
+        views = first.collect()
+        self.assertEqual(views["recap"]["count"], 3)
+        self.assertEqual(views["recap"]["queries"], 13)
+        self.assertEqual(views["recap"]["errors"], 1)
+        self.assertEqual(sum(views["recap"]["buckets"]), 3)
+
+        text = "\n".join(metrics._request_lines(views))
+        self.assertIn('asf_request_duration_seconds_bucket{view="recap",le="0.005"} 1', text)
+        self.assertIn('asf_request_duration_seconds_bucket{view="recap",le="0.025"} 2', text)
+        self.assertIn('asf_request_duration_seconds_bucket{view="recap",le="+Inf"} 3', text)
+
+
+class MetricsEndpointTests(MetricsTestCase):
+    def test_requires_staff_or_key(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        user = User.objects.create_user(email="jean@example.org", first_name="Jean", last_name="Dupont")
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+
+    def test_requests_queue_and_tables(self):
+        now = timezone.now()
+        for source, status, age in (
+            ("planner", IntegrationStatus.PENDING, 120),
+            ("planner", IntegrationStatus.PENDING, 30),
+            ("planner", IntegrationStatus.FAILED, 10),
+            ("planner", IntegrationStatus.PROCESSED, 600),
+        ):
+            event = IntegrationEvent.objects.create(
+                direction=IntegrationDirection.INBOUND, source=source, event_type="volunteer.sync", status=status
+            )
+            IntegrationEvent.objects.filter(pk=event.pk).update(created_at=now - timedelta(seconds=age))
+
+        self.client.get(reverse("integration-volunteers-list"), HTTP_X_ASF_INTEGRATION_KEY="test-key")
+        text = self.scrape()
+
+        labels = 'source="planner",event_type="volunteer.sync"'
+        self.assertEqual(sample(text, f'asf_integration_events{{{labels},status="pending"}}'), 2)
+        self.assertEqual(sample(text, f'asf_integration_events{{{labels},status="failed"}}'), 1)
+        self.assertGreaterEqual(sample(text, f"asf_integration_oldest_pending_age_seconds{{{labels}}}"), 120)
+        self.assertEqual(sample(text, 'asf_table_rows{table="integration_events"}'), 4)
+        self.assertEqual(sample(text, 'asf_request_duration_seconds_count{view="integration-volunteers-list"}'), 1)
+        self.assertGreater(sample(text, 'asf_request_db_queries_total{view="integration-volunteers-list"}'), 0)
+        self.assertEqual(sample(text, 'asf_request_errors_total{view="integration-volunteers-list"}'), 0)
+        self.assertTrue(list(self.directory.glob("*.json")))
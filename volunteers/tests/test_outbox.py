@@ -0,0 +1,118 @@
+from datetime import date, time, timedelta
+
+from django.core.handlers.exception import convert_exception_to_response
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from accounts.models import User
+from volunteers import outbox
+from volunteers.middleware import OutboxMiddleware
+from volunteers.models import Availability, IntegrationDirection, IntegrationEvent, VolunteerProfile
+
+WEEK_START = date(2026, 1, 5)
+
+
+def week_post_data(week_start, available_days):
+    data = {
+        "week_start": week_start.isoformat(),
+        "form-TOTAL_FORMS": "7",
+        "form-INITIAL_FORMS": "0",
+    }
+    for offset in range(7):
+        day = week_start + timedelta(days=offset)
+        prefix = f"form-{offset}-"
+        data[prefix + "date"] = day.isoformat()
+        if offset in available_days:
+            data[prefix + "availability"] = "available"
+            data[prefix + "start_time"] = "09:00"
+            data[prefix + "end_time"] = "17:00"
+        else:
+            data[prefix + "availability"] = "unavailable"
+    return data
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="jean@example.org", first_name="Jean", last_name="Dupont")
+        self.profile = VolunteerProfile.objects.create(user=self.user, volunteer_id=7)
+        IntegrationEvent.objects.all().delete()
+
+    def outbound(self, event_type=outbox.AVAILABILITY_WEEK_CHANGED):
+        return IntegrationEvent.objects.filter(direction=IntegrationDirection.OUTBOUND, event_type=event_type)
+
+    def test_week_rewrite_coalesces_to_one_event(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse("volunteer-availability-create"), week_post_data(WEEK_START, {0, 2, 4}))
+        self.assertEqual(response.status_code, 302)
+        events = list(self.outbound())
+        self.assertEqual(len(events), 1)
+        self.assertEqual(
+            events[0].payload,
+            {"volunteer_id": 7, "week_start": "2026-01-05", "iso_year": 2026, "iso_week": 2},
+        )
+
+    def test_rollback_discards_events(self):
+        with self.assertRaises(RuntimeError):
+            with outbox.coalesce():
+                Availability.objects.create(
+                    volunteer=self.profile, date=WEEK_START, start_time=time(9), end_time=time(10)
+                )
+                raise RuntimeError("abort")
+        self.assertFalse(Availability.objects.exists())
+        self.assertFalse(self.outbound().exists())
+
+    def test_failed_request_keeps_neither_writes_nor_events(self):
+        def failing_view(request):
+            Availability.objects.create(volunteer=self.profile, date=WEEK_START, start_time=time(9), end_time=time(10))
+            raise RuntimeError("boom")
+
+        middleware = OutboxMiddleware(convert_exception_to_response(failing_view))
+        with self.assertLogs("django.request", "ERROR"):
+            response = middleware(RequestFactory().post("/"))
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(Availability.objects.exists())
+        self.assertFalse(self.outbound().exists())
+
+    def test_moving_a_slot_notifies_both_weeks(self):
+        availability = Availability.objects.create(
+            volunteer=self.profile, date=WEEK_START, start_time=time(9), end_time=time(10)
+        )
+        IntegrationEvent.objects.all().delete()
+        availability = Availability.objects.get(pk=availability.pk)
+        availability.date = WEEK_START + timedelta(days=7)
+        with outbox.coalesce():
+            availability.save()
+        weeks = sorted(event.payload["week_start"] for event in self.outbound())
+        self.assertEqual(weeks, ["2026-01-05", "2026-01-12"])
+
+    def test_profile_and_user_changes_emit_volunteer_updated(self):
+        with outbox.coalesce():
+            self.user.first_name = "Jacques"
+            self.user.save()
+            self.profile.save()
+        self.assertEqual(self.outbound(outbox.VOLUNTEER_UPDATED).count(), 1)
+
+    def test_failed_nested_block_drops_its_events(self):
+        with outbox.coalesce():
+            Availability.objects.create(volunteer=self.profile, date=WEEK_START, start_time=time(9), end_time=time(10))
+            with self.assertRaises(RuntimeError):
+                with outbox.coalesce():
+                    Availability.objects.create(
+                        volunteer=self.profile,
+                        date=WEEK_START + timedelta(days=7),
+                        start_time=time(9),
+                        end_time=time(10),
+                    )
+                    raise RuntimeError("abort")
+        self.assertEqual(Availability.objects.count(), 1)
+        self.assertEqual([event.payload["week_start"] for event in self.outbound()], ["2026-01-05"])
+
+    def test_only_identity_changes_emit_volunteer_updated(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password("nouveau-mot-de-passe")
+        user.save()
+        user.save()
+        self.assertFalse(self.outbound(outbox.VOLUNTEER_UPDATED).exists())
+        user.last_name = "Martin"
+        user.save()
+        self.assertEqual(self.outbound(outbox.VOLUNTEER_UPDATED).count(), 1)
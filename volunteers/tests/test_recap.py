@@ -0,0 +1,123 @@
+from datetime import date, time
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import User
+from volunteers import recap
+from volunteers.models import Availability, CacheGeneration, Unavailability, VolunteerProfile, WeeklyRecap
+
+WEEK_START = date(2026, 1, 5)
+
+
+class WeeklyRecapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="jean@example.org", first_name="Jean", last_name="Dupont")
+        self.profile = VolunteerProfile.objects.create(user=self.user, volunteer_id=7)
+
+    def days(self, week_start=WEEK_START):
+        return WeeklyRecap.objects.get(volunteer=self.profile, week_start=week_start).days
+
+    def test_writes_refresh_the_week(self):
+        availability = Availability.objects.create(
+            volunteer=self.profile, date=date(2026, 1, 6), start_time=time(8), end_time=time(10)
+        )
+        Availability.objects.create(volunteer=self.profile, date=date(2026, 1, 6), start_time=time(14), end_time=time(17))
+        Unavailability.objects.create(volunteer=self.profile, date=date(2026, 1, 9))
+        days = self.days()
+        self.assertEqual(days[0], recap.EMPTY_DAY)
+        self.assertEqual(days[1], {"status": "available", "start": "08h00", "end": "17h00"})
+        self.assertEqual(days[4], recap.UNAVAILABLE_DAY)
+
+        availability.date = date(2026, 1, 13)
+        availability.save()
+        self.assertEqual(self.days()[1]["start"], "14h00")
+        self.assertEqual(self.days(date(2026, 1, 12))[1]["end"], "10h00")
+
+        Availability.objects.filter(date=date(2026, 1, 13)).delete()
+        self.assertFalse(WeeklyRecap.objects.filter(week_start=date(2026, 1, 12)).exists())
+        self.assertEqual(recap.rebuild(check=True), (1, 0))
+
+    def test_profile_deletion_drops_recap(self):
+        Availability.objects.create(volunteer=self.profile, date=date(2026, 1, 6), start_time=time(8), end_time=time(10))
+        Unavailability.objects.create(volunteer=self.profile, date=date(2026, 1, 7))
+        self.user.delete()
+        self.assertFalse(WeeklyRecap.objects.exists())
+
+    def test_failed_profile_deletion_leaves_recap_refreshing(self):
+        Unavailability.objects.create(volunteer=self.profile, date=date(2026, 1, 7))
+
+        def fail(**kwargs):
+            raise RuntimeError("boom")
+
+        post_delete.connect(fail, sender=Unavailability)
+        try:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                VolunteerProfile.objects.filter(pk=self.profile.pk).delete()
+        finally:
+            post_delete.disconnect(fail, sender=Unavailability)
+        Availability.objects.create(volunteer=self.profile, date=date(2026, 1, 6), start_time=time(8), end_time=time(10))
+        self.assertEqual(self.days()[1]["status"], "available")
+
+    def test_rebuild_command_repairs_drift(self):
+        Availability.objects.create(volunteer=self.profile, date=date(2026, 1, 6), start_time=time(8), end_time=time(10))
+        WeeklyRecap.objects.all().delete()
+        WeeklyRecap.objects.create(volunteer=self.profile, week_start=date(2026, 2, 2), days=recap.EMPTY_WEEK)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_weekly_recap", "--check", stdout=StringIO())
+        out = StringIO()
+        call_command("rebuild_weekly_recap", stdout=out)
+        self.assertIn("lignes corrigees: 2", out.getvalue())
+        self.assertEqual(list(WeeklyRecap.objects.values_list("week_start", flat=True)), [WEEK_START])
+        call_command("rebuild_weekly_recap", "--check", stdout=StringIO())
+
+    @override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+    def test_view_reads_recap_rows(self):
+        other = User.objects.create_user(email="anne@example.org", first_name="Anne", last_name="Martin")
+        VolunteerProfile.objects.create(user=other, volunteer_id=8)
+        Availability.objects.create(volunteer=self.profile, date=date(2026, 1, 6), start_time=time(8), end_time=time(10))
+        self.client.force_login(self.user)
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse("volunteer-availability-recap"), {"year": 2026, "week": 2})
+        rows = response.context["recap_rows"]
+        self.assertEqual([row["name"] for row in rows], ["Jean Dupont", "Anne Martin"])
+        self.assertEqual(rows[0]["days"][1]["status"], "available")
+        self.assertEqual(rows[1]["days"], recap.EMPTY_WEEK)
+
+    @override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+    def test_cached_table_follows_writes(self):
+        self.client.force_login(self.user)
+        url = reverse("volunteer-availability-recap")
+        params = {"year": 2026, "week": 2}
+        self.client.get(url, params)
+        with self.assertNumQueries(4):
+            response = self.client.get(url, params)
+        self.assertNotContains(response, "status-available")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Availability.objects.create(
+                volunteer=self.profile, date=date(2026, 1, 6), start_time=time(8), end_time=time(10)
+            )
+        self.assertContains(self.client.get(url, params), "08h00")
+        self.assertNotContains(self.client.get(url, {"year": 2026, "week": 3}), "status-available")
+
+        self.user.last_name = "Durand"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertContains(self.client.get(url, params), "Jean Durand")
+
+    def test_generation_is_bumped_after_commit(self):
+        key = recap.week_generation_key(WEEK_START)
+        with self.captureOnCommitCallbacks(execute=True):
+            Availability.objects.create(
+                volunteer=self.profile, date=date(2026, 1, 6), start_time=time(8), end_time=time(10)
+            )
+            self.assertFalse(CacheGeneration.objects.filter(key=key).exists())
+        self.assertEqual(CacheGeneration.objects.get(key=key).value, 1)
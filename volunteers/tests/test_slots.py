@@ -0,0 +1,121 @@
+import random
+from datetime import date, time, timedelta
+
+from django.test import SimpleTestCase, TestCase
+
+from accounts.models import User
+from volunteers import slots
+from volunteers.models import Availability, VolunteerProfile
+
+# Property checks run on seeded random samples so failures are reproducible.
+SEED = 20260105
+SAMPLES = 500
+
+
+def random_interval(rng):
+    first = rng.randrange(slots.SLOT_COUNT)
+    last = rng.randrange(first + 1, slots.SLOT_COUNT + 1)
+    return slots.slot_time(first), slots.slot_time(last)
+
+
+def random_intervals(rng):
+    return [random_interval(rng) for _ in range(rng.randrange(0, 5))]
+
+
+def interval_overlaps(a, b):
+    return a[0] < b[1] and b[0] < a[1]
+
+
+class SlotConversionTests(SimpleTestCase):
+    def test_grid_bounds(self):
+        self.assertEqual(slots.SLOT_COUNT, 60)
+        self.assertEqual(slots.interval_to_mask(slots.SLOT_START, slots.SLOT_END), slots.FULL_MASK)
+        self.assertEqual(slots.interval_to_mask(time(7, 0), time(7, 15)), 1)
+        self.assertEqual(slots.slot_index(time(22, 0)), 60)
+        with self.assertRaises(ValueError):
+            slots.slot_index(time(9, 10))
+
+    def test_off_grid_times_are_widened_and_clipped(self):
+        self.assertEqual(slots.interval_to_mask(time(7, 10), time(7, 20)), 0b11)
+        self.assertEqual(slots.interval_to_mask(time(6, 0), time(7, 15)), 1)
+        self.assertEqual(slots.interval_to_mask(time(21, 50), time(23, 0)), 1 << 59)
+        self.assertEqual(slots.interval_to_mask(time(5, 0), time(6, 0)), 0)
+
+    def test_round_trip(self):
+        rng = random.Random(SEED)
+        for _ in range(SAMPLES):
+            start, end = random_interval(rng)
+            self.assertEqual(slots.mask_to_intervals(slots.interval_to_mask(start, end)), [(start, end)])
+
+    def test_union_matches_merged_intervals(self):
+        rng = random.Random(SEED)
+        for _ in range(SAMPLES):
+            intervals = random_intervals(rng)
+            mask = slots.intervals_to_mask(intervals)
+            self.assertEqual(slots.intervals_to_mask(slots.mask_to_intervals(mask)), mask)
+            for index in range(slots.SLOT_COUNT):
+                instant = slots.slot_time(index)
+                busy = any(start <= instant < end for start, end in intervals)
+                self.assertEqual(bool(mask & slots.slot_bit(instant)), busy)
+
+    def test_overlap_matches_interval_comparison(self):
+        rng = random.Random(SEED)
+        for _ in range(SAMPLES):
+            a, b = random_interval(rng), random_interval(rng)
+            mask_a, mask_b = slots.interval_to_mask(*a), slots.interval_to_mask(*b)
+            self.assertEqual(slots.overlaps(mask_a, mask_b), interval_overlaps(a, b), (a, b))
+            self.assertEqual(slots.covers(mask_a, *b), a[0] <= b[0] and b[1] <= a[1], (a, b))
+
+    def test_coverage_counts_match_naive_count(self):
+        rng = random.Random(SEED)
+        for _ in range(SAMPLES // 10):
+            intervals = [random_interval(rng) for _ in range(rng.randrange(0, 20))]
+            counts = slots.coverage_counts(slots.interval_to_mask(*interval) for interval in intervals)
+            expected = [
+                sum(start <= slots.slot_time(index) < end for start, end in intervals)
+                for index in range(slots.SLOT_COUNT)
+            ]
+            self.assertEqual(counts, expected)
+
+
+class AvailabilitySlotQueryTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(email="jean@example.org", first_name="Jean", last_name="Dupont")
+        self.profile = VolunteerProfile.objects.create(user=user, volunteer_id=7)
+
+    def test_queries_match_interval_comparison(self):
+        rng = random.Random(SEED)
+        day = date(2026, 1, 5)
+        intervals = [random_interval(rng) for _ in range(40)]
+        Availability.objects.bulk_create(
+            Availability(
+                volunteer=self.profile,
+                date=day + timedelta(days=offset),
+                start_time=start,
+                end_time=end,
+                slot_mask=slots.interval_to_mask(start, end),
+            )
+            # One interval per day: overlapping availabilities are rejected by the database.
+            for offset, (start, end) in enumerate(intervals)
+        )
+        rows = list(Availability.objects.values_list("pk", "start_time", "end_time"))
+        for _ in range(50):
+            probe = random_interval(rng)
+            expected = {pk for pk, start, end in rows if interval_overlaps((start, end), probe)}
+            found = set(Availability.objects.overlapping(slots.interval_to_mask(*probe)).values_list("pk", flat=True))
+            self.assertEqual(found, expected, probe)
+            expected = {pk for pk, start, end in rows if start <= probe[0] and probe[1] <= end}
+            self.assertEqual(set(Availability.objects.covering(*probe).values_list("pk", flat=True)), expected)
+        instant = time(14, 30)
+        expected = {pk for pk, start, end in rows if start <= instant < end}
+        self.assertEqual(set(Availability.objects.free_at(instant).values_list("pk", flat=True)), expected)
+
+    def test_save_keeps_mask_in_sync(self):
+        availability = Availability.objects.create(
+            volunteer=self.profile, date=date(2026, 1, 5), start_time=time(9, 0), end_time=time(10, 0)
+        )
+        self.assertEqual(availability.slot_mask, slots.interval_to_mask(time(9, 0), time(10, 0)))
+        availability.end_time = time(12, 0)
+        availability.save(update_fields=["end_time"])
+        availability.refresh_from_db()
+        self.assertEqual(slots.mask_to_intervals(availability.slot_mask), [(time(9, 0), time(12, 0))])
@@ -8,7 +8,9 @@ urlpatterns = [
     path("constraints/", views.constraints_view, name="volunteer-constraints"),
     path("availabilities/", views.availability_list, name="volunteer-availabilities"),
     path("availabilities/new/", views.availability_create, name="volunteer-availability-create"),
+    path("availabilities/repeat/", views.availability_repeat, name="volunteer-availability-repeat"),
     path("availabilities/recap/", views.availability_recap, name="volunteer-availability-recap"),
+    path("availabilities/coverage/", views.availability_coverage, name="volunteer-availability-coverage"),
     path("availabilities/<int:pk>/edit/", views.availability_update, name="volunteer-availability-edit"),
     path("availabilities/<int:pk>/delete/", views.availability_delete, name="volunteer-availability-delete"),
 ]
@@ -1,21 +1,36 @@
-from collections import defaultdict
 from datetime import date, datetime, timedelta
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Max, Min
+from django.db.models import JSONField, OuterRef, Subquery
 from django.forms import formset_factory
 from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
 from django.utils import timezone
 
+from . import recap
+from .bulk import PatternConflict, apply_pattern, copy_week, replace_days
+from .coverage import coverage
 from .forms import (
     AccountForm,
     AvailabilityForm,
     AvailabilityWeekForm,
+    CopyWeekForm,
+    RecurringAvailabilityForm,
     VolunteerConstraintForm,
     VolunteerProfileForm,
 )
-from .models import Availability, Unavailability, VolunteerConstraint, VolunteerProfile
+from .models import (
+    Availability,
+    AvailabilityOverlap,
+    Unavailability,
+    VolunteerConstraint,
+    VolunteerProfile,
+    WeeklyRecap,
+)
+from .slots import SLOT_COUNT, slot_time
+
+COVERAGE_MAX_WEEKS = 12
 
 DAY_NAMES = [
     "Lundi",
@@ -188,85 +203,112 @@ def availability_recap(request):
     week_days = _build_week_days(week_start)
     week_end = week_days[-1]["date"]
 
-    week_options = [
+    week_options = recap.week_options(week_year, lambda: _recap_week_options(week_year))
+    recap_table = recap.cached_table(
+        week_start,
+        lambda: render_to_string(
+            "volunteers/availability_recap_table.html",
+            {"week_days": week_days, "recap_rows": _recap_rows(week_start)},
+        ),
+    )
+
+    return render(
+        request,
+        "volunteers/availability_recap.html",
+        {
+            "profile": _get_profile(request.user),
+            "week_start": week_start,
+            "week_end": week_end,
+            "week_number": week_number,
+            "week_year": week_year,
+            "week_options": week_options,
+            "recap_table": recap_table,
+        },
+    )
+
+
+def _recap_week_options(year):
+    return [
         {
             "week": week,
             "start": start,
             "end": end,
             "label": f"Semaine {week} - du lundi {start.strftime('%d/%m/%Y')} au dimanche {end.strftime('%d/%m/%Y')}",
         }
-        for week, start, end in _iter_week_ranges(week_year)
+        for week, start, end in _iter_week_ranges(year)
     ]
 
-    availability_rows = (
-        Availability.objects.filter(date__range=(week_start, week_end))
-        .values("volunteer_id", "date")
-        .annotate(start=Min("start_time"), end=Max("end_time"))
-    )
-    availability_map = defaultdict(dict)
-    for row in availability_rows:
-        availability_map[row["volunteer_id"]][row["date"]] = (row["start"], row["end"])
 
-    unavailability_rows = Unavailability.objects.filter(date__range=(week_start, week_end)).values(
-        "volunteer_id",
-        "date",
+def _recap_rows(week_start):
+    week_recap = WeeklyRecap.objects.filter(volunteer=OuterRef("pk"), week_start=week_start).values("days")[:1]
+    profiles = (
+        VolunteerProfile.objects.select_related("user")
+        .annotate(recap_days=Subquery(week_recap, output_field=JSONField()))
+        .order_by("user__last_name", "user__first_name")
     )
-    unavailability_map = defaultdict(set)
-    for row in unavailability_rows:
-        unavailability_map[row["volunteer_id"]].add(row["date"])
-
-    profiles = VolunteerProfile.objects.select_related("user").order_by("user__last_name", "user__first_name")
-    recap_rows = []
-    for profile in profiles:
-        days = []
-        for day in week_days:
-            date_value = day["date"]
-            availability = availability_map.get(profile.id, {}).get(date_value)
-            if availability:
-                start_time, end_time = availability
-                days.append(
-                    {
-                        "status": "available",
-                        "start": start_time.strftime("%Hh%M"),
-                        "end": end_time.strftime("%Hh%M"),
-                    }
-                )
-                continue
-            if date_value in unavailability_map.get(profile.id, set()):
-                days.append(
-                    {
-                        "status": "unavailable",
-                        "start": "--",
-                        "end": "--",
-                    }
-                )
-                continue
-            days.append(
-                {
-                    "status": "empty",
-                    "start": "",
-                    "end": "",
-                }
-            )
-        recap_rows.append(
+    return [
+        {
+            "name": profile.user.full_name,
+            "days": profile.recap_days or recap.EMPTY_WEEK,
+        }
+        for profile in profiles
+    ]
+
+
+def _coverage_level(count, peak):
+    if not count:
+        return 0
+    return max(1, -(-4 * count // peak))
+
+
+@login_required
+def availability_coverage(request):
+    week_start = _resolve_week_start(request)
+    try:
+        week_count = int(request.GET.get("weeks") or 1)
+    except ValueError:
+        week_count = 1
+    week_count = max(1, min(week_count, COVERAGE_MAX_WEEKS))
+
+    counts = coverage(week_start, 7 * week_count)
+    peak = max((max(day_counts) for day_counts in counts), default=0)
+    weeks = []
+    for week_index in range(week_count):
+        start = week_start + timedelta(days=7 * week_index)
+        week_counts = counts[7 * week_index : 7 * (week_index + 1)]
+        rows = [
+            {
+                "label": slot_time(slot).strftime("%Hh%M"),
+                "cells": [
+                    {"count": day_counts[slot], "level": _coverage_level(day_counts[slot], peak)}
+                    for day_counts in week_counts
+                ],
+            }
+            for slot in range(SLOT_COUNT)
+        ]
+        weeks.append(
             {
-                "name": profile.user.full_name,
-                "days": days,
+                "number": start.isocalendar().week,
+                "start": start,
+                "end": start + timedelta(days=6),
+                "days": _build_week_days(start),
+                "rows": rows,
             }
         )
 
+    week_meta = week_start.isocalendar()
     return render(
         request,
-        "volunteers/availability_recap.html",
+        "volunteers/availability_coverage.html",
         {
             "profile": _get_profile(request.user),
-            "week_start": week_start,
-            "week_end": week_end,
-            "week_number": week_number,
-            "week_year": week_year,
-            "week_days": week_days,
-            "week_options": week_options,
-            "recap_rows": recap_rows,
+            "week_number": week_meta.week,
+            "week_year": week_meta.year,
+            "week_count": week_count,
+            "week_counts": range(1, COVERAGE_MAX_WEEKS + 1),
+            "week_options": [week for week, _start, _end in _iter_week_ranges(week_meta.year)],
+            "weeks": weeks,
+            "peak": peak,
         },
     )
 
@@ -292,30 +334,28 @@ def availability_create(request):
     if request.method == "POST":
         formset = AvailabilityWeekFormSet(request.POST, form_kwargs={"volunteer": profile})
         if formset.is_valid():
-            created = 0
+            availabilities = []
+            unavailable_dates = []
             for form in formset:
-                availability_choice = form.cleaned_data.get("availability")
                 date_value = form.cleaned_data.get("date")
-                if availability_choice != "available":
-                    if date_value:
-                        Availability.objects.filter(volunteer=profile, date=date_value).delete()
-                        Unavailability.objects.update_or_create(volunteer=profile, date=date_value)
+                if not date_value:
                     continue
-                if date_value:
-                    Availability.objects.filter(volunteer=profile, date=date_value).delete()
-                    Unavailability.objects.filter(volunteer=profile, date=date_value).delete()
-                Availability.objects.create(
-                    volunteer=profile,
-                    date=date_value,
-                    start_time=form.cleaned_data["start_time"],
-                    end_time=form.cleaned_data["end_time"],
-                )
-                created += 1
-            if created:
-                messages.success(request, f"{created} disponibilite(s) enregistree(s).")
+                if form.cleaned_data.get("availability") == "available":
+                    availabilities.append(
+                        (date_value, form.cleaned_data["start_time"], form.cleaned_data["end_time"])
+                    )
+                else:
+                    unavailable_dates.append(date_value)
+            try:
+                created = len(replace_days(profile, availabilities, unavailable_dates))
+            except AvailabilityOverlap as error:
+                messages.error(request, error.message)
             else:
-                messages.success(request, "Aucune disponibilite enregistree.")
-            return redirect("volunteer-availabilities")
+                if created:
+                    messages.success(request, f"{created} disponibilite(s) enregistree(s).")
+                else:
+                    messages.success(request, "Aucune disponibilite enregistree.")
+                return redirect("volunteer-availabilities")
     else:
         initial = [{"date": date, "availability": "unavailable"} for date in week_dates]
         formset = AvailabilityWeekFormSet(initial=initial, form_kwargs={"volunteer": profile})
@@ -339,6 +379,69 @@ def availability_create(request):
     )
 
 
+@login_required
+def availability_repeat(request):
+    profile = _get_profile(request.user)
+    if not profile:
+        return render(request, "volunteers/missing_profile.html", status=400)
+
+    week_start = _resolve_week_start(request)
+    pattern_form = RecurringAvailabilityForm(prefix="pattern", initial={"first_day": week_start})
+    copy_form = CopyWeekForm(prefix="copy", initial={"week_start": week_start})
+
+    if request.method == "POST":
+        action = request.POST.get("action")
+        try:
+            if action == "pattern":
+                pattern_form = RecurringAvailabilityForm(request.POST, prefix="pattern")
+                if pattern_form.is_valid():
+                    data = pattern_form.cleaned_data
+                    created = apply_pattern(
+                        profile,
+                        data["weekdays"],
+                        data["start_time"],
+                        data["end_time"],
+                        data["first_day"],
+                        data["last_day"],
+                        replace=data["replace"],
+                    )
+                    messages.success(request, f"{len(created)} disponibilite(s) enregistree(s).")
+                    return redirect("volunteer-availabilities")
+            elif action == "copy":
+                copy_form = CopyWeekForm(request.POST, prefix="copy")
+                if copy_form.is_valid():
+                    data = copy_form.cleaned_data
+                    created = copy_week(profile, data["week_start"], data["weeks"], replace=data["replace"])
+                    messages.success(request, f"{len(created)} disponibilite(s) enregistree(s).")
+                    return redirect("volunteer-availabilities")
+        except AvailabilityOverlap as error:
+            messages.error(request, error.message)
+        except PatternConflict as conflict:
+            days = ", ".join(day.strftime("%d/%m/%Y") for day in conflict.dates[:10])
+            if len(conflict.dates) > 10:
+                days += ", ..."
+            messages.error(
+                request,
+                f"Des disponibilites existent deja ({days}). Cochez \"Remplacer\" pour les ecraser.",
+            )
+
+    week_meta = week_start.isocalendar()
+    return render(
+        request,
+        "volunteers/availability_repeat.html",
+        {
+            "profile": profile,
+            "pattern_form": pattern_form,
+            "copy_form": copy_form,
+            "week_start": week_start,
+            "week_end": week_start + timedelta(days=6),
+            "week_number": week_meta.week,
+            "week_year": week_meta.year,
+            "week_options": [week for week, _start, _end in _iter_week_ranges(week_meta.year)],
+        },
+    )
+
+
 @login_required
 def availability_update(request, pk: int):
     profile = _get_profile(request.user)
@@ -349,10 +452,14 @@ def availability_update(request, pk: int):
     if request.method == "POST":
         form = AvailabilityForm(request.POST, instance=availability, volunteer=profile)
         if form.is_valid():
-            availability = form.save()
-            Unavailability.objects.filter(volunteer=profile, date=availability.date).delete()
-            messages.success(request, "Disponibilite mise a jour.")
-            return redirect("volunteer-availabilities")
+            try:
+                availability = form.save()
+            except AvailabilityOverlap as error:
+                form.add_error(None, error)
+            else:
+                Unavailability.objects.filter(volunteer=profile, date=availability.date).delete()
+                messages.success(request, "Disponibilite mise a jour.")
+                return redirect("volunteer-availabilities")
     else:
         form = AvailabilityForm(instance=availability, volunteer=profile)
 